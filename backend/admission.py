@@ -0,0 +1,224 @@
+"""Admission control for the expensive endpoints.
+
+Each gated endpoint gets its own concurrency limit and a small bounded wait
+queue. A request that finds the endpoint full waits in the queue (high
+priority first -- requests already answerable from cache jump ahead of cold
+ones); if the queue is full, or it waits longer than MAX_QUEUE_WAIT, it's shed
+immediately with a 503 and a Retry-After estimated from recent service times.
+Cheap endpoints (/health, /api/teams, /api/bootstrap, /api/stats) are never
+gated, so health checks keep answering while predictions are saturated.
+
+Every request in a gate -- running or queued -- holds a request thread, so on
+top of the per-endpoint gates all of them share one budget, the ALL gate:
+SERVING_THREADS less RESERVED_THREADS, with no queue of its own. A burst on
+any mix of expensive endpoints is shed once it reaches the budget, and the
+reserved threads stay free for the cheap ones.
+
+Limits default to ENDPOINT_LIMITS and can be overridden per endpoint with
+ADMISSION_LIMITS, e.g. ADMISSION_LIMITS="predict=4:2,simulate=1:1"
+(limit:queue). Counters for every gate come from stats().
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+
+from flask import jsonify, make_response
+
+MAX_QUEUE_WAIT = 2.0  # seconds a queued request waits for a slot before being shed
+
+# Request threads per worker (gunicorn.conf.py), and how many of them gated
+# requests may never take
+SERVING_THREADS = int(os.environ.get('GUNICORN_THREADS', 8))
+RESERVED_THREADS = int(os.environ.get('ADMISSION_RESERVED_THREADS', 2))
+GATED_THREADS = max(1, SERVING_THREADS - RESERVED_THREADS)
+
+ALL = 'all'
+
+
+def _share(fraction):
+    """Concurrency for one endpoint: a fraction of the gated threads, at least one."""
+    return max(1, int(GATED_THREADS * fraction))
+
+
+# endpoint -> (concurrent requests, queued requests). Queues stay short: a
+# queued request holds its thread while it waits.
+ENDPOINT_LIMITS = {
+    ALL: (GATED_THREADS, 0),
+    'predict': (_share(1 / 2), 2),
+    'matchup': (_share(1 / 2), 2),
+    'team_comparison': (_share(1 / 2), 2),
+    'explain': (_share(1 / 3), 1),
+    'whatif': (_share(1 / 3), 1),
+    'predict_batch': (_share(1 / 4), 1),
+    'predict_matrix': (_share(1 / 4), 1),
+    'predict_stream': (_share(1 / 4), 0),
+    # An open /api/predict/events response holds a thread for its whole life;
+    # no point queueing for one
+    'predict_events': (max(1, SERVING_THREADS // 4), 0),
+    'predict_events_loop': (1024, 0),  # asgi.py's event-loop subscriptions, which hold no thread
+    'simulate': (1, 1),
+    'history': (_share(1 / 3), 1),
+    'h2h': (_share(1 / 3), 1),
+    'team_trend': (_share(1 / 3), 1),
+}
+
+HIGH = 'high'
+NORMAL = 'normal'
+
+
+def _configured_limits():
+    limits = dict(ENDPOINT_LIMITS)
+    for item in filter(None, os.environ.get('ADMISSION_LIMITS', '').split(',')):
+        name, _, values = item.partition('=')
+        limit, _, queue = values.partition(':')
+        limits[name.strip()] = (int(limit), int(queue or limits.get(name.strip(), (0, 0))[1]))
+    return limits
+
+
+class Gate:
+    """Concurrency limit plus a bounded, two-level priority wait queue for one endpoint. Thread-safe."""
+
+    def __init__(self, name, limit, queue_size, max_wait=MAX_QUEUE_WAIT):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = {HIGH: 0, NORMAL: 0}
+        self.admitted = 0
+        self.admitted_high = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.service_time = 0.1  # moving average, seconds
+
+    def _may_enter(self, priority):
+        # Normal requests only take a free slot when no high-priority request is waiting for it
+        return self.active < self.limit and (priority == HIGH or self.waiting[HIGH] == 0)
+
+    def acquire(self, priority=NORMAL):
+        """Take a slot, waiting in the queue if needed. Returns False if the request should be shed."""
+        with self._cond:
+            if not self._may_enter(priority):
+                if sum(self.waiting.values()) >= self.queue_size:
+                    self.shed_queue_full += 1
+                    return False
+                self.waiting[priority] += 1
+                deadline = time.monotonic() + self.max_wait
+                try:
+                    while not self._may_enter(priority):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed_timeout += 1
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting[priority] -= 1
+            self.active += 1
+            self.admitted += 1
+            if priority == HIGH:
+                self.admitted_high += 1
+            return True
+
+    def release(self, elapsed=None):
+        """Give the slot back; `elapsed` (seconds of service) updates the average unless None."""
+        with self._cond:
+            self.active -= 1
+            if elapsed is not None:
+                self.service_time = 0.9 * self.service_time + 0.1 * elapsed
+            self._cond.notify_all()
+
+    def retry_after(self):
+        """Seconds until a slot is likely free: queued work spread over the slots, at recent service times."""
+        queued = self.active + sum(self.waiting.values())
+        return max(1, math.ceil(self.service_time * queued / max(self.limit, 1)))
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'queue_size': self.queue_size,
+                'active': self.active,
+                'waiting': sum(self.waiting.values()),
+                'admitted': self.admitted,
+                'admitted_high_priority': self.admitted_high,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_timeout': self.shed_timeout,
+                'avg_service_ms': round(self.service_time * 1000, 1),
+            }
+
+
+_gates = {}
+_limits = _configured_limits()
+
+
+def get_gate(name):
+    if name not in _gates:
+        limit, queue_size = _limits.get(name, (4, 8))
+        _gates[name] = Gate(name, limit, queue_size)
+    return _gates[name]
+
+
+def _busy(gate, message="Server is busy, please retry shortly"):
+    response = jsonify({"error": message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(gate.retry_after())
+    return response
+
+
+def retry_later(name, message):
+    """A 503 with the `name` gate's Retry-After, for work that was admitted but couldn't finish in time."""
+    return _busy(get_gate(name), message)
+
+
+def limit(name, priority=None):
+    """
+    Decorator gating a Flask view through the `name` gate and the shared ALL budget.
+
+    Args:
+        name: Gate (endpoint) name, looked up in ENDPOINT_LIMITS
+        priority: Optional callable returning True when the current request is
+            cheap (e.g. already cached) and should jump the queue
+    """
+    gate = get_gate(name)
+    budget = get_gate(ALL)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(*args, **kwargs):
+            level = HIGH if priority is not None and priority() else NORMAL
+            # The budget is taken first and held while queued: waiting holds a thread too
+            if not budget.acquire(level):
+                return _busy(budget)
+            if not gate.acquire(level):
+                budget.release()
+                return _busy(gate)
+
+            started = time.monotonic()
+
+            def release():
+                elapsed = time.monotonic() - started
+                gate.release(elapsed)
+                budget.release(elapsed)
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                release()
+                raise
+            if response.is_streamed:
+                # The work happens while the body streams; hold the slot until it's done
+                response.call_on_close(release)
+            else:
+                release()
+            return response
+        return wrapped
+    return decorator
+
+
+def stats():
+    """Counters for every gate created so far: {endpoint: {...}}."""
+    return {name: gate.stats() for name, gate in _gates.items()}
@@ -1,18 +1,68 @@
 """Flask backend for NBA game predictor."""
 
-from flask import Flask, request, jsonify
+import startup  # first, so the import phase below is timed
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 
 # Import from current directory
-from ml_model import load_model, predict_game_outcome, get_model_info
+import admission
+import binary_format
+import database
+import push
+from ml_model import (DEFAULT_PREDICTION_DATE, load_model, predict_game_outcome, analyze_game, get_model_info,
+                      is_matchup_cached)
+from forest import forest_tables
+
+startup.mark('import modules')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
 
+# Read from the pipeline-built serving snapshot, copied into memory by default
+# (SERVING_DB_MODE=immutable opens the file read-only in place instead)
+database.use_serving_snapshot(in_memory=os.environ.get('SERVING_DB_MODE', 'memory') != 'immutable')
+print(f"Serving data from {database.get_serving_info()['path']}")
+startup.mark('open serving snapshot')
+
+MAX_BATCH_GAMES = 1000
+GZIP_MIN_BYTES = 512
+
+NBA_TEAMS = [
+    "Atlanta", "Boston", "Brooklyn", "Charlotte", "Chicago",
+    "Cleveland", "Dallas", "Denver", "Detroit", "Golden State",
+    "Houston", "Indiana", "LA Clippers", "LA Lakers", "Memphis",
+    "Miami", "Milwaukee", "Minnesota", "New Orleans", "New York",
+    "Oklahoma City", "Orlando", "Philadelphia", "Phoenix", "Portland",
+    "Sacramento", "San Antonio", "Toronto", "Utah", "Washington"
+]
+MAX_WHATIF_SCENARIOS = 100
+
+# Drop expired volatile entries from the persistent feature/prediction cache
+import cache
+print(f"Feature cache at {cache.CACHE_DB_PATH or '(memory only)'}: purged {cache.purge_expired()} expired entries")
+startup.mark('purge feature cache')
+
 # Load model on startup
 print("Loading model...")
 model_data = load_model()
 print("Model loaded successfully!")
+startup.mark('load model')
+
+# Build the per-node forest tables now, so preloaded gunicorn workers share them
+forest_tables(model_data['model'])
+startup.mark('build forest tables')
+
+# Pushes changed probabilities to /api/predict/events subscribers (watcher starts on first subscription)
+prediction_hub = push.PredictionHub(model_data)
 
 
 @app.route('/')
@@ -22,39 +72,95 @@ def root():
         "message": "NBA Game Predictor API",
         "version": "1.0.0",
         "endpoints": {
+            "GET /api/bootstrap": "Teams and model info in one request",
             "GET /api/teams": "List all NBA teams",
-            "GET /api/predict": "Predict game outcome (params: home, away, date)",
+            "GET /api/predict": "Predict game outcome (params: home, away, date, explain, uncertainty)",
+            "POST /api/predict/batch": "Predict many games at once (body: games, explain, uncertainty)",
+            "GET /api/predict/matrix": "Home-win probabilities for every pairing (params: date, teams, uncertainty)",
+            "POST /api/whatif": "Predictions under hypothetical injury scenarios (body: home, away, date, scenarios)",
+            "GET /api/explain": "Per-feature contributions to a prediction (params: home, away, date)",
+            "POST /api/explain": "Per-feature contributions for many games (body: games)",
+            "GET /api/matchup": "Prediction plus comparison stats for a matchup (params: home, away, date)",
             "GET /api/stats": "Model statistics",
             "GET /api/team-comparison": "Detailed team comparison stats (params: home, away, date)",
+            "GET /api/team/<team>/trend": "Rolling four-factor form and win rate (params: from, to, window, points)",
+            "GET /api/h2h": "Head-to-head meetings with results and past predictions (params: home, away, seasons)",
+            "GET /api/history": "Historical predictions vs results (params: team, from, to, page, page_size)",
+            "GET /api/predict/stream": "NDJSON predictions for stored games in a date range (params: from, to, team, home, away)",
+            "GET /api/predict/events": "Server-sent probability updates when data changes (params: matchups, teams, date)",
+            "POST /api/simulate": "Monte Carlo simulation of the remaining season (body: games, sims, seed, as_of)",
             "GET /health": "Health check"
         }
     })
 
 
+def health_status():
+    """The /health response body (also served by asgi.py)."""
+    return {
+        "status": "healthy",
+        "model_loaded": model_data is not None,
+        "data": database.get_serving_info(),
+        "cache": cache.cache_stats(),
+        "admission": admission.stats(),
+        "push": prediction_hub.stats(),
+        "startup": startup.timings()
+    }
+
+
 @app.route('/health')
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        "status": "healthy",
-        "model_loaded": model_data is not None
-    })
+    return jsonify(health_status())
 
 
 @app.route('/api/teams')
 def get_teams():
     """Get list of all NBA teams."""
-    teams = [
-        "Atlanta", "Boston", "Brooklyn", "Charlotte", "Chicago",
-        "Cleveland", "Dallas", "Denver", "Detroit", "Golden State",
-        "Houston", "Indiana", "LA Clippers", "LA Lakers", "Memphis",
-        "Miami", "Milwaukee", "Minnesota", "New Orleans", "New York",
-        "Oklahoma City", "Orlando", "Philadelphia", "Phoenix", "Portland",
-        "Sacramento", "San Antonio", "Toronto", "Utah", "Washington"
-    ]
-    return jsonify({"teams": teams})
+    return jsonify({"teams": NBA_TEAMS})
+
+
+def _cached_json(payload, max_age=0):
+    """
+    JSON response that supports conditional GET and gzip.
+    
+    The ETag is a hash of the body, so an unchanged result answers
+    If-None-Match with an empty 304. Bodies over GZIP_MIN_BYTES are gzipped
+    when the client accepts it (the ETag is weak, so it holds for both encodings).
+    """
+    body = app.json.dumps(payload).encode()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.sha256(body).hexdigest()[:32], weak=True)
+    response.cache_control.max_age = max_age
+    response.vary.add('Accept-Encoding')
+    response = response.make_conditional(request)
+    
+    if response.status_code == 200 and len(body) >= GZIP_MIN_BYTES and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def _matchup_is_cached():
+    """Admission priority: single-matchup requests whose team stats are already in memory are cheap."""
+    home, away = request.args.get('home'), request.args.get('away')
+    return not home or not away or is_matchup_cached(home, away, request.args.get('date'))
+
+
+@app.route('/api/bootstrap')
+def bootstrap():
+    """
+    Everything the frontend needs on load in one request: teams and model info.
+    
+    Supports ETag / If-None-Match and gzip.
+    """
+    try:
+        return _cached_json({"teams": NBA_TEAMS, "model": get_model_info(model_data)}, max_age=300)
+    except Exception as e:
+        return jsonify({"error": f"Failed to get bootstrap data: {str(e)}"}), 500
 
 
 @app.route('/api/predict')
+@admission.limit('predict', priority=_matchup_is_cached)
 def predict():
     """
     Predict the outcome of an NBA game.
@@ -63,6 +169,8 @@ def predict():
     - home: Home team city (required)
     - away: Away team city (required)
     - date: Game date YYYY-MM-DD (optional)
+    - explain: Include feature contributions (optional, default true; "false" to skip)
+    - uncertainty: Include the spread of the trees' votes (optional, default true; "false" to skip)
     
     Returns JSON with:
     - winner: Predicted winning team
@@ -70,11 +178,15 @@ def predict():
     - home_team: Home team name
     - away_team: Away team name
     - prediction_date: Date used for prediction
+    - explanation: Base rate and per-feature contributions to the home-win probability
+    - uncertainty: Per-tree spread and bootstrap interval of the home-win probability
     """
     # Get parameters
     home = request.args.get('home')
     away = request.args.get('away')
     date = request.args.get('date')
+    explain = request.args.get('explain', 'true').lower() != 'false'
+    uncertainty = request.args.get('uncertainty', 'true').lower() != 'false'
     
     # Validate required parameters
     if not home:
@@ -83,21 +195,410 @@ def predict():
         return jsonify({"error": "Missing required parameter: away"}), 400
     
     try:
-        # Make prediction
-        winner, confidence = predict_game_outcome(home, away, model_data, date)
+        # Make prediction (explanation and uncertainty come from the same forest pass)
+        if explain or uncertainty:
+            winner, confidence, analysis = analyze_game(home, away, model_data, date, explain, uncertainty)
+        else:
+            winner, confidence = predict_game_outcome(home, away, model_data, date)
+        
+        return jsonify(_prediction_result(home, away, date, winner, confidence,
+                                          analysis if explain else None,
+                                          analysis['uncertainty'] if uncertainty else None))
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except TimeoutError as e:
+        return admission.retry_later('predict', str(e))
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+
+def _prediction_result(home, away, date, winner, confidence, explanation=None, uncertainty=None):
+    """The /api/predict response body."""
+    result = {
+        "winner": winner,
+        "confidence": round(confidence * 100, 1),
+        "home_team": home,
+        "away_team": away,
+        "prediction_date": date or DEFAULT_PREDICTION_DATE
+    }
+    if explanation is not None:
+        result["explanation"] = _format_explanation(explanation)
+    if uncertainty is not None:
+        result["uncertainty"] = _format_uncertainty(uncertainty)
+    return result
+
+
+@app.route('/api/matchup')
+@admission.limit('matchup', priority=_matchup_is_cached)
+def matchup():
+    """
+    Prediction, comparison table and breakdown for one matchup in a single request.
+    
+    Query Parameters:
+    - home: Home team city (required)
+    - away: Away team city (required)
+    - date: Game date YYYY-MM-DD (optional)
+    
+    Returns JSON with "prediction" (as /api/predict) and "comparison" (as
+    /api/team-comparison); team stats and injuries are looked up once for both.
+    Supports ETag / If-None-Match and gzip.
+    """
+    from ml_model import get_matchup
+    
+    home = request.args.get('home')
+    away = request.args.get('away')
+    date = request.args.get('date')
+    
+    if not home:
+        return jsonify({"error": "Missing required parameter: home"}), 400
+    if not away:
+        return jsonify({"error": "Missing required parameter: away"}), 400
+    
+    try:
+        winner, confidence, analysis, comparison = get_matchup(home, away, model_data, date)
+        return _cached_json({
+            "prediction": _prediction_result(home, away, date, winner, confidence,
+                                             analysis, analysis['uncertainty']),
+            "comparison": comparison
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except TimeoutError as e:
+        return admission.retry_later('matchup', str(e))
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+
+def _format_explanation(explanation):
+    """Round an explanation dict from ml_model for JSON responses."""
+    return {
+        "home_win_probability": round(explanation['home_win_probability'], 4),
+        "base_rate": round(explanation['base_rate'], 4),
+        "contributions": [
+            {
+                "feature": c['feature'],
+                "value": round(c['value'], 3),
+                "contribution": round(c['contribution'], 4)
+            }
+            for c in explanation['contributions']
+        ]
+    }
+
+
+def _format_uncertainty(uncertainty):
+    """Round an uncertainty dict from ml_model (home-win probability scale) for JSON responses."""
+    low, high = uncertainty['interval']
+    return {
+        "trees": uncertainty['trees'],
+        "tree_std": round(uncertainty['std'], 4),
+        "tree_quantiles": {f"p{round(q * 100):02d}": round(v, 4) for q, v in uncertainty['quantiles'].items()},
+        "interval": {"low": round(low, 4), "high": round(high, 4), "coverage": uncertainty['coverage']}
+    }
+
+
+def _wants_binary():
+    """True when the Accept header prefers binary_format's encoding to JSON (JSON wins ties and */*)."""
+    best = request.accept_mimetypes.best_match(['application/json', binary_format.BINARY_MIMETYPE])
+    return best == binary_format.BINARY_MIMETYPE
+
+
+def _binary_response(body):
+    response = Response(body, mimetype=binary_format.BINARY_MIMETYPE)
+    response.vary.add('Accept')
+    return response
+
+
+def _encode_predictions(matchups, teams, columns, **header):
+    """binary_format message for (date, home, away) matchups and home_win_probability_arrays() columns."""
+    return binary_format.encode([
+        ('home', 'u1', binary_format.team_ids([home for _, home, _ in matchups], teams)),
+        ('away', 'u1', binary_format.team_ids([away for _, _, away in matchups], teams)),
+        ('date', 'i4', binary_format.date_ids([date for date, _, _ in matchups])),
+    ] + [(name, 'f4', values) for name, values in columns.items()], teams=teams, **header)
+
+
+def _requested_matchups(games):
+    """(date, home, away) tuples from [{"home", "away", "date"}] request dicts, validated."""
+    from ml_model import _validate_matchup
+    
+    return [
+        (_validate_matchup(g['home'], g['away'], g.get('date')), g['home'], g['away'])
+        for g in games
+    ]
+
+
+@app.route('/api/explain', methods=['GET', 'POST'])
+@admission.limit('explain')
+def explain():
+    """
+    Explain predictions: how much each feature moved the home-win probability
+    away from the model's base rate (tree-path decomposition over every tree).
+    
+    GET query parameters:
+    - home: Home team city (required)
+    - away: Away team city (required)
+    - date: Game date YYYY-MM-DD (optional)
+    
+    POST JSON body:
+    - games: [{"home": ..., "away": ..., "date": ...}], explained in one batch
+    """
+    from ml_model import explain_home_win_probabilities
+    
+    if request.method == 'GET':
+        home = request.args.get('home')
+        away = request.args.get('away')
+        if not home or not away:
+            return jsonify({"error": "Missing required parameters: home, away"}), 400
+        games = [{"home": home, "away": away, "date": request.args.get('date')}]
+    else:
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        games = body.get('games')
+        if not games:
+            return jsonify({"error": "Missing required field: games"}), 400
+        if not isinstance(games, list):
+            return jsonify({"error": "games must be a list of {home, away} objects"}), 400
+    
+    try:
+        matchups = _requested_matchups(games)
+        explanations = explain_home_win_probabilities(model_data, matchups)
+        results = [
+            {"home_team": home, "away_team": away, "prediction_date": date, **_format_explanation(e)}
+            for (date, home, away), e in zip(matchups, explanations)
+        ]
+        if request.method == 'GET':
+            return jsonify(results[0])
+        return jsonify({"games": results})
+    except (KeyError, TypeError, AttributeError):
+        return jsonify({"error": "Each game needs home and away fields"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Explanation failed: {str(e)}"}), 500
+
+
+@app.route('/api/predict/batch', methods=['POST'])
+@admission.limit('predict_batch')
+def predict_batch():
+    """
+    Predict many games in one batched forest pass.
+    
+    JSON body:
+    - games: [{"home": ..., "away": ..., "date": ...}] (required, at most 1000)
+    - explain: Include feature contributions (optional, default false)
+    - uncertainty: Include the spread of the trees' votes (optional, default false)
+    
+    Returns JSON with one prediction per game, in request order -- or, with
+    `Accept: application/vnd.nba-predictions`, a binary_format message with
+    home, away, date and home_win_probability (plus std, interval_low and
+    interval_high with uncertainty) per game. explain is JSON-only.
+    """
+    from ml_model import analyze_home_win_probabilities, home_win_probability_arrays
+    from config import TEAM_TO_ABBR
+    
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    games = body.get('games')
+    if not games:
+        return jsonify({"error": "Missing required field: games"}), 400
+    if not isinstance(games, list):
+        return jsonify({"error": "games must be a list of {home, away} objects"}), 400
+    if len(games) > MAX_BATCH_GAMES:
+        return jsonify({"error": f"At most {MAX_BATCH_GAMES} games per batch"}), 400
+    explain = bool(body.get('explain', False))
+    uncertainty = bool(body.get('uncertainty', False))
+    binary = _wants_binary()
+    if binary and explain:
+        return jsonify({"error": "explain is not available in the binary format"}), 400
+    
+    try:
+        matchups = _requested_matchups(games)
+        if binary:
+            columns = home_win_probability_arrays(model_data, matchups, uncertainty)
+            return _binary_response(_encode_predictions(matchups, list(TEAM_TO_ABBR), columns))
+        analyses = analyze_home_win_probabilities(model_data, matchups, explain=explain, uncertainty=uncertainty)
+        results = []
+        for (date, home, away), analysis in zip(matchups, analyses):
+            prob = analysis['home_win_probability']
+            result = {
+                "home_team": home,
+                "away_team": away,
+                "prediction_date": date,
+                "home_win_probability": round(prob, 4),
+                "winner": home if prob > 0.5 else away,
+                "confidence": round(max(prob, 1 - prob) * 100, 1)
+            }
+            if explain:
+                result["explanation"] = _format_explanation(analysis)
+            if uncertainty:
+                result["uncertainty"] = _format_uncertainty(analysis['uncertainty'])
+            results.append(result)
+        return jsonify({"games": results})
+    except (KeyError, TypeError, AttributeError):
+        return jsonify({"error": "Each game needs home and away fields"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+
+@app.route('/api/predict/matrix')
+@admission.limit('predict_matrix')
+def predict_matrix():
+    """
+    Home-win probability for every home/away pairing of a set of teams.
+    
+    Query Parameters:
+    - date: Game date YYYY-MM-DD (optional)
+    - teams: Comma-separated team cities (optional, default all 30)
+    - uncertainty: Include per-pairing tree std and bootstrap interval (optional, default false)
+    
+    Returns JSON with the team order and matrices indexed [home][away]
+    (null on the diagonal), all from one batched forest pass -- or, with
+    `Accept: application/vnd.nba-predictions`, a binary_format message holding
+    each matrix as a float32 column in row-major [home][away] order (NaN on the
+    diagonal), with the team order and shape in its header.
+    """
+    from ml_model import analyze_home_win_probabilities, home_win_probability_arrays
+    from config import TEAM_TO_ABBR
+    
+    teams = request.args.get('teams')
+    teams = [t.strip() for t in teams.split(',') if t.strip()] if teams else list(TEAM_TO_ABBR)
+    uncertainty = request.args.get('uncertainty', 'false').lower() == 'true'
+    
+    if len(set(teams)) != len(teams) or len(teams) < 2:
+        return jsonify({"error": "teams must list at least two distinct teams"}), 400
+    
+    try:
+        matchups = _requested_matchups([
+            {"home": home, "away": away, "date": request.args.get('date')}
+            for home in teams for away in teams if home != away
+        ])
+        date = matchups[0][0]
+        if _wants_binary():
+            size = len(teams)
+            off_diagonal = ~np.eye(size, dtype=bool)
+            grids = []
+            for name, values in home_win_probability_arrays(model_data, matchups, uncertainty).items():
+                grid = np.full((size, size), np.nan, dtype=np.float32)
+                grid[off_diagonal] = values
+                grids.append((name, 'f4', grid.ravel()))
+            return _binary_response(binary_format.encode(grids, teams=teams, shape=[size, size],
+                                                         prediction_date=date))
+        analyses = iter(analyze_home_win_probabilities(model_data, matchups, explain=False, uncertainty=uncertainty))
+        
+        size = len(teams)
+        probability = [[None] * size for _ in range(size)]
+        tree_std = [[None] * size for _ in range(size)]
+        interval_low = [[None] * size for _ in range(size)]
+        interval_high = [[None] * size for _ in range(size)]
+        for i in range(size):
+            for j in range(size):
+                if i == j:
+                    continue
+                analysis = next(analyses)
+                probability[i][j] = round(analysis['home_win_probability'], 4)
+                if uncertainty:
+                    tree_std[i][j] = round(analysis['uncertainty']['std'], 4)
+                    interval_low[i][j] = round(analysis['uncertainty']['interval'][0], 4)
+                    interval_high[i][j] = round(analysis['uncertainty']['interval'][1], 4)
+        
+        result = {"prediction_date": date, "teams": teams, "home_win_probability": probability}
+        if uncertainty:
+            result["tree_std"] = tree_std
+            result["interval_low"] = interval_low
+            result["interval_high"] = interval_high
+        response = jsonify(result)
+        response.vary.add('Accept')
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+
+@app.route('/api/whatif', methods=['POST'])
+@admission.limit('whatif')
+def whatif():
+    """
+    Predict one matchup under several hypothetical injury scenarios.
+    
+    JSON body:
+    - home / away: Team cities (required)
+    - date: Game date YYYY-MM-DD (optional)
+    - scenarios: [{"name": ..., "home_out": [players], "away_out": [players]}]
+      (required, at most 100); an omitted home_out/away_out keeps that team's
+      current injury report, an empty list means fully healthy
+    
+    Returns JSON with the baseline (current injury reports) and each scenario's
+    prediction and change from baseline, all from one batched model call.
+    """
+    from ml_model import predict_injury_scenarios
+    from data import get_team_roster
+    
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    home = body.get('home')
+    away = body.get('away')
+    scenarios = body.get('scenarios')
+    if not home or not away:
+        return jsonify({"error": "Missing required fields: home, away"}), 400
+    if not isinstance(home, str) or not isinstance(away, str):
+        return jsonify({"error": "home and away must be team names"}), 400
+    if not scenarios:
+        return jsonify({"error": "Missing required field: scenarios"}), 400
+    if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+        return jsonify({"error": "scenarios must be a list of objects"}), 400
+    if len(scenarios) > MAX_WHATIF_SCENARIOS:
+        return jsonify({"error": f"At most {MAX_WHATIF_SCENARIOS} scenarios per request"}), 400
+    
+    # Scenario 0 is the baseline: both teams' current injury reports
+    injuries = [(None, None)] + [(s.get('home_out'), s.get('away_out')) for s in scenarios]
+    for out in (out for pair in injuries for out in pair if out is not None):
+        if not isinstance(out, list) or not all(isinstance(player, str) for player in out):
+            return jsonify({"error": "home_out and away_out must be lists of player names"}), 400
+    
+    try:
+        probs = predict_injury_scenarios(model_data, home, away, injuries, body.get('date'))
+        
+        home_roster, away_roster = get_team_roster(home), get_team_roster(away)
+        baseline = float(probs[0])
+        
+        def summarize(prob):
+            return {
+                "home_win_probability": round(prob, 4),
+                "winner": home if prob > 0.5 else away,
+                "confidence": round(max(prob, 1 - prob) * 100, 1)
+            }
+        
+        results = []
+        for i, (scenario, prob) in enumerate(zip(scenarios, probs[1:])):
+            home_out, away_out = injuries[i + 1]
+            results.append({
+                "name": scenario.get('name', f"Scenario {i + 1}"),
+                **summarize(float(prob)),
+                "change": round(float(prob) - baseline, 4),
+                "unknown_players": sorted(
+                    {p for p in home_out or [] if p not in home_roster} |
+                    {p for p in away_out or [] if p not in away_roster}
+                )
+            })
         
         return jsonify({
-            "winner": winner,
-            "confidence": round(confidence * 100, 1),
             "home_team": home,
             "away_team": away,
-            "prediction_date": date or "2025-04-14"
+            "prediction_date": body.get('date') or DEFAULT_PREDICTION_DATE,
+            "baseline": summarize(baseline),
+            "scenarios": results
         })
-        
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+        return jsonify({"error": f"What-if failed: {str(e)}"}), 500
 
 
 @app.route('/api/stats')
@@ -118,6 +619,7 @@ def get_stats():
 
 
 @app.route('/api/team-comparison')
+@admission.limit('team_comparison', priority=_matchup_is_cached)
 def get_team_comparison():
     """
     Get detailed team comparison stats.
@@ -141,9 +643,455 @@ def get_team_comparison():
         return jsonify(stats)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except TimeoutError as e:
+        return admission.retry_later('team_comparison', str(e))
     except Exception as e:
         return jsonify({"error": f"Failed to get stats: {str(e)}"}), 500
 
+@app.route('/api/team/<team>/trend')
+@admission.limit('team_trend')
+def get_team_trend(team):
+    """
+    Get a team's rolling form at each game date, for charts.
+    
+    Query Parameters:
+    - from: Start date YYYY-MM-DD (optional, default start of the season containing `to`)
+    - to: End date YYYY-MM-DD (optional, default DEFAULT_PREDICTION_DATE)
+    - window: Rolling window in days (optional, default 30, max 365)
+    - points: Downsample to at most this many game dates (optional)
+    
+    Returns JSON with one point per game date: the team's and opponents'
+    average off_rtg, efg_pct, tov_pct and orb_pct, win rate, games in the window, and
+    decided_games -- those with a known result, the win rate's denominator.
+    """
+    from config import TEAM_TO_ABBR, get_season_bounds, get_season_label
+    from data import TREND_COLUMNS, get_team_trend as team_trend
+    
+    if team not in TEAM_TO_ABBR:
+        return jsonify({"error": f"Invalid team: {team}. Must be a valid NBA city name."}), 400
+    
+    end = request.args.get('to', DEFAULT_PREDICTION_DATE)
+    start = request.args.get('from')
+    try:
+        datetime.strptime(end, '%Y-%m-%d')
+        start = start or get_season_bounds(get_season_label(end))[0]
+        datetime.strptime(start, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({"error": "Date must be in YYYY-MM-DD format"}), 400
+    if start > end:
+        return jsonify({"error": "from must not be after to"}), 400
+    
+    try:
+        window = int(request.args.get('window', 30))
+        points = request.args.get('points')
+        points = int(points) if points else None
+    except ValueError:
+        return jsonify({"error": "window and points must be integers"}), 400
+    if not 1 <= window <= 365:
+        return jsonify({"error": "window must be between 1 and 365 days"}), 400
+    if points is not None and points < 1:
+        return jsonify({"error": "points must be positive"}), 400
+    
+    try:
+        trend = team_trend(team, start, end, window, points).round(3)
+        # Windows with no stored value for a metric come back as NaN -> null
+        trend = trend.astype(object).where(trend.notna(), None)
+        return jsonify({
+            "team": team,
+            "from": start,
+            "to": end,
+            "window": window,
+            "points": [
+                {
+                    "date": date.strftime('%Y-%m-%d'),
+                    **{col: row[col] for col in TREND_COLUMNS + ['win_rate']},
+                    "games": int(row['games']),
+                    "decided_games": int(row['decided_games'])
+                }
+                for date, row in trend.iterrows()
+            ]
+        })
+    except Exception as e:
+        return jsonify({"error": f"Failed to get trend: {str(e)}"}), 500
+
+
+@app.route('/api/h2h')
+@admission.limit('h2h')
+def get_head_to_head():
+    """
+    Get every stored meeting between two teams, either team at home.
+    
+    Query Parameters:
+    - home: First team city (required)
+    - away: Second team city (required)
+    - seasons: Comma-separated season labels, e.g. 2023-24,2024-25 (optional, default all)
+    
+    Returns JSON with each meeting (scores, both teams' four factors and the
+    current model's pre-game prediction from the ledger), newest first, plus
+    summary aggregates from the home team's perspective.
+    """
+    from config import TEAM_TO_ABBR, get_season_bounds, get_season_label
+    from database import get_head_to_head as head_to_head
+    
+    home = request.args.get('home')
+    away = request.args.get('away')
+    if not home or not away:
+        return jsonify({"error": "Missing required parameters: home, away"}), 400
+    for team in (home, away):
+        if team not in TEAM_TO_ABBR:
+            return jsonify({"error": f"Invalid team: {team}. Must be a valid NBA city name."}), 400
+    if home == away:
+        return jsonify({"error": "home and away must be different teams"}), 400
+    
+    seasons = request.args.get('seasons')
+    seasons = sorted({s.strip() for s in seasons.split(',') if s.strip()}) if seasons else None
+    if any(not re.fullmatch(r'\d{4}-\d{2}', season) or get_season_label(get_season_bounds(season)[0]) != season
+           for season in seasons or []):
+        return jsonify({"error": "seasons must be labels like 2024-25"}), 400
+    bounds = [get_season_bounds(season) for season in seasons or []]
+    
+    try:
+        if bounds:
+            rows = head_to_head(home, away, bounds[0][0], bounds[-1][1], model_data['version'])
+            rows = [row for row in rows if get_season_label(row[1]) in seasons]
+        else:
+            rows = head_to_head(home, away, model_version=model_data['version'])
+        
+        meetings = []
+        for (game_id, date, home_team, away_team, home_score, away_score, home_win,
+             h_rtg, h_efg, h_tov, h_orb, a_rtg, a_efg, a_tov, a_orb, prob) in rows:
+            winner = None if home_win is None else (home_team if home_win else away_team)
+            meetings.append({
+                "game_id": game_id,
+                "date": date,
+                "season": get_season_label(date),
+                "home_team": home_team,
+                "away_team": away_team,
+                "home_score": home_score,
+                "away_score": away_score,
+                "winner": winner,
+                "four_factors": {
+                    home_team: {"off_rtg": h_rtg, "efg_pct": h_efg, "tov_pct": h_tov, "orb_pct": h_orb},
+                    away_team: {"off_rtg": a_rtg, "efg_pct": a_efg, "tov_pct": a_tov, "orb_pct": a_orb}
+                },
+                "prediction": None if prob is None else {
+                    "home_win_probability": round(prob, 4),
+                    "predicted_winner": home_team if prob > 0.5 else away_team,
+                    "correct": None if winner is None else (prob > 0.5) == bool(home_win)
+                }
+            })
+        
+        decided = [m for m in meetings if m['winner'] is not None]
+        scored = [m for m in meetings if m['home_score'] is not None and m['away_score'] is not None]
+        predicted = [(m, row[-1]) for m, row in zip(meetings, rows) if m['prediction'] and m['winner']]
+        
+        def points(m, team):
+            return m['home_score'] if m['home_team'] == team else m['away_score']
+        
+        return jsonify({
+            "home_team": home,
+            "away_team": away,
+            "seasons": seasons,
+            "meetings": meetings,
+            "summary": {
+                "meetings": len(meetings),
+                "wins": {team: sum(m['winner'] == team for m in decided) for team in (home, away)},
+                "home_court_wins": sum(m['winner'] == m['home_team'] for m in decided),
+                "average_points": {
+                    team: round(sum(points(m, team) for m in scored) / len(scored), 1) if scored else None
+                    for team in (home, away)
+                },
+                "prediction_accuracy": round(
+                    sum(m['prediction']['correct'] for m, _ in predicted) / len(predicted), 4
+                ) if predicted else None,
+                "brier_score": round(
+                    sum((p - (m['winner'] == m['home_team'])) ** 2 for m, p in predicted) / len(predicted), 4
+                ) if predicted else None
+            }
+        })
+    except Exception as e:
+        return jsonify({"error": f"Failed to get head-to-head: {str(e)}"}), 500
+
+
+@app.route('/api/history')
+@admission.limit('history')
+def get_history():
+    """
+    Get the current model's pre-game predictions for stored games, with results.
+    
+    Query Parameters:
+    - team: Only games involving this team (optional)
+    - from / to: Date range YYYY-MM-DD, inclusive (optional)
+    - page: 1-based page number (optional, default 1)
+    - page_size: Games per page (optional, default 50, max 500)
+    
+    Served from the prediction ledger built by pipeline/build_ledger.py.
+    """
+    from database import get_ledger_page, get_ledger_accuracy
+    
+    team = request.args.get('team')
+    start = request.args.get('from')
+    end = request.args.get('to')
+    
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        page_size = min(max(int(request.args.get('page_size', 50)), 1), 500)
+    except ValueError:
+        return jsonify({"error": "page and page_size must be integers"}), 400
+    
+    try:
+        version = model_data['version']
+        rows, total = get_ledger_page(version, team, start, end, page_size, (page - 1) * page_size)
+        accuracy = get_ledger_accuracy(version, team, start, end)
+        return jsonify({
+            "model_version": version,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "games": [
+                {
+                    "game_id": game_id,
+                    "date": date,
+                    "home_team": home,
+                    "away_team": away,
+                    "home_win_probability": round(prob, 4),
+                    "predicted_winner": home if prob > 0.5 else away,
+                    "actual_winner": None if home_win is None else (home if home_win else away),
+                    "correct": None if home_win is None else (prob > 0.5) == bool(home_win)
+                }
+                for game_id, date, home, away, prob, home_win in rows
+            ],
+            "summary": {
+                "games": accuracy['games'],
+                "accuracy": accuracy['accuracy'],
+                "brier_score": accuracy['brier_score'],
+                "recent_accuracy": {f"last_{n}": acc for n, acc in accuracy['recent_accuracy'].items()}
+            }
+        })
+    except Exception as e:
+        return jsonify({"error": f"Failed to get history: {str(e)}"}), 500
+
+
+@app.route('/api/predict/stream')
+@admission.limit('predict_stream')
+def predict_stream():
+    """
+    Stream pre-game predictions for every stored game in a date range, one JSON object per line.
+    
+    Query Parameters:
+    - from / to: Date range YYYY-MM-DD, inclusive (required)
+    - team: Only games involving this team (optional)
+    - home / away: Only games with this home / away team (optional)
+    
+    Games are read and scored in chunks (one batched forest pass per chunk), so
+    the first lines go out right away and memory stays flat over long ranges.
+    Uses each game's actual inactive list, like the prediction ledger.
+    
+    With `Accept: application/vnd.nba-predictions` each chunk is instead one
+    binary_format message: game_id, date, home, away, home_win_probability,
+    home_score / away_score (-1 if unplayed) and home_win (-1 if unknown).
+    """
+    from database import iter_games_in_range
+    from ml_model import predict_stored_games
+    
+    start = request.args.get('from')
+    end = request.args.get('to')
+    if not start or not end:
+        return jsonify({"error": "Missing required parameters: from, to"}), 400
+    try:
+        datetime.strptime(start, '%Y-%m-%d')
+        datetime.strptime(end, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({"error": "Date must be in YYYY-MM-DD format"}), 400
+    if start > end:
+        return jsonify({"error": "from must not be after to"}), 400
+    
+    filters = {key: request.args.get(key) for key in ('team', 'home', 'away')}
+    
+    if _wants_binary():
+        def generate_binary():
+            try:
+                for games in iter_games_in_range(start, end, chunk_size=1000, first_chunk_size=25, **filters):
+                    probs = predict_stored_games(model_data, games)
+                    _, dates, homes, aways, home_scores, away_scores, home_wins = zip(*games)
+                    teams = sorted(set(homes) | set(aways))
+                    yield binary_format.encode([
+                        ('game_id', 'i4', [game[0] for game in games]),
+                        ('date', 'i4', binary_format.date_ids(dates)),
+                        ('home', 'u1', binary_format.team_ids(homes, teams)),
+                        ('away', 'u1', binary_format.team_ids(aways, teams)),
+                        ('home_win_probability', 'f4', probs),
+                        ('home_score', 'i2', [-1 if score is None else score for score in home_scores]),
+                        ('away_score', 'i2', [-1 if score is None else score for score in away_scores]),
+                        ('home_win', 'i1', [-1 if won is None else won for won in home_wins]),
+                    ], teams=teams)
+            except Exception as e:
+                yield binary_format.encode_error(f"Stream failed: {str(e)}")
+        
+        return _binary_response(stream_with_context(generate_binary()))
+    
+    def generate():
+        try:
+            for games in iter_games_in_range(start, end, chunk_size=250, first_chunk_size=25, **filters):
+                probs = predict_stored_games(model_data, games)
+                lines = []
+                for (game_id, date, home, away, home_score, away_score, home_win), prob in zip(games, probs):
+                    prob = float(prob)
+                    lines.append(json.dumps({
+                        "game_id": game_id,
+                        "date": date,
+                        "home_team": home,
+                        "away_team": away,
+                        "home_win_probability": round(prob, 4),
+                        "predicted_winner": home if prob > 0.5 else away,
+                        "confidence": round(max(prob, 1 - prob), 4),
+                        "home_score": home_score,
+                        "away_score": away_score,
+                        "actual_winner": None if home_win is None else (home if home_win else away)
+                    }) + "\n")
+                yield "".join(lines)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band as the last line
+            yield json.dumps({"error": f"Stream failed: {str(e)}"}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def sse_message(event, probabilities):
+    """One server-sent event listing {(date, home, away): probability} predictions."""
+    predictions = [
+        {
+            "home_team": home,
+            "away_team": away,
+            "prediction_date": date,
+            "home_win_probability": round(prob, 4),
+            "winner": home if prob > 0.5 else away,
+            "confidence": round(max(prob, 1 - prob) * 100, 1)
+        }
+        for (date, home, away), prob in sorted(probabilities.items())
+    ]
+    return f"event: {event}\ndata: {json.dumps({'predictions': predictions})}\n\n"
+
+
+def event_matchups(args):
+    """The validated set of (date, home, away) matchups an events subscription asks for. Raises ValueError."""
+    from config import TEAM_TO_ABBR
+    
+    date = args.get('date')
+    pairs = [p.split(':', 1) for p in (args.get('matchups') or '').split(',') if p.strip()]
+    teams = [t.strip() for t in (args.get('teams') or '').split(',') if t.strip()]
+    if not pairs and not teams:
+        raise ValueError("Missing required parameter: matchups or teams")
+    if any(len(pair) != 2 for pair in pairs):
+        raise ValueError("matchups must be home:away pairs")
+    for team in teams:
+        if team not in TEAM_TO_ABBR:
+            raise ValueError(f"Invalid team: {team}")
+    
+    games = [{"home": home.strip(), "away": away.strip(), "date": date} for home, away in pairs]
+    games += [{"home": team, "away": other, "date": date} for team in teams for other in TEAM_TO_ABBR if other != team]
+    games += [{"home": other, "away": team, "date": date} for team in teams for other in TEAM_TO_ABBR if other != team]
+    matchups = set(_requested_matchups(games))
+    if len(matchups) > MAX_BATCH_GAMES:
+        raise ValueError(f"At most {MAX_BATCH_GAMES} matchups per subscription")
+    return matchups
+
+
+@app.route('/api/predict/events')
+@admission.limit('predict_events')
+def predict_events():
+    """
+    Subscribe to home-win probabilities for a set of matchups as server-sent events.
+    
+    Query Parameters:
+    - matchups: Comma-separated home:away pairs, e.g. Boston:Toronto,Miami:Utah (optional)
+    - teams: Comma-separated team cities; every game they play, home or away (optional)
+    - date: Game date YYYY-MM-DD (optional)
+    At least one of matchups / teams is required.
+    
+    The first event ("snapshot") has every subscribed matchup's current
+    prediction. After that, an "update" event lists just the matchups whose
+    probability changed, as soon as the server sees new injury, player or game
+    data -- one check and one batched recomputation per process, shared by all
+    subscribers. A later "snapshot" replaces everything if the client fell
+    behind. Comment lines keep idle connections open.
+    
+    Each open subscription here holds one of the worker's threads, so the
+    predict_events gate is sized from the thread count (admission.py); asgi.py
+    serves this route from its event loop instead.
+    """
+    try:
+        matchups = event_matchups(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        subscription, current = prediction_hub.subscribe(matchups)
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+    
+    def generate():
+        try:
+            yield sse_message('snapshot', current)
+            for event in prediction_hub.listen(subscription):
+                yield ": keep-alive\n\n" if event is None else sse_message(*event)
+        finally:
+            prediction_hub.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a reverse proxy hold events back
+    return response
+
+
+@app.route('/api/simulate', methods=['POST'])
+@admission.limit('simulate')
+def simulate():
+    """
+    Simulate the rest of a season many times.
+    
+    JSON body:
+    - games: remaining games, [{"home": ..., "away": ...}] (required); every game
+      is predicted from form as of as_of, so games don't take a date
+    - sims: number of simulations (optional, default 10000)
+    - seed: RNG seed (optional, default 0; null for an unseeded, uncached run)
+    - as_of: date the simulation starts from, YYYY-MM-DD (optional)
+    
+    Returns JSON with projected standings, seed distributions and playoff odds.
+    Seeded runs are cached, so repeat requests are served without re-simulating.
+    Runs in this worker's thread, never a forked process pool.
+    """
+    from simulate import cached_simulation, simulate_season
+    
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    games = body.get('games')
+    if not games:
+        return jsonify({"error": "Missing required field: games"}), 400
+    if not isinstance(games, list):
+        return jsonify({"error": "games must be a list of {home, away} objects"}), 400
+    
+    try:
+        if any('date' in g for g in games):
+            return jsonify({"error": "Games don't take a date: every game is predicted as of as_of"}), 400
+        remaining = tuple((g['home'], g['away']) for g in games)
+        sims = int(body.get('sims', 10000))
+        seed = body.get('seed', 0)
+        as_of = body.get('as_of')
+        if seed is None:
+            result = simulate_season(list(remaining), model_data, sims=sims, as_of=as_of, workers=1)
+        else:
+            result = cached_simulation(remaining, sims, int(seed), as_of)
+        return jsonify(result)
+    except (KeyError, TypeError, AttributeError):
+        return jsonify({"error": "Each game needs home and away fields"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Simulation failed: {str(e)}"}), 500
+
+
 @app.errorhandler(404)
 def not_found(e):
     """Handle 404 errors."""
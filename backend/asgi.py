@@ -0,0 +1,121 @@
+"""ASGI entry point: the same API as app.py, served from an event loop.
+
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+
+Under gunicorn's sync workers every connection -- including idle keep-alives
+and slow clients -- holds a whole worker for as long as it's open. Here the
+event loop holds connections, and threads are only used for actual work:
+
+- /health and /api/teams are answered on the loop itself, so they never wait
+  behind predictions.
+- /api/predict/events subscriptions wait for updates on the loop too
+  (push.PredictionHub.listen_async); only the initial snapshot is computed in
+  a thread. Through the Flask route each one would hold a pool thread for as
+  long as the client stays connected.
+- Every other route is the Flask app (so routes, validation, caching and
+  admission control are exactly app.py's), run through a2wsgi in a bounded
+  pool of INFERENCE_WORKERS threads. That pool is where all blocking work
+  happens: SQLite reads (sqlite3 has no async driver; a thread pool is what
+  async SQLite wrappers use anyway) and the forest, whose numpy/sklearn work
+  releases the GIL for most of a prediction.
+- Once PENDING_LIMIT requests are already waiting for a pool thread, new ones
+  get an immediate 503 + Retry-After instead of an unbounded queue.
+
+bench/asgi_vs_flask.py compares this against the deployed gunicorn
+(gunicorn.conf.py) with uvicorn's process count sized to the same memory.
+"""
+
+import os
+import time
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+import admission
+from app import NBA_TEAMS, app as flask_app, event_matchups, health_status, prediction_hub, sse_message
+
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 4))
+PENDING_LIMIT = int(os.environ.get('PENDING_LIMIT', 64))
+
+
+class BoundedPool:
+    """ASGI wrapper that sheds requests once `limit` are in flight (running or waiting) in the wrapped app."""
+
+    def __init__(self, app, workers, pending):
+        self.app = app
+        self.workers = workers
+        self.limit = workers + pending
+        self.in_flight = 0  # only touched on the event loop, so no lock
+        self.shed = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        if self.in_flight >= self.limit:
+            self.shed += 1
+            response = JSONResponse({"error": "Server is busy, please retry shortly"}, status_code=503,
+                                    headers={'Retry-After': '1'})
+            return await response(scope, receive, send)
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {'workers': self.workers, 'limit': self.limit, 'in_flight': self.in_flight, 'shed': self.shed}
+
+
+pool = BoundedPool(WSGIMiddleware(flask_app, workers=INFERENCE_WORKERS), INFERENCE_WORKERS, PENDING_LIMIT)
+
+
+async def health(request):
+    return JSONResponse({**health_status(), "pool": pool.stats()})
+
+
+async def teams(request):
+    return JSONResponse({"teams": NBA_TEAMS})
+
+
+async def predict_events(request):
+    """app.py's /api/predict/events, with subscribers waiting on the loop instead of in pool threads."""
+    try:
+        matchups = event_matchups(request.query_params)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    # Queue size 0: acquire() never blocks, so it's safe to call on the loop
+    gate = admission.get_gate('predict_events_loop')
+    if not gate.acquire():
+        return JSONResponse({"error": "Server is busy, please retry shortly"}, status_code=503,
+                            headers={'Retry-After': str(gate.retry_after())})
+    started = time.monotonic()
+    try:
+        subscription, current = await run_in_threadpool(prediction_hub.subscribe, matchups)
+    except Exception as e:
+        gate.release(time.monotonic() - started)
+        return JSONResponse({"error": f"Prediction failed: {str(e)}"}, status_code=500)
+
+    async def generate():
+        try:
+            yield sse_message('snapshot', current)
+            async for event in prediction_hub.listen_async(subscription):
+                yield ": keep-alive\n\n" if event is None else sse_message(*event)
+        finally:
+            prediction_hub.unsubscribe(subscription)
+            gate.release(time.monotonic() - started)
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+app = Starlette(routes=[
+    Route('/health', health),
+    Route('/api/teams', teams),
+    Route('/api/predict/events', predict_events),
+    Mount('/', app=pool),
+])
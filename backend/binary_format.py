@@ -0,0 +1,107 @@
+"""Compact binary encoding for bulk prediction responses.
+
+Clients opt in per request with `Accept: application/vnd.nba-predictions`
+(BINARY_MIMETYPE); JSON stays the default. A message is a small JSON header
+followed by fixed-size records -- a NumPy structured array's raw bytes -- so
+encoding is one tobytes() over columns the model already produced, with no
+per-row dicts, and decoding is one frombuffer():
+
+    magic    4 bytes  b'NBAP'
+    version  uint8    FORMAT_VERSION
+    pad      3 bytes
+    length   uint32   byte length of the JSON header
+    header   JSON     {"fields": [[name, dtype], ...], "count": n, "teams": [...], ...}
+    records  `count` packed little-endian records with the header's fields
+
+Team columns are uint8 indexes into header["teams"], probabilities are
+float32 and dates are int32 YYYYMMDD. A record is 10-24 bytes against
+~150-250 bytes of JSON. Streaming endpoints send a sequence of messages (one
+per chunk); an error there arrives as a last message with count 0 and an
+"error" in its header. decode() / decode_stream() read them back in Python
+and raise ValueError on a wrong magic or version, or a truncated message.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+BINARY_MIMETYPE = 'application/vnd.nba-predictions'
+MAGIC = b'NBAP'
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct('<4sB3xI')
+
+
+def date_ids(dates):
+    """int32 YYYYMMDD values for 'YYYY-MM-DD' strings."""
+    return np.fromiter((int(d.replace('-', '')) for d in dates), dtype=np.int32, count=len(dates))
+
+
+def team_ids(names, teams):
+    """uint8 index of each team name in `teams` (the message's team table)."""
+    index = {team: i for i, team in enumerate(teams)}
+    return np.fromiter((index[name] for name in names), dtype=np.uint8, count=len(names))
+
+
+def encode(columns, **header):
+    """
+    One message from equal-length columns.
+
+    Args:
+        columns: list of (name, dtype, values) -- values is anything np.asarray accepts
+        **header: Extra JSON-serializable metadata (e.g. teams, prediction_date)
+
+    Returns:
+        bytes
+    """
+    dtype = np.dtype([(name, np.dtype(kind).newbyteorder('<')) for name, kind, _ in columns])
+    count = len(columns[0][2]) if columns else 0
+    records = np.empty(count, dtype=dtype)
+    for name, _, values in columns:
+        records[name] = values
+    meta = json.dumps({
+        'fields': [[name, dtype.fields[name][0].str] for name, _, _ in columns],
+        'count': count,
+        **header,
+    }, separators=(',', ':')).encode()
+    return _PREFIX.pack(MAGIC, FORMAT_VERSION, len(meta)) + meta + records.tobytes()
+
+
+def encode_error(message):
+    """An in-band error message (for streams whose headers are already sent)."""
+    return encode([], error=message)
+
+
+def _decode_at(buffer, offset):
+    if len(buffer) - offset < _PREFIX.size:
+        raise ValueError('Truncated prediction message')
+    magic, version, length = _PREFIX.unpack_from(buffer, offset)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError('Not a version-1 prediction message')
+    offset += _PREFIX.size
+    if len(buffer) - offset < length:
+        raise ValueError('Truncated prediction message')
+    header = json.loads(bytes(buffer[offset:offset + length]))
+    offset += length
+    dtype = np.dtype([(name, kind) for name, kind in header['fields']])
+    end = offset + dtype.itemsize * header['count']
+    if len(buffer) < end:
+        raise ValueError('Truncated prediction message')
+    if not header['count']:
+        return header, np.empty(0, dtype=dtype), offset
+    records = np.frombuffer(buffer, dtype=dtype, count=header['count'], offset=offset)
+    return header, records, end
+
+
+def decode(buffer):
+    """(header, records) for one message; records is a NumPy structured array (read-only view)."""
+    header, records, _ = _decode_at(buffer, 0)
+    return header, records
+
+
+def decode_stream(buffer):
+    """Yield (header, records) for each message in a concatenated stream."""
+    offset = 0
+    while offset < len(buffer):
+        header, records, offset = _decode_at(buffer, offset)
+        yield header, records
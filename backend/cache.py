@@ -0,0 +1,372 @@
+"""Two-tier cache for features and predictions: in-process LRU over a persistent SQLite file.
+
+Most of what the API computes is a pure function of stored games. Once a date
+is final -- it's in the past and the stored games already run through it --
+new games no longer change the rolling form for that date, or a model
+version's prediction for a stored game on it. Those entries are written as
+final: instead of a TTL they carry the running fingerprint of the stored
+history up to their date (database.get_history_fingerprints), so they survive
+restarts in the disk tier (CACHE_DB_PATH), are shared by every process on the
+host that points at the same file, and stay valid across daily scrapes -- but
+are misses as soon as anything on or before their date is written (a
+backfill, a re-scrape finishing a partly stored date, a restored season).
+
+Anything that can still change (a date at or past the latest stored game,
+anything derived from current injury reports or player stats) is volatile:
+it's stamped with database.get_data_version() and a TTL, and is treated as a
+miss once either the data it was computed from is replaced or the TTL runs out.
+
+The disk tier is how gunicorn workers share work: it runs in WAL mode, so
+any number of worker processes read it concurrently while one writes, and
+every write is a single atomic upsert. A worker's cold miss is usually another
+worker's earlier computation, so the hit rate holds up as workers are added.
+Per-process hit counts for each tier are available from cache_stats().
+
+Concurrent misses on the same key are coalesced (SingleFlight): the first
+thread computes, the others wait for and share its result or its exception,
+so a burst of identical requests costs one computation instead of one each.
+
+Every version string starts with CODE_VERSION, a hash of the modules that
+compute cached values, so a release that changes how features or predictions
+are computed starts from an empty cache instead of serving final entries
+computed the old way; purge_expired() drops the old release's entries.
+
+Set CACHE_DB_PATH to an empty string to keep only the in-memory tier.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from database import get_data_version, get_history_fingerprints
+
+CACHE_DB_PATH = os.environ.get('CACHE_DB_PATH', str(Path(__file__).resolve().parent / 'data' / 'cache.db'))
+
+MEMORY_ENTRIES = 4096
+VOLATILE_TTL = 300  # seconds
+DISK_BATCH = 500    # keys per disk-tier query
+SINGLE_FLIGHT_TIMEOUT = 30  # seconds a coalesced caller waits for the leader
+
+# Modules whose code determines cached values
+_CODE_MODULES = ['cache.py', 'config.py', 'data.py', 'database.py', 'forest.py', 'ml_model.py']
+
+
+def _code_version():
+    digest = hashlib.sha256()
+    for name in _CODE_MODULES:
+        digest.update((Path(__file__).resolve().parent / name).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+CODE_VERSION = _code_version()
+_PREFIX = f'{CODE_VERSION}:'
+
+_MISSING = object()
+_initialized_paths = set()
+_caches = []
+
+
+def _connect():
+    conn = sqlite3.connect(CACHE_DB_PATH, timeout=5)
+    # Losing the last few writes on power failure is fine for a cache; an fsync per write isn't
+    conn.execute('PRAGMA synchronous = NORMAL')
+    if CACHE_DB_PATH not in _initialized_paths:
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                version TEXT,
+                expires_at REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        ''')
+        _initialized_paths.add(CACHE_DB_PATH)
+    return conn
+
+
+# Stored history fingerprints by game date, read once per data version and
+# replaced as a whole: (data_version, dates, fingerprints). Loading takes
+# _history_lock, so one thread runs the query while the others wait for it --
+# never while holding a cache's own lock.
+_history = (None, [], [])
+_history_lock = threading.Lock()
+
+
+def _history_fingerprints(data_version):
+    global _history
+    history = _history
+    if history[0] != data_version:
+        with _history_lock:
+            history = _history
+            if history[0] != data_version:
+                rows = get_history_fingerprints()
+                history = _history = (data_version, [d for d, _ in rows], [f for _, f in rows])
+    return history[1], history[2]
+
+
+def final_version(date, data_version=None):
+    """
+    Version for an entry computed from the stored games up to `date`, or None
+    while the date isn't final (it's today or later, or after the latest stored
+    game). Changes whenever a game on or before `date` is added or rewritten.
+    """
+    dates, fingerprints = _history_fingerprints(data_version or get_data_version())
+    if not dates or date > dates[-1] or date >= datetime.now().strftime('%Y-%m-%d'):
+        return None
+    i = bisect_right(dates, date) - 1
+    return f"{_PREFIX}final:{date}:{fingerprints[i] if i >= 0 else 'empty'}"
+
+
+class SingleFlightTimeout(TimeoutError):
+    """A coalesced caller gave up waiting for the in-flight computation it joined."""
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller (the leader)
+    runs the function, later callers block until it finishes and get the same
+    result -- or the same exception. Nothing is remembered afterwards; the
+    next call with that key runs again. Thread-safe.
+    """
+
+    def __init__(self, timeout=SINGLE_FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, timeout=None):
+        """fn() for the leader; for everyone else, the leader's outcome (SingleFlightTimeout after `timeout` s)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                flight.result = fn()
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            return flight.result
+
+        if not flight.done.wait(self.timeout if timeout is None else timeout):
+            raise SingleFlightTimeout(f"Timed out waiting for an in-flight computation of {key!r}")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+
+class TieredCache:
+    """
+    A named cache with a bounded in-process LRU in front of the shared disk tier.
+
+    Keys are tuples of plain values (their repr is the disk key); values are
+    anything picklable. Thread-safe. ttl=None makes volatile entries depend on
+    the data version alone (for values computed purely from stored data).
+    Writers pass final_date(s) -- the date a value was computed as of -- for
+    values computed purely from stored games; once that date is final the
+    entry is kept by history fingerprint rather than data version and TTL.
+    """
+
+    def __init__(self, namespace, memory_entries=MEMORY_ENTRIES, ttl=VOLATILE_TTL):
+        self.namespace = namespace
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (value, version, expires_at)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._flight = SingleFlight()
+        _caches.append(self)
+
+    @staticmethod
+    def _valid(version, expires_at, data_version):
+        if version is None or not version.startswith(_PREFIX):
+            return False  # written by another release (None: an old "permanent" entry)
+        if expires_at is not None and expires_at <= time.time():
+            return False
+        if version.startswith('final:', len(_PREFIX)):
+            return version == final_version(version.split(':', 3)[2], data_version)
+        return version == _PREFIX + data_version
+
+    def _remember(self, entries):
+        with self._lock:
+            for key, entry in entries.items():
+                self._memory[key] = entry
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, keys, record_stats=True):
+        """{key: value} for every key with a live entry, from memory first, then one disk query per batch."""
+        data_version = get_data_version()
+        with self._lock:
+            entries = [(key, self._memory.get(key)) for key in keys]
+        # Validated outside the lock: the first check after a data change loads fingerprints
+        found, pending = {}, []
+        for key, entry in entries:
+            if entry is not None and self._valid(entry[1], entry[2], data_version):
+                found[key] = entry[0]
+            else:
+                pending.append(key)
+        with self._lock:
+            for key in found:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+            if record_stats:
+                self.memory_hits += len(found)
+
+        if not pending or not CACHE_DB_PATH:
+            if record_stats:
+                with self._lock:
+                    self.misses += len(pending)
+            return found
+
+        by_disk_key = {repr(key): key for key in pending}
+        disk_keys = list(by_disk_key)
+        loaded = {}
+        conn = _connect()
+        for i in range(0, len(disk_keys), DISK_BATCH):
+            batch = disk_keys[i:i + DISK_BATCH]
+            rows = conn.execute(f'''
+                SELECT key, value, version, expires_at FROM cache_entries
+                WHERE namespace = ? AND key IN ({','.join('?' * len(batch))})
+            ''', [self.namespace] + batch).fetchall()
+            for disk_key, blob, version, expires_at in rows:
+                if self._valid(version, expires_at, data_version):
+                    key = by_disk_key[disk_key]
+                    found[key] = pickle.loads(blob)
+                    loaded[key] = (found[key], version, expires_at)
+        conn.close()
+        self._remember(loaded)
+        if record_stats:
+            with self._lock:
+                self.disk_hits += len(loaded)
+                self.misses += len(pending) - len(loaded)
+        return found
+
+    def peek(self, key):
+        """True if `key` has a live entry in this process's memory tier. No disk query, no stats."""
+        with self._lock:
+            entry = self._memory.get(key)
+        return entry is not None and self._valid(entry[1], entry[2], get_data_version())
+
+    def set_many(self, items, final_dates=None):
+        """
+        Store {key: value}. Keys in final_dates ({key: date}) whose date is final
+        are kept until the stored history up to that date changes; the rest carry
+        the data version and TTL.
+        """
+        data_version = get_data_version()
+        volatile = (_PREFIX + data_version, time.time() + self.ttl if self.ttl else None)
+        entries = {}
+        for key, value in items.items():
+            final = final_version(final_dates[key], data_version) if final_dates and key in final_dates else None
+            entries[key] = (value, final, None) if final else (value,) + volatile
+        self._remember(entries)
+
+        if not CACHE_DB_PATH or not items:
+            return
+        now = time.time()
+        conn = _connect()
+        with conn:
+            conn.executemany('''
+                INSERT INTO cache_entries (namespace, key, value, version, expires_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(namespace, key) DO UPDATE SET
+                    value = excluded.value, version = excluded.version,
+                    expires_at = excluded.expires_at, created_at = excluded.created_at
+            ''', [
+                (self.namespace, repr(key), pickle.dumps(value), version, expires_at, now)
+                for key, (value, version, expires_at) in entries.items()
+            ])
+        conn.close()
+
+    def get(self, key, default=None):
+        """Cached value for `key`, or `default` on a miss (including stale volatile entries)."""
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key, value, final_date=None):
+        self.set_many({key: value}, None if final_date is None else {key: final_date})
+
+    def get_or_compute(self, key, compute, final_date=None):
+        """get(key), or compute() and set() it on a miss -- once, however many threads miss together."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def fill():
+            # A flight for this key may have finished between our miss and now
+            value = self.get_many([key], record_stats=False).get(key, _MISSING)
+            if value is _MISSING:
+                value = compute()
+                self.set(key, value, final_date)
+            return value
+
+        return self._flight.do(key, fill)
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+
+def cache_stats():
+    """This process's counts per cache: {namespace: {memory_hits, disk_hits, misses, hit_rate, coalesced, memory_entries}}."""
+    stats = {}
+    for cache in _caches:
+        lookups = cache.memory_hits + cache.disk_hits + cache.misses
+        stats[cache.namespace] = {
+            'memory_hits': cache.memory_hits,
+            'disk_hits': cache.disk_hits,
+            'misses': cache.misses,
+            'hit_rate': round((cache.memory_hits + cache.disk_hits) / lookups, 4) if lookups else None,
+            'coalesced': cache._flight.coalesced,
+            'memory_entries': len(cache._memory),
+        }
+    return stats
+
+
+def clear_memory():
+    """Drop the in-memory tier of every cache in this process (e.g. to time cold paths)."""
+    for cache in _caches:
+        cache.clear_memory()
+
+
+def purge_expired():
+    """Delete expired volatile entries, and entries from other releases (CODE_VERSION), from the disk tier. Returns the number removed."""
+    if not CACHE_DB_PATH:
+        return 0
+    conn = _connect()
+    with conn:
+        removed = conn.execute('''
+            DELETE FROM cache_entries
+            WHERE (expires_at IS NOT NULL AND expires_at < ?) OR version IS NULL OR substr(version, 1, ?) != ?
+        ''', (time.time(), len(_PREFIX), _PREFIX)).rowcount
+    conn.close()
+    return removed
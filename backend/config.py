@@ -36,6 +36,18 @@ TEAM_TO_ABBR = {
     "Washington": "WAS"
 }
 
+# Conference membership (for standings, seeding and playoff simulation)
+EASTERN_CONFERENCE = [
+    "Atlanta", "Boston", "Brooklyn", "Charlotte", "Chicago",
+    "Cleveland", "Detroit", "Indiana", "Miami", "Milwaukee",
+    "New York", "Orlando", "Philadelphia", "Toronto", "Washington"
+]
+WESTERN_CONFERENCE = [
+    "Dallas", "Denver", "Golden State", "Houston", "LA Clippers",
+    "LA Lakers", "Memphis", "Minnesota", "New Orleans", "Oklahoma City",
+    "Phoenix", "Portland", "Sacramento", "San Antonio", "Utah"
+]
+
 
 # URLs
 BOX_SCORES = "https://www.basketball-reference.com/boxscores/"
@@ -69,4 +81,16 @@ def get_2024_2025_season_dates():
     start_date = datetime(2024, 10, 22)
     end_date = datetime(2025, 4, 13)
     date_range = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((end_date - start_date).days + 1)]
-    return date_range
\ No newline at end of file
+    return date_range
+
+def get_season_label(date):
+    """NBA season label for a YYYY-MM-DD date, e.g. '2024-25'. Seasons start in October."""
+    date = datetime.strptime(date, '%Y-%m-%d')
+    start_year = date.year if date.month >= 10 else date.year - 1
+    return f'{start_year}-{str(start_year + 1)[-2:]}'
+
+
+def get_season_bounds(season):
+    """(first_date, last_date) covered by a season label, October 1 through September 30."""
+    start_year = int(season.split('-')[0])
+    return f'{start_year}-10-01', f'{start_year + 1}-09-30'
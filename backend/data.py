@@ -1,10 +1,13 @@
 """Data functions using SQLite database instead of HTML parsing."""
 
 from datetime import datetime, timedelta
-from functools import lru_cache
+
+import pandas as pd
+
+from cache import TieredCache
 from config import get_last_30_days_from_date, get_last_7_days_from_date
 from database import (
-    get_team_stats_for_dates, get_home_win, check_back_to_back,
+    get_team_stats_for_dates, get_team_timeline, get_home_win, check_back_to_back,
     get_latest_player_season_stats, get_current_injuries, get_game_injuries,
 )
 
@@ -109,6 +112,94 @@ def get_input_format(date, home, away, func):
     return home_ret, away_ret
 
 
+FORM_METRICS = ['off_rtg', 'efg_pct', 'tov_pct', 'orb_pct']
+
+
+_form_cache = TieredCache('team_form')
+
+
+def get_team_form(date, team):
+    """A team's rolling averages as of a date: {metric: (30-day [team, opp], 7-day [team, opp])}.
+
+    These are exactly the per-team pieces get_input_format() averages together,
+    computed once per (date, team) so batched callers can combine any number of
+    matchups on that date without re-querying. Cached in the tiered cache --
+    once the date is final, until a game on or before it is written.
+    """
+    return _form_cache.get_or_compute(
+        (date, team), lambda: _compute_team_form(date, team), final_date=date
+    )
+
+
+def _compute_team_form(date, team):
+    last_30 = get_last_30_days_from_date(date)
+    last_7 = get_last_7_days_from_date(date)
+    return {
+        metric: (get_avg_metrics(last_30, team, metric), get_avg_metrics(last_7, team, metric))
+        for metric in FORM_METRICS
+    }
+
+
+def combine_form(home_form, away_form, metric):
+    """Same arithmetic as get_input_format(), from two get_team_form() results."""
+    (home_30_days_avgs, home_7_days_avgs) = home_form[metric]
+    (away_30_days_avgs, away_7_days_avgs) = away_form[metric]
+    home_30_days = (home_30_days_avgs[0] + away_30_days_avgs[1]) / 2
+    away_30_days = (away_30_days_avgs[0] + home_30_days_avgs[1]) / 2
+    home_7_days = (home_7_days_avgs[0] + away_7_days_avgs[1]) / 2
+    away_7_days = (away_7_days_avgs[0] + home_7_days_avgs[1]) / 2
+    return (home_30_days + home_7_days) / 2, (away_30_days + away_7_days) / 2
+
+
+TREND_COLUMNS = [
+    'off_rtg', 'opp_off_rtg', 'efg_pct', 'opp_efg_pct',
+    'tov_pct', 'opp_tov_pct', 'orb_pct', 'opp_orb_pct',
+]
+
+
+def get_team_trend(team, start, end, window=30, max_points=None):
+    """
+    A team's rolling form at each of its game dates between start and end.
+
+    One query loads the team's games (plus `window` days before start, so the
+    first points have a full window), then a single pandas time-based rolling
+    pass averages every metric over the trailing `window` days, game day included.
+
+    Args:
+        window: Rolling window length in days
+        max_points: Downsample to at most this many evenly spaced game dates (always
+            keeping the first and latest); None for every game
+
+    Returns:
+        DataFrame indexed by date with TREND_COLUMNS, win_rate, games (the
+        number of games in each window) and decided_games (those with a known
+        result -- win_rate's denominator)
+    """
+    lookback_start = (datetime.strptime(start, '%Y-%m-%d') - timedelta(days=window)).strftime('%Y-%m-%d')
+    rows = get_team_timeline(team, lookback_start, end)
+    columns = ['date', 'won'] + TREND_COLUMNS
+    if not rows:
+        return pd.DataFrame(columns=TREND_COLUMNS + ['win_rate', 'games', 'decided_games'],
+                            index=pd.DatetimeIndex([], name='date'))
+
+    timeline = pd.DataFrame(rows, columns=columns)
+    timeline['date'] = pd.to_datetime(timeline['date'])
+    timeline = timeline.set_index('date').astype(float)
+    timeline['game'] = 1.0
+
+    rolling = timeline.rolling(f'{window}D')
+    trend = rolling[TREND_COLUMNS].mean()
+    trend['win_rate'] = rolling['won'].mean()
+    trend['games'] = rolling['game'].sum()
+    trend['decided_games'] = rolling['won'].count()
+    trend = trend[trend.index >= pd.Timestamp(start)]
+
+    if max_points and len(trend) > max_points:
+        keep = [round(i * (len(trend) - 1) / (max_points - 1)) for i in range(max_points)] if max_points > 1 else [-1]
+        trend = trend.iloc[keep]
+    return trend
+
+
 # ===== INJURY/PLAYER-VALUE FUNCTIONS (DB-backed, replaces HTML parsing at request time) =====
 
 def get_player_value(ppg, rpg, apg, spg, bpg):
@@ -116,37 +207,65 @@ def get_player_value(ppg, rpg, apg, spg, bpg):
     return ppg + (1.2 * rpg) + (1.5 * apg) + (2 * spg) + (2 * bpg)
 
 
-@lru_cache(maxsize=64)
-def _team_player_values(team):
-    """Map of player -> (basic value, advanced value) from the team's latest scraped season."""
+_team_values_cache = TieredCache('team_player_values', ttl=None)
+
+
+def _team_values(team):
+    """(player -> (basic, advanced) map, (total basic, total advanced)) for the team's latest season.
+
+    Shared across workers through the tiered cache, keyed to the data version
+    so a new player-stats scrape is picked up.
+    """
+    return _team_values_cache.get_or_compute((team,), lambda: _compute_team_values(team))
+
+
+def _compute_team_values(team):
     values = {}
     for player, ppg, rpg, apg, spg, bpg, vorp, ws in get_latest_player_season_stats(team):
         basic = get_player_value(ppg, rpg, apg, spg, bpg) if None not in (ppg, rpg, apg, spg, bpg) else None
         advanced = (vorp * ws) if vorp is not None and ws is not None else None
         values[player] = (basic, advanced)
-    return values
+    total_value = sum(basic for basic, _ in values.values() if basic is not None)
+    total_advanced = sum(advanced for _, advanced in values.values() if advanced is not None)
+    return values, (total_value, total_advanced)
+
+
+def _team_player_values(team):
+    """Map of player -> (basic value, advanced value) from the team's latest scraped season."""
+    return _team_values(team)[0]
+
+
+def _team_value_totals(team):
+    """(total basic value, total advanced value) of the team's whole roster, computed once per team."""
+    return _team_values(team)[1]
 
 
 def get_injury_value(injured_players, team):
-    """Team's total player value minus injured players' value, from stored season stats."""
+    """Team's total player value minus injured players' value, from stored season stats.
+
+    The roster total is cached per team, so this only walks the injured list.
+    """
     values = _team_player_values(team)
-    total_value = sum(basic for basic, _ in values.values() if basic is not None)
     injury_value = sum(
         values[player][0] for player in (injured_players or [])
         if player in values and values[player][0] is not None
     )
-    return total_value - injury_value
+    return _team_value_totals(team)[0] - injury_value
 
 
 def get_injury_advanced(injured_players, team):
     """Team's total advanced value (vorp*ws) minus injured players', from stored season stats."""
     values = _team_player_values(team)
-    total_advanced = sum(advanced for _, advanced in values.values() if advanced is not None)
     injury_advanced = sum(
         values[player][1] for player in (injured_players or [])
         if player in values and values[player][1] is not None
     )
-    return total_advanced - injury_advanced
+    return _team_value_totals(team)[1] - injury_advanced
+
+
+def get_team_roster(team):
+    """Players with stored season stats for a team (the names injury lists are matched against)."""
+    return set(_team_player_values(team))
 
 
 def get_current_team_injuries(team):
@@ -1,10 +1,18 @@
 """SQLite database functions for NBA predictor."""
 
+import os
+import shutil
 import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 DB_PATH = str(Path(__file__).resolve().parent / 'data' / 'nba_data.db')
 
+# Read-optimized copy of DB_PATH built by pipeline/build_snapshot.py (see use_serving_snapshot)
+SERVING_DB_PATH = str(Path(__file__).resolve().parent / 'data' / 'nba_serving.db')
+
 
 def create_database():
     """Create database schema."""
@@ -84,24 +92,192 @@ def create_database():
         )
     ''')
 
+    # Ingest state table - one row per scoreboard date scraped by pipeline/scrape_games.py,
+    # so re-runs skip dates that are already complete and resume where a crashed run stopped
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_state (
+            date TEXT PRIMARY KEY,
+            games_found INTEGER NOT NULL,
+            games_stored INTEGER NOT NULL,
+            complete INTEGER NOT NULL,
+            scraped_at TEXT NOT NULL
+        )
+    ''')
+
+    # Team page state table - hash of each team page's extracted payload, so
+    # pipeline/scrape_teams.py only rewrites a team's rows when its page changed
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS team_page_state (
+            team TEXT NOT NULL,
+            season TEXT NOT NULL,
+            payload_hash TEXT NOT NULL,
+            changed_at TEXT NOT NULL,
+            PRIMARY KEY (team, season)
+        )
+    ''')
+
+    # Prediction ledger table - the model's pre-game home-win probability for every stored
+    # game, keyed by model version (built in bulk by pipeline/build_ledger.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS prediction_ledger (
+            model_version TEXT NOT NULL,
+            game_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            home_team TEXT NOT NULL,
+            away_team TEXT NOT NULL,
+            home_win_prob REAL NOT NULL,
+            home_win INTEGER,
+            scored_at TEXT NOT NULL,
+            PRIMARY KEY (model_version, game_id)
+        )
+    ''')
+
     # Create indexes for faster queries
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_games_date ON games(date)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_games_teams ON games(home_team, away_team)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_team_stats_team ON team_stats(team)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_team_stats_game ON team_stats(game_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_game_injuries_team ON game_injuries(team)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_current_injuries_team ON current_injuries(team)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_version_date ON prediction_ledger(model_version, date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_version_home ON prediction_ledger(model_version, home_team, date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_version_away ON prediction_ledger(model_version, away_team, date)')
 
     conn.commit()
     conn.close()
     print(f"Database created at {DB_PATH}")
 
+    from_version, to_version = migrate_database()
+    if from_version != to_version:
+        print(f"Schema migrated from v{from_version} to v{to_version}")
+
+
+# ===== SCHEMA MIGRATIONS =====
+# create_database() builds the v0 schema; each migration below upgrades it by one
+# version, tracked in PRAGMA user_version. Append new migrations, never edit old ones.
+# They also run on season partition files, which only hold PARTITIONED_TABLES,
+# so a step touching any other table checks that it exists first.
+
+def _has_table(cursor, table):
+    return cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _migrate_unique_stats_and_injuries(cursor):
+    """v1: dedupe team_stats/game_injuries and make them unique per game/team(/player)."""
+    cursor.execute('''
+        DELETE FROM team_stats WHERE id NOT IN (
+            SELECT MAX(id) FROM team_stats GROUP BY game_id, team
+        )
+    ''')
+    cursor.execute('''
+        DELETE FROM game_injuries WHERE id NOT IN (
+            SELECT MAX(id) FROM game_injuries GROUP BY game_id, team, player
+        )
+    ''')
+    # The unique indexes double as the lookup indexes: (game_id, team) replaces the
+    # old single-column game_id index, and (game_id, team, player) fully covers
+    # get_game_injuries() so it never touches the table.
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_team_stats_game_team ON team_stats(game_id, team)')
+    cursor.execute('DROP INDEX IF EXISTS idx_team_stats_game')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_game_injuries_game_team_player
+        ON game_injuries(game_id, team, player)
+    ''')
+
+
+def _migrate_covering_indexes(cursor):
+    """v2: denormalize games.date into team_stats and add covering indexes for the serving queries.
+
+    Every rolling-average lookup filters team_stats by team and a list of dates;
+    with date on the row, (team, date, <metrics>) answers it from the index alone,
+    with no join to games. The old single-column indexes are prefixes of the new
+    ones (or of the UNIQUE(date, home_team, away_team) index on games), so drop them.
+    """
+    cursor.execute('ALTER TABLE team_stats ADD COLUMN date TEXT')
+    cursor.execute('UPDATE team_stats SET date = (SELECT g.date FROM games g WHERE g.id = team_stats.game_id)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_team_stats_team_date ON team_stats(
+            team, date, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
+            tov_pct, opp_tov_pct, orb_pct, opp_orb_pct
+        )
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_team_stats_team')
+    cursor.execute('DROP INDEX IF EXISTS idx_games_date')
+
+    if _has_table(cursor, 'player_season_stats'):
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_player_season_stats_team_scraped
+            ON player_season_stats(team, scraped_at, season)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_player_season_stats_team_season
+            ON player_season_stats(team, season)
+        ''')
+    if _has_table(cursor, 'current_injuries'):
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_current_injuries_team_player ON current_injuries(team, player)')
+        cursor.execute('DROP INDEX IF EXISTS idx_current_injuries_team')
+    if _has_table(cursor, 'ingest_state'):
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ingest_state_complete_date ON ingest_state(complete, date)')
+
+
+def _migrate_team_pair_index(cursor):
+    """v3: index games on the unordered team pair, replacing the ordered (home, away) index.
+
+    Head-to-head lookups want both orientations of a matchup; keyed on
+    (min(home, away), max(home, away), date) that's one index range instead of
+    two. Queries must use exactly these expressions to match the index.
+    """
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_pair_date
+        ON games(min(home_team, away_team), max(home_team, away_team), date)
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_games_teams')
+
+
+MIGRATIONS = [
+    _migrate_unique_stats_and_injuries,
+    _migrate_covering_indexes,
+    _migrate_team_pair_index,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version():
+    """Current schema version of the database (PRAGMA user_version)."""
+    conn = sqlite3.connect(DB_PATH)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    conn.close()
+    return version
+
+
+def migrate_database(path=None):
+    """Apply any pending migrations to DB_PATH (or `path`), each in its own transaction.
+
+    Returns (from_version, to_version). Safe to call on every run -- an
+    up-to-date database is a single PRAGMA read.
+    """
+    conn = sqlite3.connect(path or DB_PATH, isolation_level=None)
+    cursor = conn.cursor()
+
+    from_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    version = from_version
+    try:
+        for migration in MIGRATIONS[from_version:]:
+            cursor.execute('BEGIN')
+            migration(cursor)
+            version += 1
+            cursor.execute(f'PRAGMA user_version = {version}')
+            cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+    return from_version, version
+
 
 # ===== WRITE FUNCTIONS (used by pipeline/ scraper and backfill scripts) =====
 
 def game_exists(date, home_team, away_team):
     """Check if a game is already stored (idempotency check for scrapers)."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(dates=[date])
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -114,19 +290,12 @@ def game_exists(date, home_team, away_team):
 
 
 def insert_game(date, home_team, away_team, home_score, away_score, home_win):
-    """Insert a game (idempotent via UNIQUE constraint) and return its id."""
+    """Insert a game (idempotent via UNIQUE constraint) and return its id. Raises ValueError for an archived season."""
+    _check_season_open(date)
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
-    cursor.execute('''
-        INSERT OR IGNORE INTO games (date, home_team, away_team, home_score, away_score, home_win)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (date, home_team, away_team, home_score, away_score, home_win))
-
-    cursor.execute('''
-        SELECT id FROM games WHERE date = ? AND home_team = ? AND away_team = ?
-    ''', (date, home_team, away_team))
-    game_id = cursor.fetchone()[0]
+    game_id = _insert_game(cursor, date, home_team, away_team, home_score, away_score, home_win)
 
     conn.commit()
     conn.close()
@@ -135,38 +304,192 @@ def insert_game(date, home_team, away_team, home_score, away_score, home_win):
 
 def insert_team_stats(game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
                        tov_pct, opp_tov_pct, orb_pct, opp_orb_pct):
-    """Insert a team's four-factors stats for a game."""
+    """Insert (or refresh) a team's four-factors stats for a game -- idempotent on (game_id, team)."""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
-    cursor.execute('''
-        INSERT INTO team_stats (
-            game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
-            tov_pct, opp_tov_pct, orb_pct, opp_orb_pct
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
-          tov_pct, opp_tov_pct, orb_pct, opp_orb_pct))
+    _insert_team_stats(cursor, game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
+                       tov_pct, opp_tov_pct, orb_pct, opp_orb_pct)
 
     conn.commit()
     conn.close()
 
 
 def insert_game_injuries(game_id, team, players):
-    """Insert the inactive-player list for a team in a game."""
+    """Insert the inactive-player list for a team in a game (already-stored players are ignored)."""
     if not players:
         return
 
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    _insert_game_injuries(cursor, game_id, team, players)
+
+    conn.commit()
+    conn.close()
+
+
+def store_game(date, home_team, away_team, home_score, away_score, home_win,
+               home_factors, away_factors, home_inactives=None, away_inactives=None):
+    """Insert a game with both teams' four factors and inactive lists in ONE transaction.
+
+    home_factors/away_factors are {'off_rtg':.., 'efg_pct':.., 'tov_pct':.., 'orb_pct':..}
+    as returned by pipeline/parsers.py:parse_four_factors. Either everything for the
+    game lands or nothing does, so a scraper killed mid-game never leaves a games row
+    without its team_stats (which would make game_exists() skip it forever).
+    Raises ValueError for a date in an archived season.
+    """
+    _check_season_open(date)
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    game_id = _insert_game(cursor, date, home_team, away_team, home_score, away_score, home_win)
+    _insert_team_stats(
+        cursor, game_id, home_team, 1,
+        home_factors['off_rtg'], away_factors['off_rtg'],
+        home_factors['efg_pct'], away_factors['efg_pct'],
+        home_factors['tov_pct'], away_factors['tov_pct'],
+        home_factors['orb_pct'], away_factors['orb_pct'],
+    )
+    _insert_team_stats(
+        cursor, game_id, away_team, 0,
+        away_factors['off_rtg'], home_factors['off_rtg'],
+        away_factors['efg_pct'], home_factors['efg_pct'],
+        away_factors['tov_pct'], home_factors['tov_pct'],
+        away_factors['orb_pct'], home_factors['orb_pct'],
+    )
+    if home_inactives:
+        _insert_game_injuries(cursor, game_id, home_team, home_inactives)
+    if away_inactives:
+        _insert_game_injuries(cursor, game_id, away_team, away_inactives)
+
+    conn.commit()
+    conn.close()
+    return game_id
+
+
+def _insert_game(cursor, date, home_team, away_team, home_score, away_score, home_win):
+    cursor.execute('''
+        INSERT OR IGNORE INTO games (date, home_team, away_team, home_score, away_score, home_win)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (date, home_team, away_team, home_score, away_score, home_win))
+
+    cursor.execute('''
+        SELECT id FROM games WHERE date = ? AND home_team = ? AND away_team = ?
+    ''', (date, home_team, away_team))
+    return cursor.fetchone()[0]
+
+
+def _insert_team_stats(cursor, game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
+                       tov_pct, opp_tov_pct, orb_pct, opp_orb_pct):
+    cursor.execute('''
+        INSERT INTO team_stats (
+            game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
+            tov_pct, opp_tov_pct, orb_pct, opp_orb_pct, date
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT date FROM games WHERE id = ?))
+        ON CONFLICT(game_id, team) DO UPDATE SET
+            is_home=excluded.is_home, off_rtg=excluded.off_rtg, opp_off_rtg=excluded.opp_off_rtg,
+            efg_pct=excluded.efg_pct, opp_efg_pct=excluded.opp_efg_pct,
+            tov_pct=excluded.tov_pct, opp_tov_pct=excluded.opp_tov_pct,
+            orb_pct=excluded.orb_pct, opp_orb_pct=excluded.opp_orb_pct
+    ''', (game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct,
+          tov_pct, opp_tov_pct, orb_pct, opp_orb_pct, game_id))
+
+
+def _insert_game_injuries(cursor, game_id, team, players):
     cursor.executemany('''
-        INSERT INTO game_injuries (game_id, team, player) VALUES (?, ?, ?)
+        INSERT OR IGNORE INTO game_injuries (game_id, team, player) VALUES (?, ?, ?)
     ''', [(game_id, team, player) for player in players])
 
+
+def get_stored_matchups(date):
+    """Set of (home_team, away_team) already stored for a date -- one query per scoreboard."""
+    conn = connect_read(dates=[date])
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT home_team, away_team FROM games WHERE date = ?', (date,))
+    results = set(cursor.fetchall())
+    conn.close()
+    return results
+
+
+def record_ingest_date(date, games_found, games_stored, scraped_at):
+    """Record the outcome of scraping one scoreboard date.
+
+    A date is complete once every game on its scoreboard is stored (days with no
+    games are complete with 0/0). Incomplete dates -- e.g. a box score missing its
+    four-factors table -- are retried by the next run.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        INSERT INTO ingest_state (date, games_found, games_stored, complete, scraped_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            games_found=excluded.games_found, games_stored=excluded.games_stored,
+            complete=excluded.complete, scraped_at=excluded.scraped_at
+    ''', (date, games_found, games_stored, 1 if games_stored >= games_found else 0, scraped_at))
+
     conn.commit()
     conn.close()
 
 
+def get_completed_ingest_dates(start, end):
+    """Set of dates in [start, end] whose scoreboard has been fully ingested."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT date FROM ingest_state WHERE date BETWEEN ? AND ? AND complete = 1
+    ''', (start, end))
+
+    results = {row[0] for row in cursor.fetchall()}
+    conn.close()
+    return results
+
+
+def get_incomplete_ingest_dates():
+    """Dates that were scraped but still have games missing, oldest first."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT date FROM ingest_state WHERE complete = 0 ORDER BY date')
+    results = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return results
+
+
+def get_ingest_resume_date():
+    """Earliest scoreboard date a catch-up run has to (re)scrape, or None if nothing has been ingested yet.
+
+    That's the oldest date in ingest_state's span that is incomplete or has no
+    row at all (a run that crashed partway through a date stores some of its
+    games but never records it), else the day after the last recorded date.
+    Only a database with no ingest_state rows -- one populated before the table
+    existed, e.g. by pipeline/backfill_local_html.py -- falls back to games, and
+    resumes at its latest game date, since that date may be only partly stored.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    first = cursor.execute('SELECT MIN(date) FROM ingest_state').fetchone()[0]
+    last = cursor.execute('SELECT MAX(date) FROM ingest_state').fetchone()[0]
+    if first is None:
+        latest_game = cursor.execute('SELECT MAX(date) FROM games').fetchone()[0]
+        conn.close()
+        return latest_game
+    conn.close()
+
+    completed = get_completed_ingest_dates(first, last)
+    day = datetime.strptime(first, '%Y-%m-%d')
+    while True:
+        date = day.strftime('%Y-%m-%d')
+        if date not in completed:
+            return date
+        day += timedelta(days=1)
+
+
 def upsert_player_season_stats(team, player, season, ppg, rpg, apg, spg, bpg, vorp, ws, scraped_at):
     """Insert or update a player's season stats (keyed on team, player, season)."""
     conn = sqlite3.connect(DB_PATH)
@@ -186,7 +509,7 @@ def upsert_player_season_stats(team, player, season, ppg, rpg, apg, spg, bpg, vo
 
 def get_player_season_stats(team, season):
     """Get all player season stats for a team/season."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(partitioned=False)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -201,7 +524,7 @@ def get_player_season_stats(team, season):
 
 def get_latest_player_season_stats(team):
     """Get player season stats for a team's most recently scraped season."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(partitioned=False)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -219,7 +542,7 @@ def get_latest_player_season_stats(team):
 
 def get_game_injuries(game_id, team):
     """Get the inactive-player list for a team in a specific game."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(game_ids=[game_id])
     cursor = conn.cursor()
 
     cursor.execute('SELECT player FROM game_injuries WHERE game_id = ? AND team = ?', (game_id, team))
@@ -243,9 +566,125 @@ def replace_current_injuries(team, players, scraped_at):
     conn.close()
 
 
+def get_team_page_hash(team, season):
+    """Stored payload hash for a team page, or None if it has never been scraped."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT payload_hash FROM team_page_state WHERE team = ? AND season = ?', (team, season))
+    result = cursor.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+
+def replace_team_page(team, season, player_rows, injuries, payload_hash, scraped_at):
+    """Write a changed team page (player season stats + current injuries) in one transaction.
+
+    player_rows are (player, ppg, rpg, apg, spg, bpg, vorp, ws) tuples; the page's
+    payload_hash is stored alongside so unchanged pages can be skipped next time.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.executemany('''
+        INSERT INTO player_season_stats (team, player, season, ppg, rpg, apg, spg, bpg, vorp, ws, scraped_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(team, player, season) DO UPDATE SET
+            ppg=excluded.ppg, rpg=excluded.rpg, apg=excluded.apg, spg=excluded.spg, bpg=excluded.bpg,
+            vorp=excluded.vorp, ws=excluded.ws, scraped_at=excluded.scraped_at
+    ''', [(team, row[0], season, *row[1:], scraped_at) for row in player_rows])
+
+    cursor.execute('DELETE FROM current_injuries WHERE team = ?', (team,))
+    if injuries:
+        cursor.executemany('''
+            INSERT INTO current_injuries (team, player, scraped_at) VALUES (?, ?, ?)
+        ''', [(team, player, scraped_at) for player in injuries])
+
+    cursor.execute('''
+        INSERT INTO team_page_state (team, season, payload_hash, changed_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(team, season) DO UPDATE SET
+            payload_hash=excluded.payload_hash, changed_at=excluded.changed_at
+    ''', (team, season, payload_hash, scraped_at))
+
+    conn.commit()
+    conn.close()
+
+
+def get_unscored_games(model_version):
+    """Stored games with no ledger row for a model version, oldest first.
+
+    Returns (id, date, home_team, away_team, home_win) rows.
+    """
+    conn = connect_read()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT g.id, g.date, g.home_team, g.away_team, g.home_win
+        FROM games g
+        WHERE NOT EXISTS (
+            SELECT 1 FROM prediction_ledger l WHERE l.model_version = ? AND l.game_id = g.id
+        )
+        ORDER BY g.date, g.id
+    ''', (model_version,))
+
+    results = cursor.fetchall()
+    conn.close()
+    return results
+
+
+def get_injuries_for_games(game_ids):
+    """Inactive lists for many games in one query: {(game_id, team): [player, ...]}."""
+    if not game_ids:
+        return {}
+
+    conn = connect_read(game_ids=game_ids)
+    cursor = conn.cursor()
+
+    placeholders = ','.join('?' * len(game_ids))
+    cursor.execute(f'''
+        SELECT game_id, team, player FROM game_injuries WHERE game_id IN ({placeholders})
+    ''', list(game_ids))
+
+    results = {}
+    for game_id, team, player in cursor.fetchall():
+        results.setdefault((game_id, team), []).append(player)
+    conn.close()
+    return results
+
+
+def insert_ledger_predictions(model_version, rows, scored_at):
+    """Store (game_id, date, home_team, away_team, home_win_prob, home_win) rows for a model version."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.executemany('''
+        INSERT INTO prediction_ledger (
+            model_version, game_id, date, home_team, away_team, home_win_prob, home_win, scored_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(model_version, game_id) DO UPDATE SET
+            home_win_prob=excluded.home_win_prob, home_win=excluded.home_win, scored_at=excluded.scored_at
+    ''', [(model_version, *row, scored_at) for row in rows])
+
+    conn.commit()
+    conn.close()
+
+
+def delete_other_ledger_versions(model_version):
+    """Drop ledger rows from every model version except this one. Returns rows deleted."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('DELETE FROM prediction_ledger WHERE model_version != ?', (model_version,))
+    deleted = cursor.rowcount
+
+    conn.commit()
+    conn.close()
+    return deleted
+
+
 def get_current_injuries(team):
     """Get a team's current injury report."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(partitioned=False)
     cursor = conn.cursor()
 
     cursor.execute('SELECT player FROM current_injuries WHERE team = ?', (team,))
@@ -254,11 +693,377 @@ def get_current_injuries(team):
     return results
 
 
+# ===== SEASON PARTITIONS =====
+# Closed seasons are moved out of DB_PATH into frozen, read-only per-season files
+# under data/seasons/ (see archive_season and pipeline/archive_seasons.py), so
+# nightly ingest and git diffs only touch the active season. connect_read()
+# attaches just the partitions a query's dates (or game ids) fall in, and
+# shadows games/team_stats/game_injuries with TEMP views that UNION ALL them with
+# main -- so read queries stay unqualified and each branch still uses its indexes.
+# A partition archived under an older schema is migrated (as a copy swapped in
+# atomically) the first time it's scanned, and writes to an archived season are
+# rejected rather than landing in main next to the partition's copy.
+
+SEASONS_DIR = str(Path(__file__).resolve().parent / 'data' / 'seasons')
+PARTITIONED_TABLES = ['games', 'team_stats', 'game_injuries']
+
+_partitions = {'key': None, 'partitions': []}
+
+
+def season_partition_path(season):
+    """Path of a season's frozen partition file, e.g. data/seasons/nba_2023-24.db."""
+    return os.path.join(SEASONS_DIR, f'nba_{season}.db')
+
+
+def is_archived_date(date):
+    """True when `date` falls in a season that has been moved into a partition."""
+    from config import get_season_label
+
+    return os.path.exists(season_partition_path(get_season_label(date)))
+
+
+def _check_season_open(date):
+    if is_archived_date(date):
+        raise ValueError(f'{date} is in an archived season; its games are frozen in a season partition')
+
+
+def migrate_partition(path):
+    """Bring a partition file up to SCHEMA_VERSION. Returns (from_version, to_version).
+
+    The migration runs on a copy that then replaces the file, so readers that
+    already have it open (immutable) keep a consistent file. Raises
+    RuntimeError if the partition can't be migrated.
+    """
+    conn = sqlite3.connect(f'{Path(path).as_uri()}?immutable=1', uri=True)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    conn.close()
+    if version == SCHEMA_VERSION:
+        return version, version
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f'Partition {path} is schema v{version}, newer than this code (v{SCHEMA_VERSION})')
+
+    tmp = f'{path}.tmp-{os.getpid()}'
+    shutil.copyfile(path, tmp)
+    os.chmod(tmp, 0o644)
+    try:
+        migrate_database(tmp)
+        conn = sqlite3.connect(tmp)
+        conn.execute('ANALYZE')
+        conn.commit()
+        conn.execute('VACUUM')
+        conn.close()
+    except Exception as e:
+        os.remove(tmp)
+        raise RuntimeError(f'Partition {path} could not be migrated from schema v{version}: {e}') from e
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, path)
+    return version, SCHEMA_VERSION
+
+
+def get_season_partitions():
+    """Frozen season partitions on disk, oldest first, with the date/game-id range each holds.
+
+    Re-read only when the seasons directory changes.
+    """
+    try:
+        key = os.stat(SEASONS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if key == _partitions['key']:
+        return _partitions['partitions']
+
+    paths = sorted(Path(SEASONS_DIR).glob('nba_*.db'))
+    for path in paths:
+        migrate_partition(path)
+    key = os.stat(SEASONS_DIR).st_mtime_ns  # a migrated partition was swapped in
+
+    partitions = []
+    for path in paths:
+        conn = sqlite3.connect(f'{path.as_uri()}?immutable=1', uri=True)
+        cursor = conn.cursor()
+        cursor.execute('SELECT season, min_date, max_date, min_game_id, max_game_id FROM partition_info')
+        season, min_date, max_date, min_game_id, max_game_id = cursor.fetchone()
+        columns = {
+            table: [row[1] for row in cursor.execute(f'PRAGMA table_info({table})')]
+            for table in PARTITIONED_TABLES
+        }
+        conn.close()
+        partitions.append({
+            'season': season, 'path': str(path), 'columns': columns,
+            'min_date': min_date, 'max_date': max_date,
+            'min_game_id': min_game_id, 'max_game_id': max_game_id,
+        })
+
+    _partitions.update(key=key, partitions=partitions)
+    return partitions
+
+
+def _partitions_for(dates=None, game_ids=None):
+    partitions = get_season_partitions()
+    if dates is not None:
+        if not dates:
+            return []
+        lo, hi = min(dates), max(dates)
+        partitions = [p for p in partitions if p['min_date'] <= hi and p['max_date'] >= lo]
+    if game_ids is not None:
+        if not game_ids:
+            return []
+        lo, hi = min(game_ids), max(game_ids)
+        partitions = [p for p in partitions if p['min_game_id'] <= hi and p['max_game_id'] >= lo]
+    return partitions
+
+
+def _connect_partitioned(partitions):
+    conn = sqlite3.connect(Path(DB_PATH).as_uri(), uri=True)
+    cursor = conn.cursor()
+    for i, partition in enumerate(partitions):
+        cursor.execute(f'ATTACH DATABASE ? AS season_{i}', (f"{Path(partition['path']).as_uri()}?immutable=1",))
+
+    for table in PARTITIONED_TABLES:
+        columns = [row[1] for row in cursor.execute(f'PRAGMA main.table_info({table})')]
+        selects = [f'SELECT {", ".join(columns)} FROM main.{table}']
+        for i, partition in enumerate(partitions):
+            # get_season_partitions() migrated every partition to main's schema
+            missing = set(columns) - set(partition['columns'][table])
+            if missing:
+                conn.close()
+                raise RuntimeError(f"Partition {partition['path']} lacks {table} columns {sorted(missing)}")
+            selects.append(f'SELECT {", ".join(columns)} FROM season_{i}.{table}')
+        cursor.execute(f'CREATE TEMP VIEW {table} AS {" UNION ALL ".join(selects)}')
+
+    return conn
+
+
+def archive_season(season):
+    """Move a closed season's games/team_stats/game_injuries out of DB_PATH into a frozen partition.
+
+    DB_PATH is migrated first; the partition is built from a VACUUM INTO copy
+    (so it keeps the same schema, indexes and user_version), verified
+    row-for-row, made read-only, and only then are the rows deleted from
+    DB_PATH. Returns {table: rows_moved}.
+    """
+    from config import get_season_bounds
+
+    migrate_database()
+    first_date, last_date = get_season_bounds(season)
+    dest = season_partition_path(season)
+    if os.path.exists(dest):
+        raise ValueError(f'Season {season} is already archived at {dest}')
+
+    os.makedirs(SEASONS_DIR, exist_ok=True)
+    tmp = f'{dest}.tmp-{os.getpid()}'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    in_season = 'SELECT id FROM games WHERE date BETWEEN ? AND ?'
+    expected = {
+        'games': cursor.execute('SELECT COUNT(*) FROM games WHERE date BETWEEN ? AND ?', (first_date, last_date)).fetchone()[0],
+        'team_stats': cursor.execute(f'SELECT COUNT(*) FROM team_stats WHERE game_id IN ({in_season})', (first_date, last_date)).fetchone()[0],
+        'game_injuries': cursor.execute(f'SELECT COUNT(*) FROM game_injuries WHERE game_id IN ({in_season})', (first_date, last_date)).fetchone()[0],
+    }
+    if expected['games'] == 0:
+        conn.close()
+        return expected
+    cursor.execute('VACUUM INTO ?', (tmp,))
+
+    part = sqlite3.connect(tmp)
+    part_cursor = part.cursor()
+    part_cursor.execute(f'DELETE FROM game_injuries WHERE game_id NOT IN ({in_season})', (first_date, last_date))
+    part_cursor.execute(f'DELETE FROM team_stats WHERE game_id NOT IN ({in_season})', (first_date, last_date))
+    part_cursor.execute('DELETE FROM games WHERE date NOT BETWEEN ? AND ?', (first_date, last_date))
+    tables = [row[0] for row in part_cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()]
+    for table in tables:
+        if table not in PARTITIONED_TABLES:
+            part_cursor.execute(f'DROP TABLE {table}')
+
+    actual = {table: part_cursor.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in PARTITIONED_TABLES}
+    version = part_cursor.execute('PRAGMA user_version').fetchone()[0]
+    if version != SCHEMA_VERSION:
+        part.close()
+        os.remove(tmp)
+        conn.close()
+        raise RuntimeError(f'Partition for {season} is schema v{version}, expected v{SCHEMA_VERSION}')
+    if actual != expected:
+        part.close()
+        os.remove(tmp)
+        conn.close()
+        raise RuntimeError(f'Partition row counts {actual} do not match source {expected} for {season}')
+
+    part_cursor.execute('''
+        CREATE TABLE partition_info (
+            season TEXT NOT NULL, min_date TEXT NOT NULL, max_date TEXT NOT NULL,
+            min_game_id INTEGER NOT NULL, max_game_id INTEGER NOT NULL, frozen_at TEXT NOT NULL
+        )
+    ''')
+    part_cursor.execute('''
+        INSERT INTO partition_info
+        SELECT ?, MIN(date), MAX(date), MIN(id), MAX(id), datetime('now') FROM games
+    ''', (season,))
+    part.commit()
+    part_cursor.execute('ANALYZE')
+    part.commit()
+    part_cursor.execute('VACUUM')
+    part.close()
+
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, dest)
+
+    cursor.execute(f'DELETE FROM game_injuries WHERE game_id IN ({in_season})', (first_date, last_date))
+    cursor.execute(f'DELETE FROM team_stats WHERE game_id IN ({in_season})', (first_date, last_date))
+    cursor.execute('DELETE FROM games WHERE date BETWEEN ? AND ?', (first_date, last_date))
+    conn.commit()
+    cursor.execute('VACUUM')
+    conn.close()
+    return expected
+
+
+# ===== SERVING SNAPSHOT =====
+# The pipeline mutates (and git-commits) DB_PATH; the API instead reads an
+# immutable snapshot of it (with every season partition folded back in). By
+# default read functions use DB_PATH + partitions (what the pipeline scripts
+# want); backend/app.py calls use_serving_snapshot() at startup to switch them
+# to the snapshot, either opened with immutable=1 (no locking or journal checks)
+# or copied into a shared in-memory database with the backup API. A new snapshot
+# file (swapped in atomically by build_snapshot.py) is picked up on the next
+# read after it lands.
+
+_SNAPSHOT_CHECK_INTERVAL = 1.0  # seconds between stat() calls on the snapshot file
+
+_serving = None
+_serving_lock = threading.Lock()
+_reload_hooks = []
+
+
+def use_serving_snapshot(in_memory=True):
+    """Route read functions to the serving snapshot (falls back to DB_PATH if none is built yet)."""
+    global _serving
+    with _serving_lock:
+        _serving = {
+            'in_memory': in_memory,
+            'source': None,
+            'uri': None,
+            'holder': None,
+            'retired': None,
+            'generation': 0,
+            'checked_at': 0.0,
+            'pid': os.getpid(),
+        }
+    _refresh_serving_snapshot(force=True)
+
+
+def on_snapshot_reload(hook):
+    """Register a callable to run whenever a new snapshot is loaded (e.g. an lru_cache's cache_clear)."""
+    _reload_hooks.append(hook)
+    return hook
+
+
+def get_serving_info():
+    """Which file the API is reading and how (None when reading DB_PATH directly)."""
+    if _serving is None:
+        return None
+    return {
+        'path': SERVING_DB_PATH if _serving['uri'] else DB_PATH,
+        'in_memory': _serving['in_memory'] and _serving['uri'] is not None,
+        'generation': _serving['generation'],
+    }
+
+
+def get_data_version():
+    """Identifier for the data reads currently see -- changes whenever that data may have.
+
+    Stable across processes and restarts for the same files, so it can key
+    persistent caches (the snapshot file's identity when serving from one,
+    otherwise DB_PATH's and the season directory's modification stamps).
+    """
+    if _serving is not None:
+        _refresh_serving_snapshot()
+        if _serving['uri'] is not None:
+            return 'snapshot:{}:{}:{}'.format(*_serving['source'])
+    st = os.stat(DB_PATH)
+    try:
+        seasons_mtime = os.stat(SEASONS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        seasons_mtime = 0
+    return f'db:{st.st_mtime_ns}:{st.st_size}:{seasons_mtime}'
+
+
+def _refresh_serving_snapshot(force=False):
+    now = time.monotonic()
+    # A forked worker (gunicorn preload_app) must not share the parent's in-memory
+    # connection; it loads its own copy on first use
+    forked = _serving['pid'] != os.getpid()
+    if not force and not forked and now - _serving['checked_at'] < _SNAPSHOT_CHECK_INTERVAL:
+        return
+
+    with _serving_lock:
+        _serving['checked_at'] = now
+        try:
+            st = os.stat(SERVING_DB_PATH)
+            source = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            source = None
+        forked = _serving['pid'] != os.getpid()
+        if source == _serving['source'] and not (forked and _serving['holder'] is not None):
+            _serving['pid'] = os.getpid()
+            return
+
+        # The replaced in-memory database stays open until the next reload, so a
+        # reader that just read the old uri can still connect to it; the one
+        # retired last time is closed now
+        old_holder = _serving['retired']
+        _serving['retired'] = _serving['holder']
+        generation = _serving['generation'] + 1
+        if source is None:
+            # No snapshot built yet -- read DB_PATH (and its partitions) directly.
+            _serving.update(uri=None, holder=None)
+        elif _serving['in_memory']:
+            uri = f'file:nba_serving_{os.getpid()}_{generation}?mode=memory&cache=shared'
+            # The holder connection keeps the shared in-memory database alive.
+            holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            disk = sqlite3.connect(f'file:{SERVING_DB_PATH}?mode=ro', uri=True)
+            disk.backup(holder)
+            disk.close()
+            _serving.update(uri=uri, holder=holder)
+        else:
+            _serving.update(uri=f'file:{SERVING_DB_PATH}?immutable=1', holder=None)
+        _serving.update(source=source, generation=generation, pid=os.getpid())
+
+    if old_holder is not None:
+        old_holder.close()
+    for hook in _reload_hooks:
+        hook()
+
+
+def connect_read(dates=None, game_ids=None, partitioned=True):
+    """Connection for read queries.
+
+    Serving (after use_serving_snapshot) reads the snapshot, which already holds
+    every season. Otherwise reads DB_PATH, attaching only the season partitions
+    that `dates` / `game_ids` fall in (all of them if neither is given, none if
+    partitioned=False -- for tables that aren't partitioned).
+    """
+    if _serving is not None:
+        _refresh_serving_snapshot()
+        with _serving_lock:
+            uri = _serving['uri']
+        if uri is not None:
+            return sqlite3.connect(uri, uri=True)
+
+    partitions = _partitions_for(dates, game_ids) if partitioned else []
+    if not partitions:
+        return sqlite3.connect(DB_PATH)
+    return _connect_partitioned(partitions)
+
+
 # ===== READ FUNCTIONS =====
 
 def get_team_stats_for_dates(team, dates, metric_name):
     """Get team stats for specific dates and metric."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(dates=dates)
     cursor = conn.cursor()
     
     # Map metric names to column names
@@ -277,11 +1082,10 @@ def get_team_stats_for_dates(team, dates, metric_name):
     # Build query with date list
     placeholders = ','.join('?' * len(dates))
     query = f'''
-        SELECT g.date, ts.{team_col}, ts.{opp_col}
-        FROM team_stats ts
-        JOIN games g ON ts.game_id = g.id
-        WHERE ts.team = ? AND g.date IN ({placeholders})
-        ORDER BY g.date
+        SELECT date, {team_col}, {opp_col}
+        FROM team_stats
+        WHERE team = ? AND date IN ({placeholders})
+        ORDER BY date
     '''
     
     cursor.execute(query, [team] + dates)
@@ -302,17 +1106,270 @@ def get_team_stats_for_dates(team, dates, metric_name):
     return metrics
 
 
+def get_games_in_range(start, end):
+    """All stored games between two dates (inclusive), oldest first.
+
+    Returns (id, date, home_team, away_team, home_score, away_score, home_win) rows.
+    """
+    conn = connect_read(dates=[start, end])
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT id, date, home_team, away_team, home_score, away_score, home_win
+        FROM games
+        WHERE date BETWEEN ? AND ?
+        ORDER BY date, id
+    ''', (start, end))
+
+    results = cursor.fetchall()
+    conn.close()
+    return results
+
+
+def get_latest_game_date():
+    """Date of the most recent stored game (None if there are none)."""
+    conn = connect_read()
+    cursor = conn.cursor()
+    cursor.execute('SELECT MAX(date) FROM games')
+    result = cursor.fetchone()[0]
+    conn.close()
+    return result
+
+
+def get_history_fingerprints():
+    """Running fingerprint of the stored game history: [(game date, fingerprint)], oldest first.
+
+    A date's fingerprint covers every game, four-factors row and inactive list
+    dated on or before it, so it changes when any of those is added, removed or
+    rewritten -- a backfill, a re-scrape finishing a partly stored date, a
+    restored season -- but not when later games are appended. Whole-table
+    summary (grouped index scans); callers compute it once per data version.
+    """
+    conn = connect_read()
+    cursor = conn.cursor()
+    games = cursor.execute('SELECT date, COUNT(*), SUM(id) FROM games GROUP BY date').fetchall()
+    stats = {date: (n, total) for date, n, total in cursor.execute('''
+        SELECT g.date, COUNT(*), TOTAL(t.off_rtg + t.opp_off_rtg + t.efg_pct + t.opp_efg_pct
+                                       + t.tov_pct + t.opp_tov_pct + t.orb_pct + t.opp_orb_pct)
+        FROM team_stats t JOIN games g ON g.id = t.game_id
+        GROUP BY g.date
+    ''')}
+    injuries = {date: (n, id_sum) for date, n, id_sum in cursor.execute('''
+        SELECT g.date, COUNT(*), SUM(i.id)
+        FROM game_injuries i JOIN games g ON g.id = i.game_id
+        GROUP BY g.date
+    ''')}
+    conn.close()
+
+    running = [0, 0, 0, 0.0, 0, 0]
+    fingerprints = []
+    for date, n_games, game_ids in games:
+        n_stats, stat_total = stats.get(date, (0, 0.0))
+        n_injuries, injury_ids = injuries.get(date, (0, 0))
+        for i, value in enumerate((n_games, game_ids, n_stats, stat_total, n_injuries, injury_ids)):
+            running[i] += value
+        fingerprints.append((date, '{}.{}.{}.{:.4f}.{}.{}'.format(*running)))
+    return fingerprints
+
+
+def get_team_input_stamps():
+    """Per-team fingerprint of the live prediction inputs: player stats scrape time and injury list.
+
+    Returns {team: (latest player_season_stats scraped_at, sorted injured players)};
+    a team's entry changes exactly when pipeline/scrape_teams.py rewrote its page.
+    """
+    conn = connect_read(partitioned=False)
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT team, MAX(scraped_at) FROM player_season_stats GROUP BY team')
+    stamps = {team: (scraped_at, ()) for team, scraped_at in cursor.fetchall()}
+    cursor.execute('SELECT team, player FROM current_injuries ORDER BY team, player')
+    injuries = {}
+    for team, player in cursor.fetchall():
+        injuries.setdefault(team, []).append(player)
+    conn.close()
+
+    for team, players in injuries.items():
+        stamps[team] = (stamps.get(team, (None,))[0], tuple(players))
+    return stamps
+
+
+def get_team_timeline(team, start, end):
+    """A team's per-game four factors and results between two dates (inclusive), oldest first.
+
+    Returns (date, won, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct, tov_pct,
+    opp_tov_pct, orb_pct, opp_orb_pct) rows; won is None when the result isn't stored.
+    """
+    conn = connect_read(dates=[start, end])
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT ts.date,
+               CASE WHEN g.home_win IS NULL THEN NULL ELSE g.home_win = ts.is_home END,
+               ts.off_rtg, ts.opp_off_rtg, ts.efg_pct, ts.opp_efg_pct,
+               ts.tov_pct, ts.opp_tov_pct, ts.orb_pct, ts.opp_orb_pct
+        FROM team_stats ts
+        JOIN games g ON g.id = ts.game_id
+        WHERE ts.team = ? AND ts.date BETWEEN ? AND ?
+        ORDER BY ts.date
+    ''', (team, start, end))
+
+    results = cursor.fetchall()
+    conn.close()
+    return results
+
+
+def get_head_to_head(team_a, team_b, start='0000-00-00', end='9999-12-31', model_version=None):
+    """Every stored meeting between two teams (either side at home), newest first.
+
+    One range lookup on the unordered-pair index. Returns (id, date, home_team,
+    away_team, home_score, away_score, home_win, home four factors (off_rtg,
+    efg_pct, tov_pct, orb_pct), away four factors, home_win_prob) rows, where
+    home_win_prob is `model_version`'s ledger prediction (None if not scored).
+    """
+    conn = connect_read(dates=[start, end])
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT g.id, g.date, g.home_team, g.away_team, g.home_score, g.away_score, g.home_win,
+               h.off_rtg, h.efg_pct, h.tov_pct, h.orb_pct,
+               a.off_rtg, a.efg_pct, a.tov_pct, a.orb_pct,
+               l.home_win_prob
+        FROM games g
+        LEFT JOIN team_stats h ON h.game_id = g.id AND h.team = g.home_team
+        LEFT JOIN team_stats a ON a.game_id = g.id AND a.team = g.away_team
+        LEFT JOIN prediction_ledger l ON l.model_version = ? AND l.game_id = g.id
+        WHERE min(g.home_team, g.away_team) = ? AND max(g.home_team, g.away_team) = ?
+          AND g.date BETWEEN ? AND ?
+        ORDER BY g.date DESC
+    ''', (model_version, min(team_a, team_b), max(team_a, team_b), start, end))
+
+    results = cursor.fetchall()
+    conn.close()
+    return results
+
+
+def iter_games_in_range(start, end, team=None, home=None, away=None, chunk_size=250, first_chunk_size=None):
+    """Yield stored games between two dates in chunks, oldest first, without loading the whole range.
+
+    Optional filters: team (either side), home, away. Yields lists of
+    (id, date, home_team, away_team, home_score, away_score, home_win) rows; the
+    first chunk can be smaller so streaming callers get rows out quickly.
+    """
+    conn = connect_read(dates=[start, end])
+    cursor = conn.cursor()
+
+    clauses, params = ['date BETWEEN ? AND ?'], [start, end]
+    if team:
+        clauses.append('(home_team = ? OR away_team = ?)')
+        params += [team, team]
+    if home:
+        clauses.append('home_team = ?')
+        params.append(home)
+    if away:
+        clauses.append('away_team = ?')
+        params.append(away)
+
+    try:
+        cursor.execute(f'''
+            SELECT id, date, home_team, away_team, home_score, away_score, home_win
+            FROM games
+            WHERE {' AND '.join(clauses)}
+            ORDER BY date, id
+        ''', params)
+
+        size = first_chunk_size or chunk_size
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            yield rows
+            size = chunk_size
+    finally:
+        conn.close()
+
+
+def _ledger_filter(model_version, team, start, end):
+    clauses, params = ['model_version = ?'], [model_version]
+    if start:
+        clauses.append('date >= ?')
+        params.append(start)
+    if end:
+        clauses.append('date <= ?')
+        params.append(end)
+    where = ' AND '.join(clauses)
+    if team:
+        # Two index range lookups (home side, away side) instead of an OR over one
+        return f'''
+            SELECT * FROM prediction_ledger WHERE {where} AND home_team = ?
+            UNION ALL
+            SELECT * FROM prediction_ledger WHERE {where} AND away_team = ?
+        ''', params + [team] + params + [team]
+    return f'SELECT * FROM prediction_ledger WHERE {where}', params
+
+
+def get_ledger_page(model_version, team=None, start=None, end=None, limit=50, offset=0):
+    """One page of ledger rows (newest first) plus the total matching count.
+
+    Returns (rows, total), rows being (game_id, date, home_team, away_team, home_win_prob, home_win).
+    """
+    conn = connect_read(partitioned=False)
+    cursor = conn.cursor()
+
+    query, params = _ledger_filter(model_version, team, start, end)
+    cursor.execute(f'SELECT COUNT(*) FROM ({query})', params)
+    total = cursor.fetchone()[0]
+
+    cursor.execute(f'''
+        SELECT game_id, date, home_team, away_team, home_win_prob, home_win
+        FROM ({query})
+        ORDER BY date DESC, game_id DESC
+        LIMIT ? OFFSET ?
+    ''', params + [limit, offset])
+
+    results = cursor.fetchall()
+    conn.close()
+    return results, total
+
+
+def get_ledger_accuracy(model_version, team=None, start=None, end=None, windows=(10, 50, 100)):
+    """Accuracy and Brier score over the filtered ledger, overall and for the most recent N games."""
+    conn = connect_read(partitioned=False)
+    cursor = conn.cursor()
+
+    query, params = _ledger_filter(model_version, team, start, end)
+    scored = f'''
+        SELECT date, game_id,
+               CASE WHEN (home_win_prob > 0.5) = (home_win = 1) THEN 1.0 ELSE 0.0 END AS correct,
+               (home_win_prob - home_win) * (home_win_prob - home_win) AS squared_error
+        FROM ({query}) WHERE home_win IS NOT NULL
+    '''
+    cursor.execute(f'SELECT COUNT(*), AVG(correct), AVG(squared_error) FROM ({scored})', params)
+    games, accuracy, brier = cursor.fetchone()
+
+    recent = {}
+    for window in windows:
+        cursor.execute(f'''
+            SELECT AVG(correct) FROM (
+                SELECT correct FROM ({scored}) ORDER BY date DESC, game_id DESC LIMIT ?
+            )
+        ''', params + [window])
+        recent[window] = cursor.fetchone()[0]
+
+    conn.close()
+    return {'games': games, 'accuracy': accuracy, 'brier_score': brier, 'recent_accuracy': recent}
+
+
 def get_all_dates_for_team(team):
     """Get all dates where team played."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read()
     cursor = conn.cursor()
     
     cursor.execute('''
-        SELECT DISTINCT g.date
-        FROM team_stats ts
-        JOIN games g ON ts.game_id = g.id
-        WHERE ts.team = ?
-        ORDER BY g.date
+        SELECT DISTINCT date
+        FROM team_stats
+        WHERE team = ?
+        ORDER BY date
     ''', (team,))
     
     results = [row[0] for row in cursor.fetchall()]
@@ -322,7 +1379,7 @@ def get_all_dates_for_team(team):
 
 def get_home_win(date, home, away):
     """Get if home team won."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(dates=[date])
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -344,14 +1401,13 @@ def check_back_to_back(date, team):
     date_obj = datetime.strptime(date, "%Y-%m-%d")
     previous_date = (date_obj - timedelta(days=1)).strftime("%Y-%m-%d")
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_read(dates=[previous_date])
     cursor = conn.cursor()
     
     cursor.execute('''
         SELECT COUNT(*)
-        FROM team_stats ts
-        JOIN games g ON ts.game_id = g.id
-        WHERE ts.team = ? AND g.date = ?
+        FROM team_stats
+        WHERE team = ? AND date = ?
     ''', (team, previous_date))
     
     result = cursor.fetchone()
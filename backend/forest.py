@@ -0,0 +1,153 @@
+"""Vectorized per-prediction feature contributions and uncertainty for the RandomForest.
+
+Tree-path (Saabas) decomposition: walking a tree from root to leaf, every
+split moves the node's home-win fraction from the parent's value to the
+child's, and that change is credited to the feature the parent split on. A
+prediction is then exactly
+
+    home_win_prob = bias + sum(contributions)
+
+where bias is the forest's mean root value (the training home-win rate).
+
+Nothing here walks trees per request. Once per model, every node of every tree
+gets its home-win fraction and its root-to-node contribution vector, stored in
+flat arrays indexed by a forest-wide node id. A batch of rows then needs one
+rf.apply() call (the leaf each row lands in, for all trees at once) and a
+gather + sum over those leaves -- which yields the probability and the
+contributions from the same pass.
+
+The same leaf ids give every tree's own home-win probability (one gather), so
+the spread of the trees' votes -- standard deviation, quantiles, and a
+bootstrap interval for the forest average (trees resampled with replacement,
+done as one matrix product with multinomial resampling weights) -- costs no
+extra pass over the trees either.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# id(model) -> (model, tables); the model is kept so its id can't be reused
+_table_cache = {}
+
+SPREAD_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+BOOTSTRAP_SAMPLES = 1000
+BOOTSTRAP_INTERVAL = 0.9
+
+
+def _home_win_column(rf_model):
+    return list(rf_model.classes_).index(1)
+
+
+def _build_tables(rf_model):
+    """Flat per-node arrays for the whole forest (see module docstring)."""
+    home_win_col = _home_win_column(rf_model)
+    n_features = rf_model.n_features_in_
+    offsets, node_values, path_contributions, roots = [], [], [], []
+    offset = 0
+
+    for estimator in rf_model.estimators_:
+        tree = estimator.tree_
+        # tree.value holds class counts or fractions depending on the sklearn version
+        value = tree.value[:, 0, :]
+        values = value[:, home_win_col] / value.sum(axis=1)
+
+        # Nodes are stored in depth-first order, so a parent always precedes its children
+        contributions = np.zeros((tree.node_count, n_features))
+        for node in np.flatnonzero(tree.children_left >= 0):
+            feature = tree.feature[node]
+            for child in (tree.children_left[node], tree.children_right[node]):
+                contributions[child] = contributions[node]
+                contributions[child, feature] += values[child] - values[node]
+
+        offsets.append(offset)
+        node_values.append(values)
+        path_contributions.append(contributions)
+        roots.append(values[0])
+        offset += tree.node_count
+
+    return {
+        'offsets': np.array(offsets),
+        'node_values': np.concatenate(node_values),
+        'path_contributions': np.concatenate(path_contributions),
+        'bias': float(np.mean(roots)),
+    }
+
+
+def forest_tables(rf_model):
+    """Per-node lookup tables for `rf_model`, built on first use and cached."""
+    cached = _table_cache.get(id(rf_model))
+    if cached is None or cached[0] is not rf_model:
+        cached = (rf_model, _build_tables(rf_model))
+        _table_cache[id(rf_model)] = cached
+    return cached[1]
+
+
+def leaf_ids(rf_model, features):
+    """(n_rows x n_trees) forest-wide node ids of the leaf each row reaches in each tree."""
+    return rf_model.apply(features) + forest_tables(rf_model)['offsets']
+
+
+def feature_contributions(rf_model, features, leaves=None):
+    """
+    Tree-path contributions to the home-win probability for a batch of rows.
+
+    Args:
+        rf_model: Fitted RandomForestClassifier
+        features: Feature matrix / DataFrame, one row per game
+        leaves: leaf_ids() for `features`, if already computed
+
+    Returns:
+        (probabilities, bias, contributions): home-win probability per row (as
+        predict_proba computes it), the forest's base rate, and an
+        (n_rows x n_features) array with probabilities ~= bias + contributions.sum(axis=1)
+    """
+    tables = forest_tables(rf_model)
+    if leaves is None:
+        leaves = leaf_ids(rf_model, features)
+    n_trees = leaves.shape[1]
+    probabilities = tables['node_values'][leaves].mean(axis=1)
+    contributions = tables['path_contributions'][leaves].sum(axis=1) / n_trees
+    return probabilities, tables['bias'], contributions
+
+
+def tree_probabilities(rf_model, features, leaves=None):
+    """(n_rows x n_trees) home-win probability from each individual tree; the row mean is predict_proba."""
+    if leaves is None:
+        leaves = leaf_ids(rf_model, features)
+    return forest_tables(rf_model)['node_values'][leaves]
+
+
+@lru_cache(maxsize=4)
+def _bootstrap_weights(n_trees, samples, seed):
+    """(n_trees x samples) resampling weights: column b counts how often each tree is drawn in replicate b."""
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n_trees, np.full(n_trees, 1 / n_trees), size=samples)
+    return counts.T / n_trees
+
+
+def probability_spread(tree_probs, quantiles=SPREAD_QUANTILES, samples=BOOTSTRAP_SAMPLES,
+                       interval=BOOTSTRAP_INTERVAL, seed=0):
+    """
+    Spread of the per-tree probabilities for each row.
+
+    Args:
+        tree_probs: (n_rows x n_trees) array from tree_probabilities()
+        quantiles: Quantiles of the tree votes to report
+        samples: Bootstrap replicates of the forest average
+        interval: Central coverage of the bootstrap interval
+        seed: Resampling seed (fixed, so a game always gets the same interval)
+
+    Returns:
+        dict of arrays: 'std' (n_rows,), 'quantiles' (n_rows x len(quantiles)),
+        'interval_low' / 'interval_high' (n_rows,)
+    """
+    boot = tree_probs @ _bootstrap_weights(tree_probs.shape[1], samples, seed)
+    tail = (1 - interval) / 2
+    low, high = np.quantile(boot, [tail, 1 - tail], axis=1)
+    return {
+        'std': tree_probs.std(axis=1),
+        'quantiles': np.quantile(tree_probs, quantiles, axis=1).T,
+        'interval_low': low,
+        'interval_high': high,
+    }
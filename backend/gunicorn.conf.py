@@ -0,0 +1,38 @@
+"""gunicorn settings: load everything once in the master, warm each worker before it serves.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+preload_app imports app.py in the master -- modules, serving snapshot, model
+and forest tables -- and the workers share that memory copy-on-write instead
+of each loading it again. Every worker then runs startup.warm_up() before
+accepting connections. Phase timings for the master and each worker are
+logged and served under "startup" in /health.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Threaded workers: long-lived responses (/api/predict/events) would otherwise
+# hold the whole worker past `timeout` and get it killed. Each still holds a
+# thread, so admission.py caps subscriptions at a quarter of these, and all
+# gated requests together leave RESERVED_THREADS free for the cheap routes.
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 120
+preload_app = True
+
+
+def when_ready(server):
+    # Objects loaded so far live for the whole process; keeping the collector off
+    # them stops its bookkeeping writes from un-sharing the workers' pages
+    gc.freeze()
+    import startup
+    server.log.info("Master ready after %.0f ms", startup.timings()['total_ms'])
+
+
+def post_worker_init(worker):
+    import app
+    import startup
+    startup.warm_up(app.model_data)
+    worker.log.info("Worker %s warmed up", worker.pid)
@@ -1,20 +1,44 @@
 """ML model loading and prediction functions for API."""
 
+import hashlib
 import pickle
 from datetime import datetime
-from functools import lru_cache
 from pathlib import Path
 
+# numpy / pandas / forest are imported up front, not per call: under a preloaded
+# gunicorn master (gunicorn.conf.py) the import cost is paid once, before fork
+import numpy as np
+import pandas as pd
+
 # Import from current directory (backend folder)
+from cache import SingleFlight, TieredCache
 from config import TEAM_TO_ABBR
+from database import get_injuries_for_games
 from data import (
-    get_input_format, get_avg_rtgs, get_avg_efgs, get_avg_tovs, get_avg_orbs,
+    get_team_form, combine_form,
     get_current_team_injuries, get_injury_value, get_injury_advanced
 )
+from forest import (
+    SPREAD_QUANTILES, BOOTSTRAP_INTERVAL,
+    feature_contributions, forest_tables, leaf_ids, probability_spread, tree_probabilities
+)
 
 # Paths - use local files
 MODEL_PATH = str(Path(__file__).resolve().parent / 'models' / 'trained_model.pkl')
 
+DEFAULT_PREDICTION_DATE = "2025-04-14"
+
+# Feature column order the model was trained with (pipeline/train_model.py:FEATURE_COLUMNS)
+FEATURE_COLUMNS = [
+    'Home ORtg', 'Away ORtg', 'Home eFG%', 'Away eFG%',
+    'Home TOV%', 'Away TOV%', 'Home ORB%', 'Away ORB%',
+    'Home Injury Value', 'Away Injury Value',
+    'Home Injury Advanced', 'Away Injury Advanced',
+]
+
+# Concurrent requests for the same single-game prediction share one computation
+_prediction_flight = SingleFlight()
+
 # Global cache for the loaded model (injuries/player stats now come straight from the
 # DB, refreshed by pipeline/scrape_teams.py, so no separate request-time cache is needed)
 _model_cache = None
@@ -29,7 +53,10 @@ def load_model():
     
     try:
         with open(MODEL_PATH, 'rb') as f:
-            model_data = pickle.load(f)
+            raw = f.read()
+        model_data = pickle.loads(raw)
+        # Content hash of the pickle -- identifies this model in the prediction ledger
+        model_data.setdefault('version', hashlib.sha256(raw).hexdigest()[:12])
         _model_cache = model_data
         return model_data
     except FileNotFoundError:
@@ -38,13 +65,30 @@ def load_model():
         raise Exception(f"Failed to load model: {e}")
 
 
-@lru_cache(maxsize=128)
+_team_stats_cache = TieredCache('matchup_team_stats')
+
+
 def get_cached_team_stats(date, home_team, away_team):
-    """Cache team stats for prediction."""
-    home_rtg, away_rtg = get_input_format(date, home_team, away_team, get_avg_rtgs)
-    home_efg, away_efg = get_input_format(date, home_team, away_team, get_avg_efgs)
-    home_tov, away_tov = get_input_format(date, home_team, away_team, get_avg_tovs)
-    home_orb, away_orb = get_input_format(date, home_team, away_team, get_avg_orbs)
+    """Cache team stats for prediction (built from per-team forms, shared across matchups and workers)."""
+    return _team_stats_cache.get_or_compute(
+        (date, home_team, away_team),
+        lambda: _matchup_team_stats(date, home_team, away_team),
+        final_date=date
+    )
+
+
+def is_matchup_cached(home_team, away_team, date=None):
+    """True if a matchup's team stats are already in memory, i.e. predicting it is cheap."""
+    return _team_stats_cache.peek((date or DEFAULT_PREDICTION_DATE, home_team, away_team))
+
+
+def _matchup_team_stats(date, home_team, away_team):
+    home_form = get_team_form(date, home_team)
+    away_form = get_team_form(date, away_team)
+    home_rtg, away_rtg = combine_form(home_form, away_form, 'off_rtg')
+    home_efg, away_efg = combine_form(home_form, away_form, 'efg_pct')
+    home_tov, away_tov = combine_form(home_form, away_form, 'tov_pct')
+    home_orb, away_orb = combine_form(home_form, away_form, 'orb_pct')
     
     return {
         'home_rtg': home_rtg,
@@ -58,6 +102,226 @@ def get_cached_team_stats(date, home_team, away_team):
     }
 
 
+def _validate_matchup(home_team, away_team, date):
+    """Validate teams/date and return the date to predict for."""
+    if home_team not in TEAM_TO_ABBR:
+        raise ValueError(f"Invalid home team: {home_team}. Must be a valid NBA city name.")
+    if away_team not in TEAM_TO_ABBR:
+        raise ValueError(f"Invalid away team: {away_team}. Must be a valid NBA city name.")
+
+    if date is None:
+        return DEFAULT_PREDICTION_DATE
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Date must be in YYYY-MM-DD format")
+    return date
+
+
+def build_feature_matrix(matchups, injuries=None):
+    """
+    Model input for many games at once.
+
+    Args:
+        matchups: list of (date, home_team, away_team)
+        injuries: optional list of (home_injured, away_injured) player lists, one per
+            matchup (e.g. a stored game's inactives); defaults to each team's current
+            injury report, as live serving uses
+
+    Returns:
+        DataFrame with FEATURE_COLUMNS, one row per matchup
+    """
+    current_injuries = {}
+
+    def injury_features(team, injured):
+        if injured is None:
+            if team not in current_injuries:
+                current_injuries[team] = get_current_team_injuries(team)
+            injured = current_injuries[team]
+        return get_injury_value(injured, team), get_injury_advanced(injured, team)
+
+    rows = []
+    for i, (date, home_team, away_team) in enumerate(matchups):
+        stats = get_cached_team_stats(date, home_team, away_team)
+        home_injured, away_injured = injuries[i] if injuries is not None else (None, None)
+        home_value, home_advanced = injury_features(home_team, home_injured)
+        away_value, away_advanced = injury_features(away_team, away_injured)
+        rows.append((
+            stats['home_rtg'], stats['away_rtg'], stats['home_efg'], stats['away_efg'],
+            stats['home_tov'], stats['away_tov'], stats['home_orb'], stats['away_orb'],
+            home_value, away_value, home_advanced, away_advanced,
+        ))
+
+    return pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+
+
+def predict_home_win_probabilities(model_data, matchups, injuries=None):
+    """Home-win probability for every matchup, from ONE predict_proba call over the batch.
+
+    Returns a NumPy array aligned with `matchups`.
+    """
+    if not matchups:
+        return np.empty(0)
+    rf_model = model_data['model']
+    features = build_feature_matrix(matchups, injuries)
+    home_win_col = list(rf_model.classes_).index(1)
+    return rf_model.predict_proba(features)[:, home_win_col]
+
+
+_stored_game_cache = TieredCache('stored_game_prediction')
+
+
+def predict_stored_games(model_data, games):
+    """
+    Pre-game home-win probabilities for games already in the DB, in one batched call.
+
+    Uses the same as-of-date features as live serving, but each game's actual
+    inactive list (game_injuries) instead of today's injury report. Results are
+    cached per (model version, game id) -- once the game's date is final, until
+    a game on or before it is written -- so repeated backtests over the same range skip the model entirely.
+
+    Args:
+        games: list of rows starting (game_id, date, home_team, away_team, ...)
+
+    Returns:
+        NumPy array of home-win probabilities aligned with `games`
+    """
+    version = model_data['version']
+    cached = _stored_game_cache.get_many([(version, game[0]) for game in games])
+    probs = np.array([cached.get((version, game[0]), np.nan) for game in games], dtype=float)
+
+    todo_index = [i for i, game in enumerate(games) if (version, game[0]) not in cached]
+    if todo_index:
+        todo = [games[i] for i in todo_index]
+        injuries = get_injuries_for_games([game[0] for game in todo])
+        matchups = [(date, home, away) for _, date, home, away, *_ in todo]
+        game_injuries = [
+            (injuries.get((game_id, home), []), injuries.get((game_id, away), []))
+            for game_id, _, home, away, *_ in todo
+        ]
+        fresh = predict_home_win_probabilities(model_data, matchups, game_injuries)
+
+        _stored_game_cache.set_many(
+            {(version, game[0]): float(prob) for game, prob in zip(todo, fresh)},
+            final_dates={(version, game[0]): game[1] for game in todo}
+        )
+        probs[todo_index] = fresh
+    return probs
+
+
+def analyze_home_win_probabilities(model_data, matchups, injuries=None, explain=True, uncertainty=False):
+    """
+    Home-win probabilities with explanations and/or uncertainty, from ONE forest pass.
+
+    Args:
+        matchups / injuries: as for predict_home_win_probabilities
+        explain: Include per-feature tree-path contributions
+        uncertainty: Include the spread of the individual trees' probabilities
+
+    Returns:
+        list of dicts aligned with `matchups`, each with 'home_win_probability' and
+        - when explain: 'base_rate' and every feature's 'contributions' (value and
+          contribution, largest effect first; base_rate + contributions = probability)
+        - when uncertainty: 'uncertainty' with the trees' std, quantiles and a
+          bootstrap interval for the forest's probability
+    """
+    if not matchups:
+        return []
+    rf_model = model_data['model']
+    features = build_feature_matrix(matchups, injuries)
+    leaves = leaf_ids(rf_model, features)
+    probs, bias, contributions = feature_contributions(rf_model, features, leaves)
+    spread = probability_spread(tree_probabilities(rf_model, features, leaves)) if uncertainty else None
+
+    results = []
+    for i, (prob, values, row) in enumerate(zip(probs, features.to_numpy(), contributions)):
+        result = {'home_win_probability': float(prob)}
+        if explain:
+            order = sorted(range(len(FEATURE_COLUMNS)), key=lambda j: -abs(row[j]))
+            result['base_rate'] = bias
+            result['contributions'] = [
+                {'feature': FEATURE_COLUMNS[j], 'value': float(values[j]), 'contribution': float(row[j])}
+                for j in order
+            ]
+        if uncertainty:
+            result['uncertainty'] = {
+                'trees': leaves.shape[1],
+                'std': float(spread['std'][i]),
+                'quantiles': dict(zip(SPREAD_QUANTILES, map(float, spread['quantiles'][i]))),
+                'interval': (float(spread['interval_low'][i]), float(spread['interval_high'][i])),
+                'coverage': BOOTSTRAP_INTERVAL,
+            }
+        results.append(result)
+    return results
+
+
+def home_win_probability_arrays(model_data, matchups, uncertainty=False):
+    """
+    Home-win probabilities (and the trees' spread) for a batch as columns, from ONE forest pass.
+
+    The same numbers as analyze_home_win_probabilities(explain=False), but as NumPy
+    arrays aligned with `matchups` instead of a dict per row -- for bulk responses.
+
+    Returns:
+        dict of arrays: 'home_win_probability', plus 'std', 'interval_low' and
+        'interval_high' when uncertainty
+    """
+    if not uncertainty:
+        return {'home_win_probability': predict_home_win_probabilities(model_data, matchups)}
+    if not matchups:
+        return {key: np.empty(0) for key in ('home_win_probability', 'std', 'interval_low', 'interval_high')}
+    tree_probs = tree_probabilities(model_data['model'], build_feature_matrix(matchups))
+    spread = probability_spread(tree_probs)
+    return {
+        'home_win_probability': tree_probs.mean(axis=1),
+        'std': spread['std'],
+        'interval_low': spread['interval_low'],
+        'interval_high': spread['interval_high'],
+    }
+
+
+def predict_injury_scenarios(model_data, home_team, away_team, scenarios, date=None):
+    """
+    Home-win probability for one matchup under several injury scenarios, in one batched call.
+
+    Args:
+        scenarios: list of (home_out, away_out) player lists; None for a side means
+            that team's current injury report
+
+    Returns:
+        NumPy array of home-win probabilities aligned with `scenarios`
+    """
+    prediction_date = _validate_matchup(home_team, away_team, date)
+    matchups = [(prediction_date, home_team, away_team)] * len(scenarios)
+    return predict_home_win_probabilities(model_data, matchups, scenarios)
+
+
+def explain_home_win_probabilities(model_data, matchups, injuries=None):
+    """Home-win probabilities with per-feature contributions (see analyze_home_win_probabilities)."""
+    return analyze_home_win_probabilities(model_data, matchups, injuries, explain=True)
+
+
+def analyze_game(home_team, away_team, model_data, date=None, explain=True, uncertainty=True):
+    """
+    Predict one game with its explanation and uncertainty: predict_game_outcome's
+    (winner, confidence) plus the dict from analyze_home_win_probabilities.
+    
+    Returns:
+        (winner, confidence, analysis) tuple
+    """
+    prediction_date = _validate_matchup(home_team, away_team, date)
+    analysis = _prediction_flight.do(
+        ('analysis', model_data['version'], prediction_date, home_team, away_team, explain, uncertainty),
+        lambda: analyze_home_win_probabilities(
+            model_data, [(prediction_date, home_team, away_team)], explain=explain, uncertainty=uncertainty
+        )[0]
+    )
+
+    home_win_prob = analysis['home_win_probability']
+    winner = home_team if home_win_prob > 0.5 else away_team
+    return winner, max(home_win_prob, 1 - home_win_prob), analysis
+
+
 def predict_game_outcome(home_team, away_team, model_data, date=None):
     """
     Predict the outcome of a game (optimized with caching).
@@ -71,64 +335,19 @@ def predict_game_outcome(home_team, away_team, model_data, date=None):
     Returns:
         (winner, confidence) tuple
     """
-    # Validate teams
-    if home_team not in TEAM_TO_ABBR:
-        raise ValueError(f"Invalid home team: {home_team}. Must be a valid NBA city name.")
-    if away_team not in TEAM_TO_ABBR:
-        raise ValueError(f"Invalid away team: {away_team}. Must be a valid NBA city name.")
-    
-    # Use provided date or default
-    if date is None:
-        prediction_date = "2025-04-14"
-    else:
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-            prediction_date = date
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
-    
-    # Extract model
-    rf_model = model_data['model']
-    
-    # Get cached team stats
-    stats = get_cached_team_stats(prediction_date, home_team, away_team)
-    
-    # Get current injuries (from the DB, refreshed by pipeline/scrape_teams.py)
-    home_injuries = get_current_team_injuries(home_team)
-    away_injuries = get_current_team_injuries(away_team)
+    prediction_date = _validate_matchup(home_team, away_team, date)
 
-    home_injury_value = get_injury_value(home_injuries, home_team)
-    away_injury_value = get_injury_value(away_injuries, away_team)
+    # Single-row batch: one predict_proba call (predict() would be a second forest pass
+    # over the same trees -- the winner is just the argmax, ties going to the away team
+    # exactly as RandomForestClassifier.predict breaks them)
+    home_win_prob = _prediction_flight.do(
+        ('probability', model_data['version'], prediction_date, home_team, away_team),
+        lambda: float(predict_home_win_probabilities(model_data, [(prediction_date, home_team, away_team)])[0])
+    )
+
+    winner = home_team if home_win_prob > 0.5 else away_team
+    confidence_value = max(home_win_prob, 1 - home_win_prob)
 
-    home_injury_advanced = get_injury_advanced(home_injuries, home_team)
-    away_injury_advanced = get_injury_advanced(away_injuries, away_team)
-
-    # Build input
-    import pandas as pd
-    input_data = { 
-        "Home ORtg": [stats['home_rtg']], 
-        "Away ORtg": [stats['away_rtg']], 
-        "Home eFG%": [stats['home_efg']], 
-        "Away eFG%": [stats['away_efg']], 
-        "Home TOV%": [stats['home_tov']], 
-        "Away TOV%": [stats['away_tov']], 
-        "Home ORB%": [stats['home_orb']], 
-        "Away ORB%": [stats['away_orb']], 
-        "Home Injury Value": [home_injury_value], 
-        "Away Injury Value": [away_injury_value],
-        "Home Injury Advanced": [home_injury_advanced], 
-        "Away Injury Advanced": [away_injury_advanced]
-    }
-    
-    # Predict
-    prediction_df = pd.DataFrame(input_data)
-    prediction = rf_model.predict(prediction_df)
-    confidence = rf_model.predict_proba(prediction_df)[0]
-    
-    # Determine winner
-    winner = home_team if prediction[0] == 1 else away_team
-    confidence_value = max(confidence)
-    
     return winner, confidence_value
 
 
@@ -137,7 +356,8 @@ def get_model_info(model_data):
     return {
         "accuracy": round(model_data.get('accuracy', 0) * 100, 2),
         "features": len(model_data.get('features', [])),
-        "model_type": "Random Forest Classifier"
+        "model_type": "Random Forest Classifier",
+        "version": model_data.get('version')
     }
 
 
@@ -152,7 +372,7 @@ def get_team_comparison_stats(home_team, away_team, date=None):
         raise ValueError(f"Invalid away team: {away_team}")
     
     # Use provided date or default
-    prediction_date = date if date else "2025-04-14"
+    prediction_date = date if date else DEFAULT_PREDICTION_DATE
     
     try:
         datetime.strptime(prediction_date, "%Y-%m-%d")
@@ -166,6 +386,45 @@ def get_team_comparison_stats(home_team, away_team, date=None):
     home_injuries = get_current_team_injuries(home_team)
     away_injuries = get_current_team_injuries(away_team)
 
+    return _comparison_stats(home_team, away_team, stats, home_injuries, away_injuries)
+
+
+def get_matchup(home_team, away_team, model_data, date=None, explain=True, uncertainty=True):
+    """
+    Everything the matchup view shows, with features computed once.
+    
+    The team stats and current injury reports are looked up a single time and
+    feed both the model (one forest pass) and the comparison table.
+    
+    Returns:
+        (winner, confidence, analysis, comparison): analyze_game's result plus
+        get_team_comparison_stats's dict
+    """
+    prediction_date = _validate_matchup(home_team, away_team, date)
+    return _prediction_flight.do(
+        ('matchup', model_data['version'], prediction_date, home_team, away_team, explain, uncertainty),
+        lambda: _compute_matchup(home_team, away_team, model_data, prediction_date, explain, uncertainty)
+    )
+
+
+def _compute_matchup(home_team, away_team, model_data, prediction_date, explain, uncertainty):
+    stats = get_cached_team_stats(prediction_date, home_team, away_team)
+    home_injuries = get_current_team_injuries(home_team)
+    away_injuries = get_current_team_injuries(away_team)
+
+    analysis = analyze_home_win_probabilities(
+        model_data, [(prediction_date, home_team, away_team)], [(home_injuries, away_injuries)],
+        explain=explain, uncertainty=uncertainty
+    )[0]
+    home_win_prob = analysis['home_win_probability']
+    winner = home_team if home_win_prob > 0.5 else away_team
+
+    comparison = _comparison_stats(home_team, away_team, stats, home_injuries, away_injuries)
+    return winner, max(home_win_prob, 1 - home_win_prob), analysis, comparison
+
+
+def _comparison_stats(home_team, away_team, stats, home_injuries, away_injuries):
+    """Comparison table and breakdown from already-fetched team stats and injury lists."""
     home_injury_value = get_injury_value(home_injuries, home_team)
     away_injury_value = get_injury_value(away_injuries, away_team)
 
@@ -0,0 +1,201 @@
+"""Server-sent prediction updates: one data watcher per process, fanned out to every subscriber.
+
+Clients subscribe (app.py: /api/predict/events) to a set of matchups and get
+each one's current home-win probability, then only the ones that change.
+Nobody polls the prediction endpoints; instead one background thread per
+process checks database.get_data_version() every POLL_INTERVAL seconds (a
+stat call). When it moves, the thread works out what changed -- the teams whose
+player stats or injury list were rewritten (database.get_team_input_stamps),
+or every team if new games landed -- recomputes only the watched matchups
+involving those teams in ONE batched forest pass, and queues the
+probabilities that actually changed to each subscriber watching them.
+
+The watcher starts with the first subscription, so it runs in each gunicorn
+worker rather than in the preloading master. A subscriber whose buffer fills
+up (a stalled client) isn't blocked on: it's marked lagging and gets a full
+snapshot instead of the updates it missed.
+
+listen() blocks the calling thread for the life of the subscription (the
+Flask route); listen_async() waits on an event loop instead (asgi.py), so
+subscribers there don't take threads from the request pool.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+
+from database import get_data_version, get_latest_game_date, get_team_input_stamps
+from ml_model import predict_home_win_probabilities
+
+POLL_INTERVAL = 5         # seconds between data version checks
+HEARTBEAT_INTERVAL = 15   # seconds of silence before a keep-alive
+SUBSCRIBER_BUFFER = 64    # queued updates per subscriber before it's marked lagging
+
+
+class Subscription:
+    """One client's set of (date, home, away) matchups and its queue of pending updates."""
+
+    def __init__(self, matchups):
+        self.matchups = frozenset(matchups)
+        self.updates = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        self.lagging = False
+        self.on_push = None  # called (from the watcher thread) after every push
+
+    def push(self, updates):
+        try:
+            self.updates.put_nowait(updates)
+        except queue.Full:
+            self.lagging = True
+        if self.on_push is not None:
+            self.on_push()
+
+
+class PredictionHub:
+    """Latest probability of every watched matchup, the subscriptions watching them, and the watcher thread."""
+
+    def __init__(self, model_data, interval=POLL_INTERVAL):
+        self.model_data = model_data
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._latest = {}  # matchup -> probability most recently sent
+        self._baseline = None  # (data version, team input stamps, latest game date)
+        self._thread = None
+        self.checks = 0
+        self.recomputed = 0
+        self.pushed = 0
+        self.errors = 0
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._baseline = (get_data_version(), get_team_input_stamps(), get_latest_game_date())
+            self._thread = threading.Thread(target=self._run, name='prediction-hub', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                self.errors += 1
+                print(f"Prediction push check failed: {e}")
+
+    def subscribe(self, matchups):
+        """Register a subscription. Returns (subscription, {matchup: current probability})."""
+        self._start()
+        subscription = Subscription(matchups)
+        with self._lock:
+            # Registered before computing, so a concurrent check() already covers these matchups
+            self._subscriptions.add(subscription)
+            missing = [m for m in subscription.matchups if m not in self._latest]
+        if missing:
+            probs = predict_home_win_probabilities(self.model_data, missing)
+            with self._lock:
+                for matchup, prob in zip(missing, probs):
+                    self._latest.setdefault(matchup, float(prob))
+        return subscription, self.current(subscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            # Unwatched matchups aren't recomputed, so don't keep their values around to go stale
+            watched = set().union(*(s.matchups for s in self._subscriptions))
+            for matchup in subscription.matchups - watched:
+                self._latest.pop(matchup, None)
+
+    def current(self, subscription):
+        with self._lock:
+            return {m: self._latest[m] for m in subscription.matchups if m in self._latest}
+
+    def check(self):
+        """Recompute and push whatever the latest data change affected. Returns {matchup: new probability}."""
+        self.checks += 1
+        version = get_data_version()
+        if self._baseline is None or version == self._baseline[0]:
+            return {}
+        stamps, latest_game = get_team_input_stamps(), get_latest_game_date()
+        _, old_stamps, old_latest_game = self._baseline
+        self._baseline = (version, stamps, latest_game)
+
+        if latest_game != old_latest_game:
+            changed = None  # new games move every team's form
+        else:
+            changed = {team for team in set(stamps) | set(old_stamps) if stamps.get(team) != old_stamps.get(team)}
+            if not changed:
+                return {}
+
+        with self._lock:
+            watched = set().union(*(s.matchups for s in self._subscriptions))
+        affected = [m for m in watched if changed is None or m[1] in changed or m[2] in changed]
+        if not affected:
+            return {}
+        probs = predict_home_win_probabilities(self.model_data, affected)
+        self.recomputed += len(affected)
+
+        updates = {}
+        with self._lock:
+            for matchup, prob in zip(affected, probs):
+                if self._latest.get(matchup) != float(prob):
+                    self._latest[matchup] = updates[matchup] = float(prob)
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            mine = {m: p for m, p in updates.items() if m in subscription.matchups}
+            if mine:
+                subscription.push(mine)
+                self.pushed += 1
+        return updates
+
+    def _next_event(self, subscription, timeout=None):
+        """The next ('update' | 'snapshot', {...}) for a subscription, or None if nothing arrives within `timeout` (None: don't wait)."""
+        try:
+            updates = subscription.updates.get(timeout=timeout) if timeout else subscription.updates.get_nowait()
+        except queue.Empty:
+            return None
+        if subscription.lagging:
+            subscription.lagging = False
+            while not subscription.updates.empty():
+                subscription.updates.get_nowait()
+            return 'snapshot', self.current(subscription)
+        return 'update', updates
+
+    def listen(self, subscription, heartbeat=HEARTBEAT_INTERVAL):
+        """Yield ('update' | 'snapshot', {matchup: probability}) as changes arrive, or None after `heartbeat` idle seconds."""
+        while True:
+            yield self._next_event(subscription, heartbeat)
+
+    async def listen_async(self, subscription, heartbeat=HEARTBEAT_INTERVAL):
+        """listen() for an event loop: waits for pushes without holding a thread."""
+        loop = asyncio.get_running_loop()
+        pushed = asyncio.Event()
+        subscription.on_push = lambda: loop.call_soon_threadsafe(pushed.set)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(pushed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                # Cleared before draining, so a push that lands mid-drain wakes us again
+                pushed.clear()
+                event = self._next_event(subscription)
+                while event is not None:
+                    yield event
+                    event = self._next_event(subscription)
+        finally:
+            subscription.on_push = None
+
+    def stats(self):
+        with self._lock:
+            subscribers, watched = len(self._subscriptions), len(self._latest)
+        return {
+            'subscribers': subscribers,
+            'watched_matchups': watched,
+            'checks': self.checks,
+            'recomputed': self.recomputed,
+            'pushed': self.pushed,
+            'errors': self.errors,
+        }
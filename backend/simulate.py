@@ -0,0 +1,232 @@
+"""Monte Carlo season simulator: projected standings, seed distributions and playoff odds.
+
+Every remaining game's home-win probability comes from ONE batched forest pass
+(ml_model.predict_home_win_probabilities), using each team's form as of the
+simulation date -- for every game, however far out it's scheduled, since later
+form isn't known as of that date (so games are just home/away pairs). Outcomes are then sampled with NumPy for all simulations at
+once -- a (sims x games) uniform draw compared against the probability vector --
+and the simulations are split into fixed-size chunks spread across a process
+pool. Each chunk gets its own child of one SeedSequence, so a given seed gives
+the same result no matter how many workers run it. The pool is for the command
+line; the API runs in-process (workers=1) rather than forking a pool from a
+threaded server worker on every request.
+
+Seeding is by wins within each conference (ties broken at random); seeds 1-6
+make the playoffs, 7-10 go to the play-in (7v8 winner is the 7 seed, the loser
+hosts the 9v10 winner for the 8 seed), all played out with the same model.
+
+Usage:
+    python3 backend/simulate.py --schedule remaining.csv --sims 20000 --seed 7
+    (schedule CSV columns: home,away)
+"""
+
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from config import EASTERN_CONFERENCE, WESTERN_CONFERENCE, get_season_bounds, get_season_label
+from database import get_games_in_range, on_snapshot_reload
+from ml_model import DEFAULT_PREDICTION_DATE, load_model, predict_home_win_probabilities
+
+TEAMS = EASTERN_CONFERENCE + WESTERN_CONFERENCE
+TEAM_INDEX = {team: i for i, team in enumerate(TEAMS)}
+CONFERENCES = {
+    'East': np.array([TEAM_INDEX[t] for t in EASTERN_CONFERENCE]),
+    'West': np.array([TEAM_INDEX[t] for t in WESTERN_CONFERENCE]),
+}
+CONFERENCE_SIZE = 15
+PLAYOFF_SEEDS = 6
+CHUNK_SIZE = 2000
+MAX_SIMULATIONS = 100000
+
+
+def current_standings(as_of):
+    """(wins, losses) arrays indexed like TEAMS, from stored games this season up to as_of."""
+    season_start, _ = get_season_bounds(get_season_label(as_of))
+    wins = np.zeros(len(TEAMS), dtype=np.int32)
+    losses = np.zeros(len(TEAMS), dtype=np.int32)
+    for _, _, home, away, _, _, home_win in get_games_in_range(season_start, as_of):
+        if home not in TEAM_INDEX or away not in TEAM_INDEX or home_win is None:
+            continue
+        winner, loser = (home, away) if home_win else (away, home)
+        wins[TEAM_INDEX[winner]] += 1
+        losses[TEAM_INDEX[loser]] += 1
+    return wins, losses
+
+
+def _simulate_chunk(args):
+    """Simulate one chunk of seasons; returns summed aggregates so only small arrays cross processes."""
+    seed_seq, n_sims, probs, home_idx, away_idx, base_wins, pair_probs = args
+    rng = np.random.default_rng(seed_seq)
+    n_teams = len(base_wins)
+
+    # (sims x games) outcomes; credit each game's winner with a vectorized scatter-add
+    home_won = rng.random((n_sims, len(probs))) < probs
+    winners = np.where(home_won, home_idx, away_idx) + (np.arange(n_sims) * n_teams)[:, None]
+    wins = np.bincount(winners.ravel(), minlength=n_sims * n_teams).reshape(n_sims, n_teams) + base_wins
+
+    seed_counts = np.zeros((n_teams, CONFERENCE_SIZE), dtype=np.int64)
+    playoff_counts = np.zeros(n_teams, dtype=np.int64)
+    playin_counts = np.zeros(n_teams, dtype=np.int64)
+    score = wins + rng.random(wins.shape)  # random tiebreak within equal records
+
+    for members in CONFERENCES.values():
+        order = np.argsort(-score[:, members], axis=1)  # column positions, best first
+        seeded = members[order]                          # team index at each seed, per sim
+        for seed in range(CONFERENCE_SIZE):
+            seed_counts[:, seed] += np.bincount(seeded[:, seed], minlength=n_teams)
+
+        for seed in range(PLAYOFF_SEEDS):
+            playoff_counts += np.bincount(seeded[:, seed], minlength=n_teams)
+        for seed in range(PLAYOFF_SEEDS, PLAYOFF_SEEDS + 4):
+            playin_counts += np.bincount(seeded[:, seed], minlength=n_teams)
+
+        # Play-in: higher seed hosts every game
+        s7, s8, s9, s10 = (seeded[:, PLAYOFF_SEEDS + k] for k in range(4))
+        seven_wins = rng.random(n_sims) < pair_probs[s7, s8]
+        nine_wins = rng.random(n_sims) < pair_probs[s9, s10]
+        loser_78 = np.where(seven_wins, s8, s7)
+        winner_78 = np.where(seven_wins, s7, s8)
+        winner_910 = np.where(nine_wins, s9, s10)
+        loser_hosts_wins = rng.random(n_sims) < pair_probs[loser_78, winner_910]
+        eighth = np.where(loser_hosts_wins, loser_78, winner_910)
+        playoff_counts += np.bincount(winner_78, minlength=n_teams)
+        playoff_counts += np.bincount(eighth, minlength=n_teams)
+
+    return {
+        'wins_sum': wins.sum(axis=0),
+        'wins_sq_sum': (wins.astype(np.int64) ** 2).sum(axis=0),
+        'seed_counts': seed_counts,
+        'playoff_counts': playoff_counts,
+        'playin_counts': playin_counts,
+    }
+
+
+def simulate_season(remaining, model_data, sims=10000, seed=None, as_of=None, workers=None):
+    """
+    Simulate the rest of a season `sims` times.
+
+    Args:
+        remaining: list of (home_team, away_team) games still to be played
+        model_data: Loaded model data (from ml_model.load_model)
+        sims: Number of simulated seasons
+        seed: Seed for the RNG (None for a fresh random run)
+        as_of: Date whose stored results/form the simulation starts from
+        workers: Process count (None = all CPUs, 1 = run in-process)
+
+    Returns:
+        dict with per-team projected wins, seed distribution and playoff odds
+    """
+    as_of = as_of or DEFAULT_PREDICTION_DATE
+    try:
+        datetime.strptime(as_of, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError("Date must be in YYYY-MM-DD format")
+    if not 1 <= sims <= MAX_SIMULATIONS:
+        raise ValueError(f"sims must be between 1 and {MAX_SIMULATIONS}")
+    for home, away in remaining:
+        if home not in TEAM_INDEX or away not in TEAM_INDEX:
+            raise ValueError(f"Invalid matchup: {home} vs {away}")
+
+    base_wins, base_losses = current_standings(as_of)
+
+    # One forest pass for every (home, away) pairing: the remaining schedule and the
+    # play-in games both read from this 30x30 matrix.
+    pairs = [(home, away) for home in TEAMS for away in TEAMS if home != away]
+    pair_probs = np.full((len(TEAMS), len(TEAMS)), 0.5)
+    probs = predict_home_win_probabilities(model_data, [(as_of, home, away) for home, away in pairs])
+    for (home, away), p in zip(pairs, probs):
+        pair_probs[TEAM_INDEX[home], TEAM_INDEX[away]] = p
+
+    home_idx = np.array([TEAM_INDEX[home] for home, _ in remaining], dtype=np.int64)
+    away_idx = np.array([TEAM_INDEX[away] for _, away in remaining], dtype=np.int64)
+    game_probs = pair_probs[home_idx, away_idx]
+
+    chunk_sizes = [CHUNK_SIZE] * (sims // CHUNK_SIZE) + ([sims % CHUNK_SIZE] if sims % CHUNK_SIZE else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [
+        (child, n, game_probs, home_idx, away_idx, base_wins, pair_probs)
+        for child, n in zip(seeds, chunk_sizes)
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+    else:
+        results = [_simulate_chunk(task) for task in tasks]
+
+    total = {key: sum(r[key] for r in results) for key in results[0]}
+    mean_wins = total['wins_sum'] / sims
+    std_wins = np.sqrt(np.maximum(total['wins_sq_sum'] / sims - mean_wins ** 2, 0))
+    games_left = np.bincount(home_idx, minlength=len(TEAMS)) + np.bincount(away_idx, minlength=len(TEAMS))
+
+    standings = []
+    for conference, members in CONFERENCES.items():
+        for i in members:
+            standings.append({
+                'team': TEAMS[i],
+                'conference': conference,
+                'wins': int(base_wins[i]),
+                'losses': int(base_losses[i]),
+                'games_remaining': int(games_left[i]),
+                'projected_wins': round(float(mean_wins[i]), 2),
+                'projected_wins_std': round(float(std_wins[i]), 2),
+                'seed_distribution': [round(float(c) / sims, 4) for c in total['seed_counts'][i]],
+                'playoff_odds': round(float(total['playoff_counts'][i]) / sims, 4),
+                'playin_odds': round(float(total['playin_counts'][i]) / sims, 4),
+            })
+    standings.sort(key=lambda row: (row['conference'], -row['projected_wins']))
+
+    return {
+        'as_of': as_of,
+        'simulations': sims,
+        'seed': seed,
+        'games_remaining': len(remaining),
+        'standings': standings,
+    }
+
+
+@lru_cache(maxsize=16)
+def cached_simulation(remaining, sims, seed, as_of):
+    """simulate_season() memoized on its inputs (remaining as a tuple), run in-process; only for seeded runs."""
+    return simulate_season(list(remaining), load_model(), sims=sims, seed=seed, as_of=as_of, workers=1)
+
+
+on_snapshot_reload(cached_simulation.cache_clear)
+
+
+def read_schedule(path):
+    """Remaining games from a CSV with home,away columns."""
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        if 'date' in (reader.fieldnames or []):
+            raise ValueError("Schedule dates aren't used: every game is predicted as of --as-of; drop the date column")
+        return [(row['home'], row['away']) for row in reader]
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--schedule', required=True, help='CSV of remaining games (date,home,away)')
+    arg_parser.add_argument('--sims', type=int, default=10000)
+    arg_parser.add_argument('--seed', type=int, default=None)
+    arg_parser.add_argument('--as-of', default=None, help='YYYY-MM-DD (default: the model default date)')
+    arg_parser.add_argument('--workers', type=int, default=None)
+    args = arg_parser.parse_args()
+
+    result = simulate_season(read_schedule(args.schedule), load_model(), sims=args.sims,
+                             seed=args.seed, as_of=args.as_of, workers=args.workers)
+
+    print(f"{result['simulations']} simulations of {result['games_remaining']} remaining games "
+          f"(as of {result['as_of']}, seed {result['seed']})")
+    for conference in CONFERENCES:
+        print(f'\n{conference}')
+        print(f'  {"Team":<15} {"W-L":>7} {"Proj W":>7} {"Playoffs":>9} {"Play-in":>8}')
+        for row in (r for r in result['standings'] if r['conference'] == conference):
+            print(f"  {row['team']:<15} {row['wins']:>3}-{row['losses']:<3} {row['projected_wins']:>7.1f} "
+                  f"{row['playoff_odds'] * 100:>8.1f}% {row['playin_odds'] * 100:>7.1f}%")
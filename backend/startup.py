@@ -0,0 +1,62 @@
+"""Startup phase timings and per-worker warm-up.
+
+app.py calls mark() after each startup phase (imports, serving snapshot,
+cache purge, model load, forest tables), so every process can say where its
+start time went; the timings are printed and served under "startup" in /health.
+
+Under gunicorn.conf.py those phases run once, in the master (preload_app), and
+the loaded model, forest tables and imported modules are shared copy-on-write
+by every worker. Each worker then runs warm_up() before it takes traffic: it
+opens its own copy of the serving snapshot, loads every team's form for the
+default prediction date into the feature cache (from the shared disk tier when
+another worker already computed it), and runs one dummy prediction end to end.
+The first real request then pays none of that.
+"""
+
+import os
+import time
+
+_started = time.perf_counter()
+_last = _started
+_phases = []  # (process role, phase, seconds)
+
+
+def mark(phase, role='master'):
+    """Record that `phase` just finished; its duration is the time since the previous mark."""
+    global _last
+    now = time.perf_counter()
+    elapsed = now - _last
+    _phases.append((role, phase, elapsed))
+    _last = now
+    print(f"[startup pid {os.getpid()}] {role}: {phase} took {elapsed * 1000:.0f} ms")
+
+
+def restart_clock():
+    """Start timing from now (e.g. in a freshly forked worker)."""
+    global _last
+    _last = time.perf_counter()
+
+
+def timings():
+    """Every recorded phase in order: [{role, phase, ms}], plus the total."""
+    phases = [{'role': role, 'phase': phase, 'ms': round(seconds * 1000, 1)} for role, phase, seconds in _phases]
+    return {'phases': phases, 'total_ms': round(sum(seconds for _, _, seconds in _phases) * 1000, 1)}
+
+
+def warm_up(model_data):
+    """Prime this worker's snapshot, feature caches and inference path (see module docstring)."""
+    from config import EASTERN_CONFERENCE, WESTERN_CONFERENCE
+    from data import get_team_form
+    from database import get_data_version
+    from ml_model import DEFAULT_PREDICTION_DATE, analyze_game
+
+    restart_clock()
+    get_data_version()  # reopens the in-memory snapshot in this process if it was inherited
+    mark('open serving snapshot', 'worker')
+
+    for team in EASTERN_CONFERENCE + WESTERN_CONFERENCE:
+        get_team_form(DEFAULT_PREDICTION_DATE, team)
+    mark('prime team forms', 'worker')
+
+    analyze_game(EASTERN_CONFERENCE[0], WESTERN_CONFERENCE[0], model_data, DEFAULT_PREDICTION_DATE)
+    mark('dummy prediction', 'worker')
@@ -0,0 +1,193 @@
+"""Admission control tests: shedding, the bounded wait queue, Retry-After and streamed responses.
+
+Each test gates a view on a small Flask app of its own through a fresh Gate,
+so nothing here loads the model or shares counters with app.py's gates.
+
+Run from backend/:  python -m pytest -q test_admission.py
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask, Response
+
+import admission
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    """make(limit, queue_size, max_wait) -> (Flask app, gate, release event) for a /work view that blocks until released."""
+    def make(limit, queue_size, max_wait=admission.MAX_QUEUE_WAIT):
+        gate = admission.Gate('test', limit, queue_size, max_wait=max_wait)
+        monkeypatch.setattr(admission, '_gates', {'test': gate})  # and a fresh ALL budget
+        release = threading.Event()
+        app = Flask(__name__)
+
+        @app.route('/work')
+        @admission.limit('test')
+        def work():
+            release.wait(5)
+            return {'ok': True}
+
+        @app.route('/stream')
+        @admission.limit('test')
+        def stream():
+            return Response(iter(['a\n', 'b\n']), mimetype='text/plain')
+
+        return app, gate, release
+    return make
+
+
+def _get_in_background(app, path):
+    """Start GET `path` in a thread; returns (thread, [status code once it finishes])."""
+    statuses = []
+    thread = threading.Thread(target=lambda: statuses.append(app.test_client().get(path).status_code))
+    thread.start()
+    return thread, statuses
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition never became true'
+        time.sleep(0.005)
+
+
+def test_sheds_at_the_limit_with_retry_after(gated):
+    app, gate, release = gated(limit=1, queue_size=0)
+    thread, statuses = _get_in_background(app, '/work')
+    _wait_for(lambda: gate.active == 1)
+
+    response = app.test_client().get('/work')
+    assert response.status_code == 503
+    assert response.get_json() == {"error": "Server is busy, please retry shortly"}
+    assert int(response.headers['Retry-After']) >= 1
+    assert gate.stats()['shed_queue_full'] == 1
+
+    release.set()
+    thread.join()
+    assert statuses == [200]
+    assert gate.active == 0
+
+
+def test_queue_holds_up_to_its_size_then_sheds(gated):
+    app, gate, release = gated(limit=1, queue_size=1)
+    first, first_status = _get_in_background(app, '/work')
+    _wait_for(lambda: gate.active == 1)
+    queued, queued_status = _get_in_background(app, '/work')
+    _wait_for(lambda: gate.stats()['waiting'] == 1)
+
+    # Slot taken and queue full: shed without waiting
+    started = time.monotonic()
+    assert app.test_client().get('/work').status_code == 503
+    assert time.monotonic() - started < 1
+
+    release.set()
+    first.join()
+    queued.join()
+    assert first_status == [200] and queued_status == [200]
+    assert gate.stats()['admitted'] == 2
+
+
+def test_queued_request_shed_after_max_wait(gated):
+    app, gate, release = gated(limit=1, queue_size=1, max_wait=0.1)
+    thread, _ = _get_in_background(app, '/work')
+    _wait_for(lambda: gate.active == 1)
+
+    response = app.test_client().get('/work')
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    assert gate.stats()['shed_timeout'] == 1
+
+    release.set()
+    thread.join()
+
+
+def test_high_priority_waiter_goes_first():
+    gate = admission.Gate('test', 1, 2)
+    assert gate.acquire()
+    order = []
+
+    def waiter(priority):
+        assert gate.acquire(priority)
+        order.append(priority)
+        gate.release(0.01)
+
+    normal = threading.Thread(target=waiter, args=(admission.NORMAL,))
+    normal.start()
+    _wait_for(lambda: gate.waiting[admission.NORMAL] == 1)
+    high = threading.Thread(target=waiter, args=(admission.HIGH,))
+    high.start()
+    _wait_for(lambda: gate.waiting[admission.HIGH] == 1)
+
+    gate.release(0.01)
+    normal.join()
+    high.join()
+    assert order == [admission.HIGH, admission.NORMAL]
+
+
+def test_streamed_response_holds_the_slot_until_closed(gated):
+    app, gate, _ = gated(limit=1, queue_size=0)
+    response = app.test_client().get('/stream')
+    assert response.is_streamed
+    assert gate.active == 1
+    assert app.test_client().get('/work').status_code == 503
+
+    assert response.get_data(as_text=True) == 'a\nb\n'
+    response.close()
+    assert gate.active == 0
+
+
+def test_plain_response_releases_immediately(gated):
+    app, gate, release = gated(limit=1, queue_size=0)
+    release.set()
+    assert app.test_client().get('/work').status_code == 200
+    assert gate.active == 0
+
+
+def test_predict_burst_leaves_threads_for_health(monkeypatch):
+    monkeypatch.setattr(admission, '_gates', {})
+    release = threading.Event()
+    app = Flask(__name__)
+
+    @app.route('/api/predict')
+    @admission.limit('predict')
+    def predict():
+        release.wait(5)
+        return {'ok': True}
+
+    @app.route('/api/matchup')
+    @admission.limit('matchup')
+    def matchup():
+        release.wait(5)
+        return {'ok': True}
+
+    @app.route('/health')
+    def health():
+        return {'status': 'healthy'}
+
+    def get(path):
+        return app.test_client().get(path).status_code
+
+    # One worker's request threads, hit by a burst on two expensive endpoints first
+    with ThreadPoolExecutor(admission.SERVING_THREADS) as pool:
+        burst = [pool.submit(get, path) for path in ['/api/predict', '/api/matchup'] * admission.SERVING_THREADS * 2]
+        _wait_for(lambda: admission.get_gate(admission.ALL).active == admission.GATED_THREADS)
+        assert pool.submit(get, '/health').result(timeout=1) == 200
+        release.set()
+        statuses = [future.result() for future in burst]
+
+    assert statuses.count(200) >= admission.GATED_THREADS
+    assert statuses.count(503) > 0
+    assert admission.get_gate(admission.ALL).stats()['shed_queue_full'] > 0
+    assert admission.get_gate(admission.ALL).active == 0
+
+
+def test_gated_limits_leave_reserved_threads():
+    budget, queue = admission.ENDPOINT_LIMITS[admission.ALL]
+    assert budget + admission.RESERVED_THREADS <= admission.SERVING_THREADS and queue == 0
+    for name, (limit, queue_size) in admission.ENDPOINT_LIMITS.items():
+        if name != 'predict_events_loop':
+            assert limit <= budget and queue_size <= 2, name
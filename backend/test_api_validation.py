@@ -0,0 +1,100 @@
+"""Request validation and error mapping tests: malformed input gets a 400 with a
+message, a coalesced computation that times out a 503 with Retry-After -- never a 500.
+
+Runs the real app (model included) against the checked-in database with the
+feature cache kept in memory.
+
+Run from backend/:  python -m pytest -q test_api_validation.py
+"""
+
+import pytest
+
+import cache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_DB_PATH', '')
+    import app
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('body', [
+    [],
+    ['Boston', 'Miami'],
+    'Boston',
+    {'home': ['Boston'], 'away': 'Miami', 'scenarios': [{}]},
+    {'home': 'Boston', 'away': 'Miami', 'scenarios': 'none out'},
+    {'home': 'Boston', 'away': 'Miami', 'scenarios': [['Jayson Tatum']]},
+    {'home': 'Boston', 'away': 'Miami', 'scenarios': [{'home_out': 'Jayson Tatum'}]},
+    {'home': 'Boston', 'away': 'Miami', 'scenarios': [{'home_out': [1]}]},
+    {'home': 'Boston', 'away': 'Miami', 'scenarios': [{'away_out': [['Jimmy Butler']]}]},
+])
+def test_whatif_rejects_malformed_body(client, body):
+    response = client.post('/api/whatif', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_whatif_accepts_player_lists(client):
+    response = client.post('/api/whatif', json={
+        'home': 'Boston', 'away': 'Miami',
+        'scenarios': [{'name': 'Healthy', 'home_out': [], 'away_out': []}, {'home_out': ['Jayson Tatum']}],
+    })
+    assert response.status_code == 200
+    assert [s['name'] for s in response.get_json()['scenarios']] == ['Healthy', 'Scenario 2']
+
+
+@pytest.mark.parametrize('seasons', ['2024', 'abc', '2024-26', '24-25', '2024-25,2025'])
+def test_h2h_rejects_malformed_season(client, seasons):
+    response = client.get(f'/api/h2h?home=Boston&away=Miami&seasons={seasons}')
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "seasons must be labels like 2024-25"}
+
+
+def test_h2h_filters_by_season(client):
+    response = client.get('/api/h2h?home=Boston&away=Miami&seasons=2024-25')
+    assert response.status_code == 200
+    assert all(m['season'] == '2024-25' for m in response.get_json()['meetings'])
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'games', 5, {'games': {'home': 'Boston', 'away': 'Miami'}}, {'games': 7}])
+def test_simulate_rejects_non_object_body(client, body):
+    response = client.post('/api/simulate', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'games', 5, {'games': {'home': 'Boston', 'away': 'Miami'}}, {'games': 7}])
+def test_predict_batch_rejects_non_object_body(client, body):
+    response = client.post('/api/predict/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'games', 5, {'games': {'home': 'Boston', 'away': 'Miami'}}, {'games': 7}])
+def test_explain_rejects_non_object_body(client, body):
+    response = client.post('/api/explain', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('path, patched', [
+    ('/api/predict?explain=false&uncertainty=false&', 'predict_game_outcome'),
+    ('/api/predict?', 'analyze_game'),
+    ('/api/team-comparison?', 'get_team_comparison_stats'),
+])
+def test_coalesced_timeout_is_503_with_retry_after(client, monkeypatch, path, patched):
+    import app
+    import ml_model
+
+    def timed_out(*args, **kwargs):
+        raise cache.SingleFlightTimeout("Timed out waiting for an in-flight computation of 'x'")
+
+    monkeypatch.setattr(ml_model, patched, timed_out)
+    monkeypatch.setattr(app, patched, timed_out, raising=False)
+    monkeypatch.setattr(app, 'is_matchup_cached', lambda *args: False)
+    response = client.get(f'{path}home=Boston&away=Miami&date=2025-01-15')
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert 'Timed out' in response.get_json()['error']
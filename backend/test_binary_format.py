@@ -0,0 +1,106 @@
+"""Binary prediction format tests: encode/decode round trips, framing checks, and the stream endpoint.
+
+The endpoint test runs the real app (model included) against the checked-in
+database with the feature cache kept in memory.
+
+Run from backend/:  python -m pytest -q test_binary_format.py
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import binary_format
+import cache
+
+TEAMS = ['Boston', 'Miami', 'Toronto']
+
+
+def _message():
+    return binary_format.encode([
+        ('date', 'i4', binary_format.date_ids(['2025-01-14', '2025-01-15'])),
+        ('home', 'u1', binary_format.team_ids(['Boston', 'Toronto'], TEAMS)),
+        ('away', 'u1', binary_format.team_ids(['Miami', 'Boston'], TEAMS)),
+        ('home_win_probability', 'f4', [0.61, 0.42]),
+    ], teams=TEAMS)
+
+
+def test_round_trip():
+    header, records = binary_format.decode(_message())
+    assert header['count'] == 2
+    assert header['teams'] == TEAMS
+    assert records['date'].tolist() == [20250114, 20250115]
+    assert [TEAMS[i] for i in records['home']] == ['Boston', 'Toronto']
+    assert [TEAMS[i] for i in records['away']] == ['Miami', 'Boston']
+    np.testing.assert_allclose(records['home_win_probability'], [0.61, 0.42], rtol=1e-6)
+
+
+def test_stream_of_messages_with_error():
+    stream = _message() + binary_format.encode_error('Stream failed: boom')
+    (first, records), (last, empty) = binary_format.decode_stream(stream)
+    assert first['count'] == len(records) == 2
+    assert last == {'fields': [], 'count': 0, 'error': 'Stream failed: boom'}
+    assert len(empty) == 0
+
+
+@pytest.mark.parametrize('prefix', [b'NBAX', b'NBAP\x02'])
+def test_rejects_wrong_magic_or_version(prefix):
+    message = bytearray(_message())
+    message[:len(prefix)] = prefix
+    with pytest.raises(ValueError, match='version-1'):
+        binary_format.decode(bytes(message))
+
+
+@pytest.mark.parametrize('cut', [3, 20, -1])
+def test_rejects_truncated_message(cut):
+    # Inside the prefix, inside the JSON header, and one byte short of the last record
+    with pytest.raises(ValueError, match='Truncated'):
+        binary_format.decode(_message()[:cut])
+    with pytest.raises(ValueError, match='Truncated'):
+        list(binary_format.decode_stream(_message() + _message()[:cut]))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_DB_PATH', '')
+    import app
+    return app.app.test_client()
+
+
+def test_stream_endpoint_matches_ndjson(client):
+    query = '/api/predict/stream?from=2025-01-01&to=2025-01-20&team=Boston'
+    # Close each stream, as a server would, so it gives back its admission slot
+    with client.get(query) as response:
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    with client.get(query, headers={'Accept': binary_format.BINARY_MIMETYPE}) as response:
+        assert response.mimetype == binary_format.BINARY_MIMETYPE
+        body = response.get_data()
+
+    decoded = []
+    for header, records in binary_format.decode_stream(body):
+        assert 'error' not in header
+        teams = header['teams']
+        for record in records:
+            date = str(record['date'])
+            decoded.append({
+                'game_id': int(record['game_id']),
+                'date': f'{date[:4]}-{date[4:6]}-{date[6:]}',
+                'home_team': teams[record['home']],
+                'away_team': teams[record['away']],
+                'home_win_probability': round(float(record['home_win_probability']), 4),
+                'home_score': None if record['home_score'] == -1 else int(record['home_score']),
+                'away_score': None if record['away_score'] == -1 else int(record['away_score']),
+                'actual_winner': None if record['home_win'] == -1
+                else teams[record['home']] if record['home_win'] else teams[record['away']],
+            })
+
+    assert lines and len(decoded) == len(lines)
+    for line, record in zip(lines, decoded):
+        expected = {key: line[key] for key in record}
+        if expected['home_score'] is not None:
+            expected['home_score'] = int(expected['home_score'])
+            expected['away_score'] = int(expected['away_score'])
+        # float32 on the wire: allow for its rounding
+        assert abs(record.pop('home_win_probability') - expected.pop('home_win_probability')) < 1e-4
+        assert record == expected
@@ -0,0 +1,237 @@
+"""Tiered cache tests: when final entries stay valid, sharing across processes, and how concurrent misses coalesce.
+
+Runs against a fresh database and cache file in a temp directory, so nothing
+here touches data/nba_data.db or data/cache.db.
+
+Run from backend/:  python -m pytest -q test_cache.py
+"""
+
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+import cache
+import database
+
+FACTORS = {'off_rtg': 110.0, 'efg_pct': 0.52, 'tov_pct': 12.0, 'orb_pct': 25.0}
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    """Empty database with games on 2025-01-10 and 2025-01-12, and a disk tier of its own."""
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'nba_data.db'))
+    monkeypatch.setattr(database, 'SEASONS_DIR', str(tmp_path / 'seasons'))
+    monkeypatch.setattr(database, '_serving', None)  # read DB_PATH even if app.py switched to a snapshot
+    monkeypatch.setattr(cache, 'CACHE_DB_PATH', str(tmp_path / 'cache.db'))
+    database.create_database()
+    _store_game('2025-01-10', 'Boston', 'Toronto')
+    _store_game('2025-01-12', 'Miami', 'Utah')
+
+
+def _store_game(date, home, away):
+    database.store_game(date, home, away, 100, 90, 1, FACTORS, FACTORS)
+
+
+def test_final_entry_outlives_later_games(history_db):
+    tiered = cache.TieredCache('test_final_later')
+    tiered.set(('form',), 1, final_date='2025-01-11')
+    _store_game('2025-01-13', 'Denver', 'Phoenix')
+
+    assert tiered.get(('form',)) == 1
+    tiered.clear_memory()
+    assert tiered.get(('form',)) == 1  # from the disk tier
+
+
+def test_final_entry_dropped_by_backfill(history_db):
+    tiered = cache.TieredCache('test_final_backfill')
+    tiered.set(('form',), 1, final_date='2025-01-11')
+    _store_game('2025-01-09', 'Denver', 'Phoenix')
+
+    assert tiered.get(('form',)) is None
+    tiered.clear_memory()
+    assert tiered.get(('form',)) is None
+
+
+def test_final_entry_dropped_when_its_date_is_finished(history_db):
+    # 2025-01-12 was only partly stored; a re-scrape adds its other game
+    tiered = cache.TieredCache('test_final_rescrape')
+    tiered.set(('form',), 1, final_date='2025-01-12')
+    _store_game('2025-01-12', 'Denver', 'Phoenix')
+
+    assert tiered.get(('form',)) is None
+
+
+def test_dates_past_the_latest_game_are_not_final(history_db):
+    assert cache.final_version('2025-01-12') is not None
+    assert cache.final_version('2025-01-13') is None
+
+    tiered = cache.TieredCache('test_not_final')
+    tiered.set(('form',), 1, final_date='2025-01-13')
+    _store_game('2025-01-14', 'Denver', 'Phoenix')
+    assert tiered.get(('form',)) is None
+
+
+def test_entries_from_another_release_are_misses(history_db, monkeypatch):
+    tiered = cache.TieredCache('test_release')
+    tiered.set(('final',), 1, final_date='2025-01-11')
+    tiered.set(('volatile',), 2)
+    # A release whose feature code differs reads the same cache file
+    monkeypatch.setattr(cache, '_PREFIX', 'another-release:')
+    tiered.clear_memory()
+    assert tiered.get_many([('final',), ('volatile',)]) == {}
+    assert cache.purge_expired() == 2
+
+
+def test_fingerprint_load_does_not_block_cache_readers(history_db, monkeypatch):
+    tiered = cache.TieredCache('test_fingerprint_lock')
+    tiered.set(('volatile',), 1)
+    tiered.set(('final',), 2, final_date='2025-01-11')
+
+    loading, release = threading.Event(), threading.Event()
+    real_fingerprints = database.get_history_fingerprints
+
+    def slow_fingerprints():
+        loading.set()
+        release.wait(5)
+        return real_fingerprints()
+
+    monkeypatch.setattr(cache, 'get_history_fingerprints', slow_fingerprints)
+    monkeypatch.setattr(cache, '_history', (None, [], []))  # as after a data change
+    validating = threading.Thread(target=lambda: tiered.get(('final',)))
+    validating.start()
+    assert loading.wait(5)
+
+    # Another reader of the same cache isn't stuck behind the fingerprint query
+    started = time.monotonic()
+    assert tiered.get(('volatile',)) == 1
+    assert time.monotonic() - started < 1
+    release.set()
+    validating.join()
+    assert tiered.get(('final',)) == 2
+
+
+def _write_in_other_process(cache_path, db_path, seasons_dir):
+    """Runs in a child process: what a second gunicorn worker would do on a miss."""
+    cache.CACHE_DB_PATH = cache_path
+    database.DB_PATH, database.SEASONS_DIR, database._serving = db_path, seasons_dir, None
+    tiered = cache.TieredCache('test_cross_process')
+    tiered.set(('final',), 'from child', final_date='2025-01-11')
+    tiered.set(('volatile',), 'also from child')
+
+
+def test_other_process_writes_are_disk_hits(history_db):
+    context = multiprocessing.get_context('spawn')  # a fresh interpreter, like a separate worker
+    child = context.Process(target=_write_in_other_process,
+                            args=(cache.CACHE_DB_PATH, database.DB_PATH, database.SEASONS_DIR))
+    child.start()
+    child.join(60)
+    assert child.exitcode == 0
+
+    tiered = cache.TieredCache('test_cross_process')
+    assert tiered.get_many([('final',), ('volatile',)]) == {('final',): 'from child', ('volatile',): 'also from child'}
+    assert (tiered.disk_hits, tiered.misses) == (2, 0)
+
+
+# ===== SingleFlight =====
+
+def _blocking_compute(release, result='value'):
+    """A compute function that counts its calls and blocks until `release` is set."""
+    calls = []
+
+    def compute():
+        calls.append(1)
+        assert release.wait(5), 'test never released the leader'
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return compute, calls
+
+
+def _run_followers(target, count):
+    outcomes = []
+
+    def follower():
+        try:
+            outcomes.append(('ok', target()))
+        except Exception as e:
+            outcomes.append(('error', e))
+
+    threads = [threading.Thread(target=follower) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition never became true'
+        time.sleep(0.005)
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = cache.SingleFlight()
+    release = threading.Event()
+    compute, calls = _blocking_compute(release)
+
+    threads, outcomes = _run_followers(lambda: flight.do('key', compute), 5)
+    _wait_for(lambda: flight.coalesced == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert outcomes == [('ok', 'value')] * 5
+    # Nothing is remembered: the next call runs again
+    assert flight.do('key', lambda: 'again') == 'again'
+
+
+def test_single_flight_shares_the_leaders_error():
+    flight = cache.SingleFlight()
+    release = threading.Event()
+    compute, calls = _blocking_compute(release, result=ValueError('boom'))
+
+    threads, outcomes = _run_followers(lambda: flight.do('key', compute), 3)
+    _wait_for(lambda: flight.coalesced == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert [kind for kind, _ in outcomes] == ['error'] * 3
+    assert all(isinstance(e, ValueError) and str(e) == 'boom' for _, e in outcomes)
+
+
+def test_single_flight_follower_times_out():
+    flight = cache.SingleFlight(timeout=0.1)
+    release = threading.Event()
+    compute, calls = _blocking_compute(release)
+
+    leader, leader_outcome = _run_followers(lambda: flight.do('key', compute), 1)
+    _wait_for(lambda: calls == [1])
+    with pytest.raises(cache.SingleFlightTimeout):
+        flight.do('key', compute)
+
+    release.set()
+    leader[0].join()
+    assert leader_outcome == [('ok', 'value')]
+    assert calls == [1]
+
+
+def test_get_or_compute_computes_once_and_caches(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_DB_PATH', '')
+    tiered = cache.TieredCache('test_get_or_compute')
+    release = threading.Event()
+    compute, calls = _blocking_compute(release)
+
+    threads, outcomes = _run_followers(lambda: tiered.get_or_compute(('key',), compute), 4)
+    _wait_for(lambda: tiered._flight.coalesced == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert outcomes == [('ok', 'value')] * 4
+    assert tiered.get_or_compute(('key',), lambda: 'recomputed') == 'value'
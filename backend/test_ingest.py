@@ -0,0 +1,114 @@
+"""Ingest bookkeeping tests: where a catch-up scrape resumes, and skipping unchanged team pages.
+
+Runs against a fresh database in a temp directory, so nothing here touches
+data/nba_data.db. Team pages come from stubbed fetch/parse functions, never
+the network.
+
+Run from backend/:  python -m pytest -q test_ingest.py
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+import database
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+FACTORS = {'off_rtg': 110.0, 'efg_pct': 0.52, 'tov_pct': 12.0, 'orb_pct': 25.0}
+SCRAPED_AT = '2025-01-20T00:00:00+00:00'
+
+
+@pytest.fixture
+def empty_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'nba_data.db'))
+    monkeypatch.setattr(database, '_serving', None)  # read DB_PATH even if app.py switched to a snapshot
+    database.create_database()
+
+
+def _store_game(date, home, away):
+    database.store_game(date, home, away, 100, 90, 1, FACTORS, FACTORS)
+
+
+def test_fresh_database_has_no_resume_date(empty_db):
+    assert database.get_ingest_resume_date() is None
+
+
+def test_resumes_after_last_complete_date(empty_db):
+    database.record_ingest_date('2025-01-10', 2, 2, SCRAPED_AT)
+    database.record_ingest_date('2025-01-11', 0, 0, SCRAPED_AT)
+    assert database.get_ingest_resume_date() == '2025-01-12'
+
+
+def test_resumes_at_partly_stored_date(empty_db):
+    database.record_ingest_date('2025-01-10', 1, 1, SCRAPED_AT)
+    # A run that crashed during 01-11: one game stored, the date never recorded
+    _store_game('2025-01-11', 'Boston', 'Toronto')
+    assert database.get_ingest_resume_date() == '2025-01-11'
+
+
+def test_resumes_at_oldest_incomplete_date(empty_db):
+    database.record_ingest_date('2025-01-10', 3, 2, SCRAPED_AT)
+    database.record_ingest_date('2025-01-11', 1, 1, SCRAPED_AT)
+    assert database.get_ingest_resume_date() == '2025-01-10'
+
+
+def test_resumes_at_gap_between_recorded_dates(empty_db):
+    database.record_ingest_date('2025-01-10', 1, 1, SCRAPED_AT)
+    database.record_ingest_date('2025-01-12', 1, 1, SCRAPED_AT)
+    assert database.get_ingest_resume_date() == '2025-01-11'
+
+
+def test_falls_back_to_latest_game_without_ingest_state(empty_db):
+    _store_game('2025-01-08', 'Boston', 'Toronto')
+    _store_game('2025-01-09', 'Miami', 'Utah')
+    # The latest date may be only partly stored, so it's re-checked
+    assert database.get_ingest_resume_date() == '2025-01-09'
+
+
+# ===== Team pages (pipeline/scrape_teams.py) =====
+
+PER_GAME = {'Jayson Tatum': {'ppg': 27.0, 'rpg': 8.5, 'apg': 5.0, 'spg': 1.0, 'bpg': 0.6}}
+ADVANCED = {'Jayson Tatum': {'vorp': 4.1, 'ws': 9.8}}
+
+
+@pytest.fixture
+def scrape_teams(empty_db, monkeypatch):
+    """scrape_teams with a stubbed page: set `page['injuries']` to change what the next scrape sees."""
+    monkeypatch.syspath_prepend(str(REPO_ROOT / 'pipeline'))
+    import scrape_teams as module
+    page = {'injuries': ['Jaylen Brown']}
+    monkeypatch.setattr(module, 'fetch_html', lambda url: '<html></html>')
+    monkeypatch.setattr(module, 'parse_team_per_game_stats', lambda html: PER_GAME)
+    monkeypatch.setattr(module, 'parse_team_advanced_stats', lambda html: ADVANCED)
+    monkeypatch.setattr(module, 'parse_team_injuries', lambda html: list(page['injuries']))
+
+    writes = []
+    real_replace = database.replace_team_page
+    monkeypatch.setattr(database, 'replace_team_page', lambda *args: (writes.append(args[0]), real_replace(*args)))
+    return module, page, writes
+
+
+def test_payload_hash_ignores_ordering(scrape_teams):
+    module, _, _ = scrape_teams
+    assert module.payload_hash(PER_GAME, ADVANCED, ['A', 'B']) == module.payload_hash(PER_GAME, ADVANCED, ['B', 'A'])
+    assert module.payload_hash(PER_GAME, ADVANCED, ['A']) != module.payload_hash(PER_GAME, ADVANCED, ['B'])
+
+
+def test_unchanged_team_page_is_not_written(scrape_teams):
+    module, page, writes = scrape_teams
+    assert module.scrape_team('Boston', '2024-25') == (1, 1, True)
+    assert writes == ['Boston']
+    assert database.get_current_injuries('Boston')
+
+    before = os.stat(database.DB_PATH)
+    assert module.scrape_team('Boston', '2024-25') == (1, 1, False)
+    after = os.stat(database.DB_PATH)
+    assert writes == ['Boston']
+    assert (after.st_mtime_ns, after.st_size) == (before.st_mtime_ns, before.st_size)
+
+    page['injuries'] = []
+    assert module.scrape_team('Boston', '2024-25') == (1, 0, True)
+    assert writes == ['Boston', 'Boston']
+    assert not database.get_current_injuries('Boston')
@@ -0,0 +1,150 @@
+"""Schema migration tests: upgrading a v0 database that holds duplicate rows, and old season partitions.
+
+Builds the original (v0) schema in a temp directory by running
+create_database() with no migrations registered, loads it with the kind of
+duplicates older scrapers left behind, then applies every migration. Season
+partitions are archived under an older schema the same way, by registering
+only the first migration.
+
+Run from backend/:  python -m pytest -q test_migrations.py
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+import database
+
+STATS = (110.0, 108.0, 0.52, 0.50, 12.0, 13.0, 25.0, 24.0)
+
+
+@pytest.fixture
+def v0_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'nba_data.db'))
+    monkeypatch.setattr(database, '_serving', None)
+    with monkeypatch.context() as m:
+        m.setattr(database, 'MIGRATIONS', [])
+        database.create_database()
+
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("INSERT INTO games (id, date, home_team, away_team, home_score, away_score, home_win) "
+                 "VALUES (1, '2025-01-10', 'Boston', 'Toronto', 110, 100, 1)")
+    stats_sql = ('INSERT INTO team_stats (game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct, '
+                 'tov_pct, opp_tov_pct, orb_pct, opp_orb_pct) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+    conn.execute(stats_sql, (1, 'Boston', 1, 100.0, *STATS[1:]))  # stale duplicate
+    conn.execute(stats_sql, (1, 'Boston', 1, *STATS))             # latest row for (1, Boston)
+    conn.execute(stats_sql, (1, 'Toronto', 0, *STATS))
+    conn.executemany('INSERT INTO game_injuries (game_id, team, player) VALUES (?, ?, ?)', [
+        (1, 'Boston', 'Jaylen Brown'), (1, 'Boston', 'Jaylen Brown'), (1, 'Toronto', 'Scottie Barnes'),
+    ])
+    conn.commit()
+    conn.close()
+    return database.DB_PATH
+
+
+def test_migrations_dedupe_and_add_unique_indexes(v0_db):
+    assert database.get_schema_version() == 0
+    assert database.migrate_database() == (0, database.SCHEMA_VERSION)
+
+    conn = sqlite3.connect(v0_db)
+    stats = conn.execute('SELECT team, off_rtg, date FROM team_stats ORDER BY team').fetchall()
+    assert stats == [('Boston', STATS[0], '2025-01-10'), ('Toronto', STATS[0], '2025-01-10')]
+    injuries = conn.execute('SELECT team, player FROM game_injuries ORDER BY team').fetchall()
+    assert injuries == [('Boston', 'Jaylen Brown'), ('Toronto', 'Scottie Barnes')]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO team_stats (game_id, team, is_home) VALUES (1, 'Boston', 1)")
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO game_injuries (game_id, team, player) VALUES (1, 'Boston', 'Jaylen Brown')")
+    conn.close()
+
+
+def test_migrated_database_is_left_alone(v0_db):
+    database.migrate_database()
+    assert database.migrate_database() == (database.SCHEMA_VERSION, database.SCHEMA_VERSION)
+
+
+def test_writes_after_migration_stay_unique(v0_db):
+    database.migrate_database()
+    factors = {'off_rtg': 115.0, 'efg_pct': 0.55, 'tov_pct': 11.0, 'orb_pct': 27.0}
+    # Re-storing a game refreshes its rows instead of adding duplicates
+    database.store_game('2025-01-10', 'Boston', 'Toronto', 110, 100, 1, factors, factors,
+                        ['Jaylen Brown'], ['Scottie Barnes'])
+
+    conn = sqlite3.connect(v0_db)
+    assert conn.execute('SELECT COUNT(*) FROM team_stats').fetchone()[0] == 2
+    assert conn.execute('SELECT COUNT(*) FROM game_injuries').fetchone()[0] == 2
+    conn.close()
+
+
+# ===== Season partitions =====
+
+@pytest.fixture
+def v1_partition(tmp_path, monkeypatch):
+    """A 2023-24 partition archived at schema v1 (no team_stats.date), with DB_PATH migrated since."""
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'nba_data.db'))
+    monkeypatch.setattr(database, '_serving', None)
+    monkeypatch.setattr(database, 'SEASONS_DIR', str(tmp_path / 'seasons'))
+    monkeypatch.setattr(database, '_partitions', {'key': None, 'partitions': []})
+    with monkeypatch.context() as m:
+        m.setattr(database, 'MIGRATIONS', database.MIGRATIONS[:1])
+        m.setattr(database, 'SCHEMA_VERSION', 1)
+        database.create_database()
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute("INSERT INTO games (id, date, home_team, away_team, home_score, away_score, home_win) "
+                     "VALUES (1, '2024-01-15', 'Boston', 'Toronto', 110, 100, 1)")
+        stats_sql = ('INSERT INTO team_stats (game_id, team, is_home, off_rtg, opp_off_rtg, efg_pct, opp_efg_pct, '
+                     'tov_pct, opp_tov_pct, orb_pct, opp_orb_pct) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+        conn.execute(stats_sql, (1, 'Boston', 1, *STATS))
+        conn.execute(stats_sql, (1, 'Toronto', 0, *STATS))
+        conn.commit()
+        conn.close()
+        database.archive_season('2023-24')
+    database.migrate_database()
+    return database.season_partition_path('2023-24')
+
+
+def _partition_version(path):
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    conn.close()
+    return version
+
+
+def test_old_partition_is_migrated_when_attached(v1_partition):
+    assert _partition_version(v1_partition) == 1
+    # A date-keyed lookup: with the partition's team_stats.date left NULL it finds nothing
+    assert database.get_team_stats_for_dates('Boston', ['2024-01-15'], 'off_rtg') == [[STATS[0], STATS[1]]]
+    assert _partition_version(v1_partition) == database.SCHEMA_VERSION
+    assert os.stat(v1_partition).st_mode & 0o222 == 0  # still frozen read-only
+
+
+def test_partition_newer_than_code_fails(v1_partition, monkeypatch):
+    monkeypatch.setattr(database, 'SCHEMA_VERSION', 0)
+    with pytest.raises(RuntimeError, match='newer than this code'):
+        database.get_season_partitions()
+
+
+def test_unmigratable_partition_fails(v1_partition, monkeypatch):
+    def broken(cursor):
+        raise sqlite3.OperationalError('boom')
+    monkeypatch.setattr(database, 'MIGRATIONS', [*database.MIGRATIONS[:1], broken])
+    monkeypatch.setattr(database, 'SCHEMA_VERSION', 2)
+    with pytest.raises(RuntimeError, match='could not be migrated'):
+        database.get_season_partitions()
+    assert _partition_version(v1_partition) == 1
+    assert os.listdir(database.SEASONS_DIR) == ['nba_2023-24.db']
+
+
+def test_archived_season_rejects_writes(v1_partition):
+    factors = {'off_rtg': 115.0, 'efg_pct': 0.55, 'tov_pct': 11.0, 'orb_pct': 27.0}
+    with pytest.raises(ValueError, match='archived season'):
+        database.store_game('2024-01-15', 'Boston', 'Toronto', 110, 100, 1, factors, factors)
+    with pytest.raises(ValueError, match='archived season'):
+        database.insert_game('2024-02-01', 'Miami', 'Utah', 99, 98, 1)
+    database.store_game('2024-10-25', 'Boston', 'Toronto', 110, 100, 1, factors, factors)  # the next season is open
+
+    conn = sqlite3.connect(database.DB_PATH)
+    assert conn.execute('SELECT date FROM games').fetchall() == [('2024-10-25',)]
+    conn.close()
@@ -0,0 +1,220 @@
+"""Query-plan regression tests: every production query must be an index lookup, never a scan.
+
+Runs each read function from database.py and pipeline/train_model.py against a
+migrated copy of data/nba_data.db, records the SQL it actually executes, and
+checks the EXPLAIN QUERY PLAN of each statement. A query that drops back to a
+full-table scan (e.g. because an index was dropped or a WHERE clause stopped
+matching one) fails here instead of showing up as latency in production.
+The few queries that summarize a whole table (data-version fingerprints, team
+input stamps) must walk a covering index in order, never the table or a sort.
+
+Run from backend/:  python -m pytest -q test_query_plans.py
+"""
+
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+import database
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DATES = ['2025-01-14', '2025-01-13', '2025-01-12', '2025-01-11', '2025-01-10', '2025-01-09', '2025-01-08']
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Migrated copy of the checked-in database, with every executed statement recorded."""
+    path = tmp_path / 'nba_data.db'
+    shutil.copy(database.DB_PATH, path)
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+    monkeypatch.setattr(database, '_serving', None)  # read DB_PATH even if app.py switched to a snapshot
+    database.create_database()
+
+    statements = []
+    real_connect = sqlite3.connect
+
+    def recording_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', recording_connect)
+    yield path, statements
+    monkeypatch.setattr(sqlite3, 'connect', real_connect)
+
+
+def _query_plan(path, sql):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+    conn.close()
+    return [row[3] for row in rows]
+
+
+def _assert_no_scans(path, statements):
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+    assert selects, 'no SELECT statements were recorded'
+    for sql in selects:
+        plan = _query_plan(path, sql)
+        # Scanning a subquery's result rows is fine; scanning a table or index is not.
+        scans = [step for step in plan
+                 if step.startswith('SCAN') and not step.startswith(('SCAN (', 'SCAN CONSTANT ROW'))]
+        assert not scans, f'full scan in query plan:\n{sql}\n{plan}'
+
+
+def _train_model():
+    sys.path.insert(0, str(REPO_ROOT / 'pipeline'))
+    return pytest.importorskip('train_model')
+
+
+@pytest.mark.parametrize('metric', ['off_rtg', 'efg_pct', 'tov_pct', 'orb_pct'])
+def test_team_stats_for_dates(db, metric):
+    path, statements = db
+    database.get_team_stats_for_dates('Boston', DATES, metric)
+    _assert_no_scans(path, statements)
+
+
+def test_team_stats_for_dates_is_covering(db):
+    path, statements = db
+    database.get_team_stats_for_dates('Boston', DATES, 'off_rtg')
+    sql = next(s for s in statements if 'FROM team_stats' in s)
+    plan = _query_plan(path, sql)
+    assert any('COVERING INDEX idx_team_stats_team_date' in step for step in plan), plan
+
+
+def test_team_dates_and_back_to_back(db):
+    path, statements = db
+    database.get_all_dates_for_team('Boston')
+    database.check_back_to_back('2025-01-14', 'Boston')
+    database.get_team_timeline('Boston', '2024-10-01', '2025-04-14')
+    _assert_no_scans(path, statements)
+
+
+def test_game_lookups(db):
+    path, statements = db
+    database.get_home_win('2025-01-14', 'Boston', 'Toronto')
+    database.get_stored_matchups('2025-01-14')
+    database.get_game_injuries(1, 'Boston')
+    database.get_games_in_range('2025-01-01', '2025-01-31')
+    database.get_head_to_head('Toronto', 'Boston', model_version='v1')
+    database.get_head_to_head('Boston', 'Toronto', '2023-10-01', '2025-09-30')
+    list(database.iter_games_in_range('2025-01-01', '2025-01-31', team='Boston'))
+    list(database.iter_games_in_range('2025-01-01', '2025-01-31', home='Boston', away='Toronto'))
+    _assert_no_scans(path, statements)
+
+
+def test_player_and_injury_lookups(db):
+    path, statements = db
+    database.get_latest_player_season_stats('Boston')
+    database.get_player_season_stats('Boston', '2024-25')
+    database.get_current_injuries('Boston')
+    database.get_team_page_hash('Boston', '2024-25')
+    _assert_no_scans(path, statements)
+
+
+def test_ingest_state_lookups(db):
+    path, statements = db
+    database.get_completed_ingest_dates('2025-01-01', '2025-01-31')
+    database.get_incomplete_ingest_dates()
+    database.get_ingest_resume_date()
+    _assert_no_scans(path, statements)
+
+
+def _select_plans(path, statements):
+    return [(sql, _query_plan(path, sql)) for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+
+
+def _assert_index_only_walks(path, statements):
+    """For whole-table aggregates: any walk over all rows reads a covering index, in its own order."""
+    plans = _select_plans(path, statements)
+    assert plans, 'no SELECT statements were recorded'
+    for sql, plan in plans:
+        walks = [step for step in plan if step.startswith('SCAN')]
+        assert all('USING COVERING INDEX' in step for step in walks), f'table scan in query plan:\n{sql}\n{plan}'
+        assert not [step for step in plan if 'TEMP B-TREE' in step], f'sort in query plan:\n{sql}\n{plan}'
+
+
+def test_latest_game_date(db):
+    path, statements = db
+    database.get_latest_game_date()
+    (sql, plan), = _select_plans(path, statements)
+    # MAX(date) is one probe at the end of the date index
+    assert plan == ['SEARCH games USING COVERING INDEX sqlite_autoindex_games_1'], plan
+
+
+def test_games_in_range(db):
+    path, statements = db
+    database.get_games_in_range('2025-01-01', '2025-01-31')
+    (sql, plan), = _select_plans(path, statements)
+    assert any(step.startswith('SEARCH games USING INDEX') and '(date>? AND date<?)' in step for step in plan), plan
+    _assert_no_scans(path, statements)
+
+
+def test_unscored_games(db):
+    path, statements = db
+    database.get_unscored_games('v1')
+    (sql, plan), = _select_plans(path, statements)
+    # Every stored game is a candidate, walked in date order; each is checked
+    # against the ledger with one covering-index probe
+    assert plan[0] == 'SCAN g USING INDEX sqlite_autoindex_games_1', plan
+    assert any(step.startswith('SEARCH l USING COVERING INDEX') and '(model_version=? AND game_id=?)' in step
+               for step in plan), plan
+    assert not [step for step in plan if step.startswith('SCAN l')], plan
+
+
+def test_team_input_stamps(db):
+    path, statements = db
+    database.get_team_input_stamps()
+    _assert_index_only_walks(path, statements)
+
+
+def test_history_fingerprints(db):
+    path, statements = db
+    database.get_history_fingerprints()
+    _assert_index_only_walks(path, statements)
+    # The per-date joins probe team_stats / game_injuries by game id rather than walking them
+    for sql, plan in _select_plans(path, statements):
+        assert not [step for step in plan if step.startswith(('SCAN t', 'SCAN i'))], plan
+
+
+def test_training_queries(db):
+    path, statements = db
+    train_model = _train_model()
+    games = train_model._games_in_range(DATES)
+    train_model._raw_four_factors(games[0][0], games[0][2])
+    _assert_no_scans(path, statements)
+
+
+def test_partitioned_reads_use_indexes(db, tmp_path, monkeypatch):
+    path, statements = db
+    monkeypatch.setattr(database, 'SEASONS_DIR', str(tmp_path / 'seasons'))
+    season_dates = ['2024-01-15', '2024-01-14', '2024-01-13']
+    before = database.get_team_stats_for_dates('Boston', season_dates, 'off_rtg')
+
+    database.archive_season('2023-24')
+    assert database.get_team_stats_for_dates('Boston', season_dates, 'off_rtg') == before
+
+    sql = [s for s in statements if 'FROM team_stats' in s][-1]
+    conn = database.connect_read(dates=season_dates)
+    plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()]
+    conn.close()
+    assert any('season_0.team_stats' in step for step in plan), plan
+    assert not [step for step in plan if step.startswith('SCAN')], plan
+
+    # Current-season lookups don't attach the archived partition at all.
+    conn = database.connect_read(dates=DATES)
+    assert [row[1] for row in conn.execute('PRAGMA database_list')] == ['main']
+    conn.close()
+
+
+def test_ledger_queries(db):
+    path, statements = db
+    database.get_ledger_page('v1', 'Boston', '2025-01-01', '2025-03-01', 50, 100)
+    database.get_ledger_page('v1')
+    database.get_ledger_accuracy('v1', 'Boston')
+    database.get_ledger_accuracy('v1', None, '2025-01-01', '2025-03-01')
+    database.get_injuries_for_games([1, 2, 3])
+    _assert_no_scans(path, statements)
@@ -0,0 +1,86 @@
+"""Serving snapshot tests: readers that race a reload still see a loaded database.
+
+Builds small snapshot files in a temp directory and serves them from shared
+in-memory copies, as app.py does.
+
+Run from backend/:  python -m pytest -q test_serving_snapshot.py
+"""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import database
+
+
+def _write_snapshot(path, games):
+    tmp = f'{path}.tmp'
+    conn = sqlite3.connect(tmp)
+    conn.execute('CREATE TABLE games (id INTEGER PRIMARY KEY, date TEXT)')
+    conn.executemany('INSERT INTO games (date) VALUES (?)', [('2025-01-10',)] * games)
+    conn.commit()
+    conn.close()
+    os.replace(tmp, path)  # a new inode, as build_snapshot.py's swap gives
+
+
+def _count_games():
+    conn = database.connect_read()
+    try:
+        return conn.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def serving(tmp_path, monkeypatch):
+    path = str(tmp_path / 'nba_serving.db')
+    _write_snapshot(path, 1)
+    monkeypatch.setattr(database, 'SERVING_DB_PATH', path)
+    monkeypatch.setattr(database, '_reload_hooks', [])
+    database.use_serving_snapshot(in_memory=True)
+    yield path
+    monkeypatch.setattr(database, '_serving', None)
+
+
+def test_reload_swaps_in_new_snapshot(serving):
+    assert _count_games() == 1
+    _write_snapshot(serving, 2)
+    database._refresh_serving_snapshot(force=True)
+    assert _count_games() == 2
+    assert database.get_serving_info()['generation'] == 2
+
+
+def test_reader_that_read_the_old_uri_during_a_reload(serving, monkeypatch):
+    # Pause a reader between reading the snapshot uri and connecting to it,
+    # and finish a reload in that gap
+    about_to_connect = threading.Event()
+    reloaded = threading.Event()
+    real_connect = sqlite3.connect
+
+    def connect(target, *args, **kwargs):
+        if threading.current_thread().name == 'reader':
+            about_to_connect.set()
+            reloaded.wait(5)
+        return real_connect(target, *args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, 'connect', connect)
+    counts, errors = [], []
+
+    def read():
+        try:
+            counts.append(_count_games())
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=read, name='reader')
+    reader.start()
+    assert about_to_connect.wait(5)
+    _write_snapshot(serving, 2)
+    database._refresh_serving_snapshot(force=True)
+    reloaded.set()
+    reader.join()
+
+    assert errors == [] and counts == [1]
+    assert _count_games() == 2
@@ -0,0 +1,39 @@
+"""Team trend tests: what the rolling windows count.
+
+Runs against a fresh database in a temp directory, so nothing here touches
+data/nba_data.db.
+
+Run from backend/:  python -m pytest -q test_trend.py
+"""
+
+import pytest
+
+import data
+import database
+
+FACTORS = {'off_rtg': 110.0, 'efg_pct': 0.52, 'tov_pct': 12.0, 'orb_pct': 25.0}
+
+
+@pytest.fixture
+def trend_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'nba_data.db'))
+    monkeypatch.setattr(database, 'SEASONS_DIR', str(tmp_path / 'seasons'))
+    monkeypatch.setattr(database, '_serving', None)  # read DB_PATH even if app.py switched to a snapshot
+    database.create_database()
+    database.store_game('2025-01-10', 'Boston', 'Toronto', 110, 100, 1, FACTORS, FACTORS)
+    database.store_game('2025-01-12', 'Miami', 'Boston', 100, 95, 1, FACTORS, FACTORS)
+    # A game whose result wasn't recorded
+    database.store_game('2025-01-14', 'Boston', 'Utah', None, None, None, FACTORS, FACTORS)
+
+
+def test_games_counts_every_game_in_the_window(trend_db):
+    trend = data.get_team_trend('Boston', '2025-01-10', '2025-01-14', window=30)
+    assert trend['games'].tolist() == [1, 2, 3]
+    assert trend['decided_games'].tolist() == [1, 2, 2]
+    assert trend['win_rate'].tolist() == [1.0, 0.5, 0.5]
+
+
+def test_empty_trend_has_every_column(trend_db):
+    trend = data.get_team_trend('Denver', '2025-01-10', '2025-01-14')
+    assert trend.empty
+    assert {'games', 'decided_games', 'win_rate'} <= set(trend.columns)
@@ -0,0 +1,212 @@
+"""Benchmark the ASGI entry point (backend/asgi.py) against the current Flask deployment.
+
+The Flask side is the deployment as configured: `gunicorn -c gunicorn.conf.py
+app:app` (preloaded master, warmed gthread workers) with --workers processes.
+The ASGI side (`uvicorn asgi:app`) gets as many processes as fit in the same
+memory: the gunicorn server is started first and its idle proportional set
+size (PSS, which splits copy-on-write pages shared with the preloaded master
+instead of counting them once per worker) sets the budget; uvicorn is then
+started with 1, 2, ... workers until the next one would exceed it. Both
+servers' PSS and RSS are sampled throughout the run and reported next to
+throughput, latency percentiles and errors / 503s. --same-workers skips the
+sizing and compares at equal process count instead.
+
+The traffic is a mix of /api/predict and /api/team-comparison over random
+matchups and dates (mostly cache misses at first), plus /health. --idle
+holds that many extra connections open with a half-sent request, the way
+slow mobile clients do; a gunicorn worker thread is held by each one until it
+times out.
+
+Both servers run with CACHE_DB_PATH="" so neither starts from the other's
+warm disk cache. Needs Linux (/proc), gunicorn and requirements-async.txt
+installed.
+
+Usage (from the repo root):
+    python bench/asgi_vs_flask.py --concurrency 8 32 128 --duration 20
+    python bench/asgi_vs_flask.py --workers 2 --idle 16 --json asgi_vs_flask.json
+    python bench/asgi_vs_flask.py --same-workers --workers 2
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from harness import percentiles, pss_mb, rss_mb, start_server, stop_server  # noqa: E402
+from config import EASTERN_CONFERENCE, WESTERN_CONFERENCE  # noqa: E402
+
+TEAMS = EASTERN_CONFERENCE + WESTERN_CONFERENCE
+SEASON_START = date(2024, 10, 22)
+SEASON_DAYS = 174
+BASELINE = 'gunicorn'  # the deployed config, backend/gunicorn.conf.py
+CANDIDATE = 'asgi'
+MAX_WORKERS = 32
+SERVER_ENV = {'CACHE_DB_PATH': ''}
+
+
+def random_path(rng):
+    """One request from the traffic mix: 60% predict, 30% team comparison, 10% health."""
+    home, away = rng.sample(TEAMS, 2)
+    day = (SEASON_START + timedelta(days=rng.randrange(SEASON_DAYS))).isoformat()
+    roll = rng.random()
+    if roll < 0.6:
+        return f'/api/predict?home={home}&away={away}&date={day}'.replace(' ', '%20')
+    if roll < 0.9:
+        return f'/api/team-comparison?home={home}&away={away}&date={day}'.replace(' ', '%20')
+    return '/health'
+
+
+def hold_idle_connections(port, count):
+    """Open `count` connections that send half a request and then sit there."""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /api/teams HTTP/1.1\r\nHost: 127.0.0.1\r\n')
+        sockets.append(sock)
+    return sockets
+
+
+def run_step(port, concurrency, duration, seed):
+    """Drive the server with `concurrency` keep-alive clients for `duration` seconds."""
+    latencies, statuses, lock = [], {}, threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        rng = random.Random(seed * 1000 + i)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local_latencies, local_statuses = [], {}
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request('GET', random_path(rng))
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                status = 'error'
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, n in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + n
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        **percentiles(latencies),
+        'statuses': {str(status): n for status, n in sorted(statuses.items(), key=str)},
+    }
+
+
+def idle_pss(name, workers, port):
+    """PSS of a freshly started, idle `name` server with `workers` processes."""
+    process = start_server(name, port, workers, env=SERVER_ENV)
+    try:
+        time.sleep(1)  # let every worker finish warming up
+        return pss_mb(process.pid)
+    finally:
+        stop_server(process)
+
+
+def workers_within(name, budget_mb, port):
+    """Most processes `name` can run with an idle PSS of at most budget_mb (at least 1), with each size tried."""
+    workers, tried = 1, {}
+    while workers <= MAX_WORKERS:
+        tried[workers] = round(idle_pss(name, workers, port), 1)
+        if tried[workers] > budget_mb:
+            break
+        workers += 1
+    return max(1, workers - 1), tried
+
+
+def bench_server(name, workers, args):
+    process = start_server(name, args.port, workers, env=SERVER_ENV)
+    peak = {'rss': rss_mb(process.pid), 'pss': pss_mb(process.pid)}
+    sampling = threading.Event()
+
+    def sample_memory():
+        while not sampling.wait(0.5):
+            peak['rss'] = max(peak['rss'], rss_mb(process.pid))
+            peak['pss'] = max(peak['pss'], pss_mb(process.pid))
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    idle = hold_idle_connections(args.port, args.idle)
+    try:
+        idle_rss, idle_pss_mb = rss_mb(process.pid), pss_mb(process.pid)
+        steps = [run_step(args.port, c, args.duration, args.seed) for c in args.concurrency]
+    finally:
+        sampling.set()
+        for sock in idle:
+            sock.close()
+        stop_server(process)
+    return {'server': name, 'workers': workers, 'idle_connections': args.idle,
+            'pss_mb_idle': round(idle_pss_mb, 1), 'pss_mb_peak': round(peak['pss'], 1),
+            'rss_mb_idle': round(idle_rss, 1), 'rss_mb_peak': round(peak['rss'], 1), 'steps': steps}
+
+
+def run(args):
+    baseline = bench_server(BASELINE, args.workers, args)
+    if args.same_workers:
+        workers, sizing = args.workers, None
+    else:
+        workers, tried = workers_within(CANDIDATE, baseline['pss_mb_idle'], args.port)
+        sizing = {'budget_pss_mb': baseline['pss_mb_idle'], 'idle_pss_mb_by_workers': tried}
+    candidate = bench_server(CANDIDATE, workers, args)
+    candidate['sizing'] = sizing
+    return [baseline, candidate]
+
+
+def print_report(results):
+    for result in results:
+        print(f"\n{result['server']}: {result['workers']} process(es), {result['idle_connections']} idle connections, "
+              f"PSS {result['pss_mb_idle']:.0f} MB idle / {result['pss_mb_peak']:.0f} MB peak, "
+              f"RSS {result['rss_mb_idle']:.0f} MB idle / {result['rss_mb_peak']:.0f} MB peak")
+        if result.get('sizing'):
+            print(f"  sized to {result['sizing']['budget_pss_mb']:.0f} MB PSS; idle PSS by worker count: "
+                  f"{result['sizing']['idle_pss_mb_by_workers']}")
+        print(f'  {"conc":>5} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}  statuses')
+        for step in result['steps']:
+            print(f"  {step['concurrency']:>5} {step['throughput_rps']:>8} {step['p50_ms']:>8} "
+                  f"{step['p95_ms']:>8} {step['p99_ms']:>8}  {step['statuses']}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--workers', type=int, default=1, help='gunicorn worker processes (WEB_CONCURRENCY)')
+    arg_parser.add_argument('--same-workers', action='store_true',
+                            help='Run uvicorn with --workers processes too instead of sizing it to equal memory')
+    arg_parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+    arg_parser.add_argument('--duration', type=float, default=20, help='Seconds per concurrency step')
+    arg_parser.add_argument('--idle', type=int, default=0, help='Extra half-open client connections to hold')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', help='Also write the results to this file')
+    args = arg_parser.parse_args()
+
+    results = run(args)
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,115 @@
+"""Shared pieces of the benchmark scripts: starting a local backend, memory sampling, percentiles.
+
+Servers are started from backend/ against the checked-in data (no network),
+with CACHE_DB_PATH pointed at a fresh location so every run starts from the
+same cold cache unless the caller says otherwise.
+"""
+
+import http.client
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_ROOT / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+SERVERS = {
+    # As deployed: preloaded master, warmed threaded workers (backend/gunicorn.conf.py)
+    'gunicorn': ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', '127.0.0.1:{port}', '--workers', '{workers}',
+                 'app:app'],
+    # The plain sync-worker deployment, without gunicorn.conf.py
+    'flask': ['gunicorn', '--bind', '127.0.0.1:{port}', '--workers', '{workers}', 'app:app'],
+    'asgi': ['uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', '{port}', '--workers', '{workers}',
+             '--log-level', 'warning'],
+}
+
+
+def start_server(name, port, workers, env=None, timeout=120):
+    """Start a SERVERS entry and wait until /health answers. Returns the Popen."""
+    command = [part.format(port=port, workers=workers) for part in SERVERS[name]]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{name} server exited with code {process.returncode}')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f'{name} server did not become healthy within {timeout}s')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _process_tree(root_pid):
+    """root_pid and all of its descendants (Linux /proc)."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name is parenthesized and may contain spaces; ppid follows it
+                    parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree, frontier = {root_pid}, [root_pid]
+    while frontier:
+        pid = frontier.pop()
+        children = [child for child, parent in parents.items() if parent == pid]
+        tree.update(children)
+        frontier.extend(children)
+    return tree
+
+
+def rss_mb(root_pid):
+    """Total resident memory of a process tree, in MB."""
+    total_kb = 0
+    for pid in _process_tree(root_pid):
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            continue
+    return total_kb / 1024
+
+
+def pss_mb(root_pid):
+    """Total proportional set size of a process tree, in MB.
+
+    Unlike summed RSS, pages shared between processes (a preloaded gunicorn
+    master and its copy-on-write workers) are split between them rather than
+    counted once per process, so it's what the tree actually costs.
+    """
+    total_kb = 0
+    for pid in _process_tree(root_pid):
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        except (OSError, StopIteration):
+            continue
+    return total_kb / 1024
+
+
+def percentiles(latencies, quantiles=(0.50, 0.95, 0.99)):
+    """{'p50_ms': ..., ...} (nearest-rank) for latencies in seconds; None values when empty."""
+    ordered = sorted(latencies)
+    result = {}
+    for q in quantiles:
+        key = f'p{round(q * 100)}_ms'
+        result[key] = round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 1) if ordered else None
+    return result
@@ -0,0 +1,350 @@
+"""Load test the backend with a realistic traffic mix and write a latency SLO report.
+
+    python bench/loadtest.py run --concurrency 1 4 16 32 --duration 15 --out before.json
+    python bench/loadtest.py run --url http://127.0.0.1:8000 --out report.json   (already running)
+    python bench/loadtest.py compare before.json after.json
+
+`run` starts the backend locally (gunicorn with backend/gunicorn.conf.py, as
+deployed) on the checked-in nba_data.db -- nothing touches the network -- with
+a fresh, empty feature cache, then runs one step per concurrency level. Each
+virtual user keeps two keep-alive connections and repeatedly picks a scenario:
+
+    session        /api/bootstrap then /api/matchup, as App.jsx does on load
+    matchup_hot    /api/matchup for a popular matchup at the default date
+    matchup_cold   /api/matchup for a random pairing on a random historical game date
+    pair_hot       /api/predict + /api/team-comparison for one matchup, sent together
+    pair_cold        on the two connections (how the frontend used to, and API clients still do)
+    trend          /api/team/<team>/trend for a random team
+
+Hot matchups are a small fixed set (cache hits once warm); cold ones mostly
+miss. Users are seeded, so two runs send the same request sequence.
+
+Every step records throughput, p50/p95/p99 overall and per scenario, status
+counts and a pass/fail against the SLOs (--slo). The report JSON also records
+the git commit and settings, so runs can be diffed across commits with
+`compare`, which exits 1 when a p95/p99 or throughput regression exceeds
+--threshold percent.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from harness import REPO_ROOT, percentiles, rss_mb, start_server, stop_server  # noqa: E402
+import database  # noqa: E402
+from config import TEAM_TO_ABBR  # noqa: E402
+
+TEAMS = list(TEAM_TO_ABBR)
+HOT_MATCHUPS = [
+    ('Boston', 'New York'), ('LA Lakers', 'Golden State'), ('Denver', 'Oklahoma City'),
+    ('Milwaukee', 'Cleveland'), ('Phoenix', 'Dallas'), ('Miami', 'Philadelphia'),
+    ('New York', 'Boston'), ('Golden State', 'LA Lakers'),
+]
+MIX = {
+    'session': 0.15,
+    'matchup_hot': 0.30,
+    'matchup_cold': 0.15,
+    'pair_hot': 0.15,
+    'pair_cold': 0.15,
+    'trend': 0.10,
+}
+DEFAULT_SLO = {'p95_ms': 250, 'p99_ms': 1000, 'error_rate': 0.01}
+
+
+def historical_dates():
+    """Every stored game date, read straight from the checked-in database."""
+    conn = sqlite3.connect(database.DB_PATH)
+    dates = [row[0] for row in conn.execute('SELECT DISTINCT date FROM games ORDER BY date')]
+    conn.close()
+    return dates
+
+
+def _query(path, **params):
+    return path + '?' + '&'.join(f'{key}={quote(value)}' for key, value in params.items() if value is not None)
+
+
+def scenario_requests(name, rng, dates):
+    """The request paths for one scenario; paths in the same inner list are sent at once."""
+    if name.endswith('_hot'):
+        (home, away), date = rng.choice(HOT_MATCHUPS), None
+    else:
+        (home, away), date = rng.sample(TEAMS, 2), rng.choice(dates)
+
+    if name == 'session':
+        return [['/api/bootstrap'], [_query('/api/matchup', home=home, away=away)]]
+    if name.startswith('matchup'):
+        return [[_query('/api/matchup', home=home, away=away, date=date)]]
+    if name.startswith('pair'):
+        return [[_query('/api/predict', home=home, away=away, date=date),
+                 _query('/api/team-comparison', home=home, away=away, date=date)]]
+    if name == 'trend':
+        return [[_query(f'/api/team/{quote(home)}/trend', points='60')]]
+    raise ValueError(f'Unknown scenario: {name}')
+
+
+class VirtualUser:
+    """Two keep-alive connections; a scenario's concurrent requests go out on both before either is read."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.conns = [self._connect(), self._connect()]
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def run(self, batches):
+        """Send the scenario's requests. Returns the status of each (or 'error')."""
+        statuses = []
+        for paths in batches:
+            try:
+                for conn, path in zip(self.conns, paths):
+                    conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+                for conn, _ in zip(self.conns, paths):
+                    response = conn.getresponse()
+                    response.read()
+                    statuses.append(response.status)
+            except (OSError, http.client.HTTPException):
+                statuses.append('error')
+                self.close()
+                self.conns = [self._connect(), self._connect()]
+        return statuses
+
+    def close(self):
+        for conn in self.conns:
+            conn.close()
+
+
+def run_step(host, port, concurrency, duration, seed, dates):
+    """`concurrency` users running the mix for `duration` seconds. Returns the step's results."""
+    records, lock = [], threading.Lock()
+    names, weights = list(MIX), list(MIX.values())
+    stop_at = time.perf_counter() + duration
+
+    def user(i):
+        rng = random.Random(f'{seed}:{concurrency}:{i}')
+        client = VirtualUser(host, port)
+        local = []
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            batches = scenario_requests(name, rng, dates)
+            started = time.perf_counter()
+            statuses = client.run(batches)
+            local.append((name, time.perf_counter() - started, statuses))
+        client.close()
+        with lock:
+            records.extend(local)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    statuses = {}
+    for _, _, scenario_statuses in records:
+        for status in scenario_statuses:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+    requests = sum(statuses.values())
+    # 503s are admission-control sheds, reported separately as shed_rate
+    errors = sum(n for status, n in statuses.items() if status == 'error' or (status.startswith('5') and status != '503'))
+
+    scenarios = {}
+    for name in names:
+        latencies = [latency for scenario, latency, _ in records if scenario == name]
+        scenarios[name] = {'count': len(latencies), **percentiles(latencies)}
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'scenarios_run': len(records),
+        'requests': requests,
+        'throughput_rps': round(requests / elapsed, 1),
+        **percentiles([latency for _, latency, _ in records]),
+        'error_rate': round(errors / requests, 4) if requests else 0.0,
+        'shed_rate': round(statuses.get('503', 0) / requests, 4) if requests else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+        'scenarios': scenarios,
+    }
+
+
+def check_slo(step, slo):
+    """Attach {metric: {limit, value, ok}} and an overall slo_ok to a step."""
+    step['slo'] = {
+        metric: {'limit': limit, 'value': step[metric], 'ok': step[metric] is not None and step[metric] <= limit}
+        for metric, limit in slo.items()
+    }
+    step['slo_ok'] = all(result['ok'] for result in step['slo'].values())
+    return step
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    slo = {**DEFAULT_SLO, **dict(_parse_slo(item) for item in args.slo)}
+    dates = historical_dates()
+    process = cache_dir = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        host, port = '127.0.0.1', args.port
+        cache_dir = tempfile.mkdtemp(prefix='loadtest-cache-')
+        process = start_server(args.server, port, args.workers,
+                               env={'CACHE_DB_PATH': os.path.join(cache_dir, 'cache.db')})
+
+    try:
+        if args.warmup:
+            run_step(host, port, 1, args.warmup, f'{args.seed}-warmup', dates)
+        steps = []
+        for concurrency in args.concurrency:
+            step = check_slo(run_step(host, port, concurrency, args.duration, args.seed, dates), slo)
+            if process is not None:
+                step['server_rss_mb'] = round(rss_mb(process.pid), 1)
+            steps.append(step)
+            print_step(step)
+    finally:
+        if process is not None:
+            stop_server(process)
+        if cache_dir is not None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'target': args.url or f'{args.server} x{args.workers} (local)',
+            'seed': args.seed,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'mix': MIX,
+            'slo': slo,
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        },
+        'slo_ok': all(step['slo_ok'] for step in steps),
+        'steps': steps,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nReport written to {args.out}')
+    if report['slo_ok']:
+        print('SLOs met at every step')
+    else:
+        print(f"SLOs MISSED at concurrency {[step['concurrency'] for step in steps if not step['slo_ok']]}")
+    return 0 if report['slo_ok'] or not args.enforce_slo else 1
+
+
+def _parse_slo(item):
+    metric, _, limit = item.partition('=')
+    metric = metric if metric == 'error_rate' or metric.endswith('_ms') else f'{metric}_ms'
+    return metric, float(limit)
+
+
+def print_step(step):
+    print(f"\nconcurrency {step['concurrency']}: {step['throughput_rps']} req/s, "
+          f"p50 {step['p50_ms']} / p95 {step['p95_ms']} / p99 {step['p99_ms']} ms, "
+          f"errors {step['error_rate']:.2%}, shed {step['shed_rate']:.2%}, "
+          f"SLO {'ok' if step['slo_ok'] else 'MISSED'}")
+    print(f'  {"scenario":<14} {"count":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for name, s in step['scenarios'].items():
+        print(f"  {name:<14} {s['count']:>6} {s['p50_ms']!s:>8} {s['p95_ms']!s:>8} {s['p99_ms']!s:>8}")
+
+
+def _change(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(args):
+    """Print per-step deltas between two reports. Returns 1 if anything regressed past the threshold."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"baseline  {baseline['meta']['commit']} ({baseline['meta']['created_at']})")
+    print(f"candidate {candidate['meta']['commit']} ({candidate['meta']['created_at']})")
+
+    regressions = []
+    before_steps = {step['concurrency']: step for step in baseline['steps']}
+    for after in candidate['steps']:
+        before = before_steps.get(after['concurrency'])
+        if before is None:
+            continue
+        print(f"\nconcurrency {after['concurrency']}")
+        rows = [('throughput_rps', 'overall', before['throughput_rps'], after['throughput_rps'], True)]
+        rows += [(metric, 'overall', before[metric], after[metric], False) for metric in ('p50_ms', 'p95_ms', 'p99_ms')]
+        for name, s in after['scenarios'].items():
+            if name in before['scenarios']:
+                rows.append(('p95_ms', name, before['scenarios'][name]['p95_ms'], s['p95_ms'], False))
+        for metric, scope, old, new, higher_is_better in rows:
+            change = _change(old, new)
+            worse = change is not None and (-change if higher_is_better else change) > args.threshold
+            # Sub-millisecond-scale latencies swing by large percentages on noise alone
+            if worse and not higher_is_better and new - old < args.min_ms:
+                worse = False
+            if worse and metric != 'p50_ms':
+                regressions.append((after['concurrency'], scope, metric))
+            shown = f'{change:+.1f}%' if change is not None else 'n/a'
+            print(f"  {scope:<14} {metric:<15} {old!s:>9} -> {new!s:<9} {shown:>8}{'  REGRESSION' if worse else ''}")
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold}%')
+        return 1
+    print(f'\nNo regressions over {args.threshold}%')
+    return 0
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the load test and write a report')
+    run_parser.add_argument('--url', help='Test an already running backend instead of starting one')
+    run_parser.add_argument('--server', choices=['gunicorn', 'flask', 'asgi'], default='gunicorn')
+    run_parser.add_argument('--workers', type=int, default=1)
+    run_parser.add_argument('--port', type=int, default=8765)
+    run_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32])
+    run_parser.add_argument('--duration', type=float, default=15, help='Seconds per concurrency step')
+    run_parser.add_argument('--warmup', type=float, default=5, help='Seconds at concurrency 1 before the steps')
+    run_parser.add_argument('--seed', default='0')
+    run_parser.add_argument('--slo', nargs='*', default=[], metavar='METRIC=LIMIT',
+                            help='Override SLOs, e.g. p95=300 p99=800 error_rate=0.005')
+    run_parser.add_argument('--enforce-slo', action='store_true', help='Exit 1 if any step misses an SLO')
+    run_parser.add_argument('--out', help='Write the JSON report here')
+
+    compare_parser = commands.add_parser('compare', help='Compare two reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='Percent change that counts as a regression')
+    compare_parser.add_argument('--min-ms', type=float, default=5, help='Ignore latency increases smaller than this')
+
+    args = arg_parser.parse_args()
+    sys.exit(run(args) if args.command == 'run' else compare(args))
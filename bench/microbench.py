@@ -0,0 +1,354 @@
+"""Micro-benchmarks for the feature and inference hot paths, with stored baselines.
+
+    python bench/microbench.py run                    # time everything, print medians
+    python bench/microbench.py save                   # ... and store as bench/baselines/default.json
+    python bench/microbench.py compare                # time again, test against the stored baseline
+    python bench/microbench.py compare --baseline main --only get_avg_metrics
+
+Covers the individual hot functions -- database.get_team_stats_for_dates,
+data.get_avg_metrics (warm, cold, and the up-to-200-day lookback fallback),
+get_input_format, get_injury_value / get_injury_advanced, _team_player_values,
+ml_model.get_cached_team_stats and predict_game_outcome -- plus end-to-end
+train_model.build_training_rows / build_test_rows (these take seconds each
+and get fewer samples; --quick skips them).
+
+"warm" repeats one input against warm caches; "cold" clears every in-memory
+cache before each timed call (the disk cache tier is disabled for the whole
+run, so cold really recomputes) or rotates through inputs that aren't cached.
+Everything reads the checked-in database; nothing touches the network.
+
+Each benchmark collects independent samples (a sample is the mean of enough
+calls to take >= MIN_SAMPLE_SECONDS). A baseline stores the raw samples, and
+`compare` runs a one-sided Mann-Whitney U test per benchmark: a slowdown is
+flagged only when the new samples are significantly larger (p < --alpha)
+*and* the median moved by more than --min-change percent. Significant
+speedups are reported too. compare exits 1 if anything got slower.
+
+Baselines are only comparable on the machine (and load) they were recorded
+on: save one before a change, compare after it, on the same box. On a noisy
+machine, raise --min-change rather than --alpha -- drift between runs shifts
+every sample, which the test can't tell from a real slowdown.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median, quantiles
+
+# Memory-only feature cache: cold benchmarks must recompute, not hit the disk tier
+os.environ['CACHE_DB_PATH'] = ''
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+BASELINE_DIR = BENCH_DIR / 'baselines'
+sys.path.insert(0, str(REPO_ROOT / 'backend'))
+sys.path.insert(0, str(REPO_ROOT / 'pipeline'))
+
+import cache  # noqa: E402
+import data  # noqa: E402
+import database  # noqa: E402
+import ml_model  # noqa: E402
+from config import TEAM_TO_ABBR, get_last_30_days_from_date, get_last_7_days_from_date  # noqa: E402
+
+SAMPLES = 20
+SLOW_SAMPLES = 5  # the fewest that can reach p < 0.01 in a one-sided Mann-Whitney test
+MIN_SAMPLE_SECONDS = 0.05
+
+TEAMS = list(TEAM_TO_ABBR)
+DATE = '2025-01-15'
+EARLY_SEASON_DATE = '2024-10-24'  # under 10 games in the window, so get_avg_metrics looks back further
+INJURED = {'Boston': ['Jayson Tatum', 'Jaylen Brown', 'Kristaps Porziņģis']}
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    def __init__(self, name, make, reset=None, slow=False):
+        self.name = name
+        self.make = make      # () -> zero-argument callable to time (inputs prepared outside the timing)
+        self.reset = reset    # run untimed before every call (cold benchmarks); forces one call per sample
+        self.slow = slow
+
+
+def benchmark(name, reset=None, slow=False):
+    def register(make):
+        BENCHMARKS[name] = Benchmark(name, make, reset, slow)
+        return make
+    return register
+
+
+def _rotating(calls):
+    """A callable that makes the next of `calls` (a list of zero-arg callables) each time it's called."""
+    position = [0]
+
+    def call():
+        calls[position[0] % len(calls)]()
+        position[0] += 1
+    return call
+
+
+# ===== database.py =====
+
+@benchmark('database.get_team_stats_for_dates')
+def _():
+    dates = get_last_30_days_from_date(DATE)
+    return lambda: database.get_team_stats_for_dates('Boston', dates, 'off_rtg')
+
+
+# ===== data.py =====
+
+@benchmark('data.get_avg_metrics[warm]')
+def _():
+    dates = get_last_30_days_from_date(DATE)
+    return lambda: data.get_avg_metrics(dates, 'Boston', 'off_rtg')
+
+
+@benchmark('data.get_avg_metrics[cold]')
+def _():
+    # A different team / window / metric every call
+    windows = [get_last_30_days_from_date(f'2025-0{month}-{day:02d}') for month in (1, 2, 3) for day in (5, 15, 25)]
+    return _rotating([
+        (lambda d=dates, t=team, m=metric: data.get_avg_metrics(d, t, m))
+        for dates in windows for team in TEAMS for metric in data.FORM_METRICS
+    ])
+
+
+@benchmark('data.get_avg_metrics[lookback]')
+def _():
+    dates = get_last_7_days_from_date(EARLY_SEASON_DATE)
+    return lambda: data.get_avg_metrics(dates, 'Boston', 'off_rtg')
+
+
+@benchmark('data.get_input_format')
+def _():
+    return lambda: data.get_input_format(DATE, 'Boston', 'New York', data.get_avg_rtgs)
+
+
+@benchmark('data.get_injury_value[warm]')
+def _():
+    data.get_injury_value(INJURED['Boston'], 'Boston')
+    return lambda: data.get_injury_value(INJURED['Boston'], 'Boston')
+
+
+@benchmark('data.get_injury_advanced[warm]')
+def _():
+    data.get_injury_advanced(INJURED['Boston'], 'Boston')
+    return lambda: data.get_injury_advanced(INJURED['Boston'], 'Boston')
+
+
+@benchmark('data.get_injury_value[cold]', reset=cache.clear_memory)
+def _():
+    return lambda: data.get_injury_value(INJURED['Boston'], 'Boston')
+
+
+@benchmark('data._team_player_values[warm]')
+def _():
+    data._team_player_values('Boston')
+    return lambda: data._team_player_values('Boston')
+
+
+@benchmark('data._team_player_values[cold]', reset=cache.clear_memory)
+def _():
+    return lambda: data._team_player_values('Boston')
+
+
+# ===== ml_model.py =====
+
+@benchmark('ml_model.get_cached_team_stats[warm]')
+def _():
+    ml_model.get_cached_team_stats(DATE, 'Boston', 'New York')
+    return lambda: ml_model.get_cached_team_stats(DATE, 'Boston', 'New York')
+
+
+@benchmark('ml_model.get_cached_team_stats[cold]', reset=cache.clear_memory)
+def _():
+    return lambda: ml_model.get_cached_team_stats(DATE, 'Boston', 'New York')
+
+
+@benchmark('ml_model.predict_game_outcome[warm]')
+def _():
+    model_data = ml_model.load_model()
+    ml_model.predict_game_outcome('Boston', 'New York', model_data, DATE)
+    return lambda: ml_model.predict_game_outcome('Boston', 'New York', model_data, DATE)
+
+
+@benchmark('ml_model.predict_game_outcome[cold]', reset=cache.clear_memory)
+def _():
+    model_data = ml_model.load_model()
+    return lambda: ml_model.predict_game_outcome('Boston', 'New York', model_data, DATE)
+
+
+# ===== pipeline/train_model.py (end to end) =====
+
+@benchmark('train_model.build_training_rows', reset=cache.clear_memory, slow=True)
+def _():
+    import train_model
+    return train_model.build_training_rows
+
+
+@benchmark('train_model.build_test_rows', reset=cache.clear_memory, slow=True)
+def _():
+    import train_model
+    return train_model.build_test_rows
+
+
+# ===== Measurement =====
+
+def measure(bench, samples):
+    """Per-call seconds, one value per sample."""
+    call = bench.make()
+    call()  # first call outside the timing: imports, lazily built tables
+
+    number = 1
+    if bench.reset is None:
+        # Calibrate so each sample runs long enough for the clock to be negligible
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                call()
+            if time.perf_counter() - started >= MIN_SAMPLE_SECONDS:
+                break
+            number *= 2
+
+    results = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(samples):
+            if bench.reset is not None:
+                bench.reset()
+            started = time.perf_counter()
+            for _ in range(number):
+                call()
+            results.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return results
+
+
+def _spread(samples):
+    if len(samples) < 2:
+        return 0.0
+    q1, _, q3 = quantiles(samples, n=4)
+    return q3 - q1
+
+
+def _format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+
+def run_benchmarks(only=None, quick=False, samples=SAMPLES):
+    """{name: [per-call seconds, ...]} for every selected benchmark, printed as it goes."""
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if (only and not any(pattern in name for pattern in only)) or (quick and bench.slow):
+            continue
+        results[name] = measure(bench, SLOW_SAMPLES if bench.slow else samples)
+        print(f'  {name:<42} median {_format_seconds(median(results[name])):>10}   '
+              f'IQR {_format_seconds(_spread(results[name])):>10}   ({len(results[name])} samples)')
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _record(results):
+    return {
+        'meta': {
+            'commit': _git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'samples': results,
+    }
+
+
+def _baseline_path(name):
+    return BASELINE_DIR / f'{name}.json'
+
+
+def compare(baseline, current, alpha, min_change):
+    """Print each benchmark's change and significance. Returns the names that got slower."""
+    from scipy.stats import mannwhitneyu
+
+    slower = []
+    print(f'\n  {"benchmark":<42} {"baseline":>10} {"now":>10} {"change":>8} {"p (slower)":>11}')
+    for name, samples in current.items():
+        before = baseline.get(name)
+        if not before:
+            print(f'  {name:<42} {"-":>10} {_format_seconds(median(samples)):>10}   (not in baseline)')
+            continue
+        change = (median(samples) - median(before)) / median(before) * 100
+        p_slower = mannwhitneyu(samples, before, alternative='greater').pvalue
+        p_faster = mannwhitneyu(samples, before, alternative='less').pvalue
+        verdict = ''
+        if p_slower < alpha and change > min_change:
+            verdict = 'SLOWER'
+            slower.append(name)
+        elif p_faster < alpha and change < -min_change:
+            verdict = 'faster'
+        print(f'  {name:<42} {_format_seconds(median(before)):>10} {_format_seconds(median(samples)):>10} '
+              f'{change:>+7.1f}% {p_slower:>11.4f}  {verdict}')
+    return slower
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    for command in ('run', 'save', 'compare'):
+        sub = commands.add_parser(command)
+        sub.add_argument('--only', nargs='*', help='Only benchmarks whose name contains one of these')
+        sub.add_argument('--quick', action='store_true', help='Skip the slow end-to-end benchmarks')
+        sub.add_argument('--samples', type=int, default=SAMPLES)
+        if command == 'run':
+            sub.add_argument('--out', help='Write the raw samples here')
+        else:
+            sub.add_argument('--baseline', default='default', help='Baseline name under bench/baselines/')
+        if command == 'compare':
+            sub.add_argument('--alpha', type=float, default=0.01, help='Significance level')
+            sub.add_argument('--min-change', type=float, default=10, help='Ignore median changes under this percent')
+    args = arg_parser.parse_args()
+
+    if args.command == 'compare' and not _baseline_path(args.baseline).exists():
+        sys.exit(f'No baseline {_baseline_path(args.baseline)} -- create one with: microbench.py save')
+
+    print(f'Running {"selected " if args.only else ""}benchmarks...')
+    results = run_benchmarks(args.only, args.quick, args.samples)
+
+    if args.command == 'run' and args.out:
+        with open(args.out, 'w') as f:
+            json.dump(_record(results), f, indent=2)
+    elif args.command == 'save':
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = _baseline_path(args.baseline)
+        stored = json.loads(path.read_text()) if path.exists() else {'samples': {}}
+        # Saving a subset (--only / --quick) updates just those entries
+        record = _record({**stored['samples'], **results})
+        path.write_text(json.dumps(record, indent=2))
+        print(f'\nBaseline saved to {path}')
+    elif args.command == 'compare':
+        baseline = json.loads(_baseline_path(args.baseline).read_text())
+        print(f"\nBaseline '{args.baseline}': commit {baseline['meta']['commit']}, {baseline['meta']['created_at']}")
+        slower = compare(baseline['samples'], results, args.alpha, args.min_change)
+        if slower:
+            print(f'\n{len(slower)} significant slowdown(s): {", ".join(slower)}')
+            sys.exit(1)
+        print('\nNo significant slowdowns')
@@ -23,25 +23,16 @@ function App() {
   const [modelStats, setModelStats] = useState(null)
 
   useEffect(() => {
-    fetchTeams()
-    fetchModelStats()
+    fetchBootstrap()
   }, [])
 
-  const fetchTeams = async () => {
+  const fetchBootstrap = async () => {
     try {
-      const response = await axios.get(`${API_BASE}/api/teams`)
+      const response = await axios.get(`${API_BASE}/api/bootstrap`)
       setTeams(response.data.teams)
+      setModelStats(response.data.model)
     } catch (err) {
-      console.error('Failed to fetch teams:', err)
-    }
-  }
-
-  const fetchModelStats = async () => {
-    try {
-      const response = await axios.get(`${API_BASE}/api/stats`)
-      setModelStats(response.data)
-    } catch (err) {
-      console.error('Failed to fetch model stats:', err)
+      console.error('Failed to fetch teams and model stats:', err)
     }
   }
 
@@ -60,17 +51,12 @@ function App() {
     setError(null)
 
     try {
-      const [predictionResponse, comparisonResponse] = await Promise.all([
-        axios.get(`${API_BASE}/api/predict`, {
-          params: { home: homeTeam, away: awayTeam }
-        }),
-        axios.get(`${API_BASE}/api/team-comparison`, {
-          params: { home: homeTeam, away: awayTeam }
-        })
-      ])
+      const response = await axios.get(`${API_BASE}/api/matchup`, {
+        params: { home: homeTeam, away: awayTeam }
+      })
       
-      setPrediction(predictionResponse.data)
-      setTeamComparison(comparisonResponse.data)
+      setPrediction(response.data.prediction)
+      setTeamComparison(response.data.comparison)
     } catch (err) {
       setError(err.response?.data?.error || 'Prediction failed')
     } finally {
@@ -2,7 +2,7 @@ import React from 'react'
 import { getTeamColor } from '../teamColors'
 
 const PredictionBreakdown = ({ prediction, teamComparison }) => {
-  const { winner } = prediction
+  const { winner, explanation } = prediction
   const { home_team, away_team, breakdown } = teamComparison
   
   const homeColor = getTeamColor(home_team)
@@ -45,6 +45,17 @@ const PredictionBreakdown = ({ prediction, teamComparison }) => {
     }
   ]
 
+  // Biggest model drivers: each feature's push on the home-win probability
+  const drivers = (explanation?.contributions || []).slice(0, 4).map(c => {
+    const favored = c.contribution >= 0 ? home_team : away_team
+    return {
+      label: c.feature,
+      favored,
+      favoredColor: favored === home_team ? homeColor : awayColor,
+      points: (Math.abs(c.contribution) * 100).toFixed(1)
+    }
+  })
+
   return (
     <div className="card">
       <h2 className="card-header">Key Factors</h2>
@@ -77,6 +88,22 @@ const PredictionBreakdown = ({ prediction, teamComparison }) => {
         ))}
       </div>
 
+      {drivers.length > 0 && (
+        <div className="mt-4">
+          <div className="text-xs text-neutral-400 mb-2">Model Drivers</div>
+          <div className="space-y-1">
+            {drivers.map((driver, index) => (
+              <div key={index} className="flex items-center justify-between text-sm">
+                <span className="text-neutral-300">{driver.label}</span>
+                <span style={{ color: driver.favoredColor }}>
+                  {driver.favored} +{driver.points} pts
+                </span>
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
       <div className="mt-4 p-3 bg-neutral-900 border border-neutral-800 rounded text-xs text-neutral-400">
         Analysis based on recent performance trends and historical data. Predictions are probabilistic and subject to in-game variables.
       </div>
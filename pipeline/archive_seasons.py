@@ -0,0 +1,54 @@
+"""Move closed seasons out of the live database into frozen per-season partitions.
+
+Each season whose last day (September 30) has passed and still has games in
+backend/data/nba_data.db is moved into backend/data/seasons/nba_{season}.db
+(see database.archive_season): built from a VACUUM INTO copy, verified
+row-for-row, made read-only, and only then deleted from the live DB. From then
+on nightly ingest and the git-committed live DB only carry the active season;
+database.connect_read() attaches whichever partitions a query's dates touch,
+and pipeline/build_snapshot.py folds them all back into the serving snapshot.
+
+Usage:
+    python3 pipeline/archive_seasons.py                   # every closed season
+    python3 pipeline/archive_seasons.py --season 2023-24
+"""
+
+import argparse
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'backend'))
+
+import database
+from config import get_season_label, get_season_bounds
+
+
+def closed_seasons_in_live_db(today=None):
+    """Season labels that still have games in DB_PATH and have ended."""
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    conn = sqlite3.connect(database.DB_PATH)
+    dates = [row[0] for row in conn.execute('SELECT DISTINCT substr(date, 1, 7) || \'-01\' FROM games')]
+    conn.close()
+    seasons = sorted({get_season_label(date) for date in dates})
+    return [season for season in seasons if get_season_bounds(season)[1] < today]
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--season', action='append', default=None,
+                            help="season label to archive, e.g. 2023-24 (repeatable; default: every closed season)")
+    args = arg_parser.parse_args()
+
+    database.create_database()
+
+    seasons = args.season or closed_seasons_in_live_db()
+    if not seasons:
+        print('No closed seasons left in the live database.')
+
+    for season in seasons:
+        moved = database.archive_season(season)
+        print(f'{season}: {moved["games"]} games, {moved["team_stats"]} team_stats, '
+              f'{moved["game_injuries"]} game_injuries -> {database.season_partition_path(season)}')
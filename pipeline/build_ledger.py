@@ -0,0 +1,63 @@
+"""Score every stored game with the current model into the prediction ledger.
+
+For each game in `games` without a ledger row for the current model version,
+builds the same as-of-date features live serving uses (rolling 7/30-day form
+before the game date, via ml_model.predict_stored_games) with the game's actual
+inactive list, and stores the pre-game home-win probability next to the real
+result. Work is done in chunks: one injury query and ONE predict_proba call per
+chunk, one executemany per chunk. Re-running only scores games added since the
+last run (or everything, after a retrain changes the model version).
+
+Usage:
+    python3 pipeline/build_ledger.py
+    python3 pipeline/build_ledger.py --prune-old     # also drop rows from older model versions
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'backend'))
+
+import database
+from ml_model import load_model, predict_stored_games
+
+CHUNK_SIZE = 500
+
+
+def score_games(model_data, games):
+    """Ledger rows (game_id, date, home, away, home_win_prob, home_win) for (id, date, home, away, home_win) games."""
+    probs = predict_stored_games(model_data, games)
+    return [
+        (game_id, date, home, away, float(p), home_win)
+        for (game_id, date, home, away, home_win), p in zip(games, probs)
+    ]
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--prune-old', action='store_true',
+                            help='delete ledger rows from other model versions')
+    args = arg_parser.parse_args()
+
+    database.create_database()
+    model_data = load_model()
+    version = model_data['version']
+
+    games = database.get_unscored_games(version)
+    print(f'Model {version}: {len(games)} games to score')
+
+    start = time.perf_counter()
+    for i in range(0, len(games), CHUNK_SIZE):
+        chunk = games[i:i + CHUNK_SIZE]
+        rows = score_games(model_data, chunk)
+        database.insert_ledger_predictions(version, rows, datetime.now(timezone.utc).isoformat())
+        print(f'  scored {i + len(chunk)}/{len(games)} ({time.perf_counter() - start:.1f}s)')
+
+    if args.prune_old:
+        print(f'Pruned {database.delete_other_ledger_versions(version)} rows from older model versions')
+
+    print('Done.')
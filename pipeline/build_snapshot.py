@@ -0,0 +1,103 @@
+"""Build the API's read-only serving snapshot from the pipeline database.
+
+The API never reads backend/data/nba_data.db directly once a snapshot exists
+-- it reads backend/data/nba_serving.db (see database.use_serving_snapshot),
+which this script produces:
+  - VACUUM INTO a fresh, defragmented copy of the pipeline DB
+  - fold every frozen season partition (backend/data/seasons/) back in, so
+    serving reads one file no matter how many seasons are archived
+  - drop pipeline-only tables (ingest_state, team_page_state)
+  - keep only each team's latest scraped season in player_season_stats, the
+    only season serving ever reads
+  - record build metadata in snapshot_info, ANALYZE for the query planner,
+    and VACUUM again to compact
+  - atomically swap the finished file into place (os.replace), so a running
+    backend only ever sees a complete snapshot
+
+Usage:
+    python3 pipeline/build_snapshot.py
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'backend'))
+
+import database
+
+PIPELINE_ONLY_TABLES = ['ingest_state', 'team_page_state']
+
+
+def build_snapshot(source=None, dest=None):
+    """Build a serving snapshot of `source` at `dest`. Returns snapshot_info as a dict."""
+    source = source or database.DB_PATH
+    dest = dest or database.SERVING_DB_PATH
+    tmp = f'{dest}.tmp-{os.getpid()}'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    src = sqlite3.connect(source)
+    src.execute('VACUUM INTO ?', (tmp,))
+    src.close()
+
+    conn = sqlite3.connect(Path(tmp).as_uri(), uri=True)
+    cursor = conn.cursor()
+    try:
+        for partition in database.get_season_partitions():
+            cursor.execute('ATTACH DATABASE ? AS season', (f"{Path(partition['path']).as_uri()}?immutable=1",))
+            for table in database.PARTITIONED_TABLES:
+                main_columns = [row[1] for row in cursor.execute(f'PRAGMA main.table_info({table})')]
+                columns = ', '.join(col for col in main_columns if col in partition['columns'][table])
+                cursor.execute(f'INSERT INTO main.{table} ({columns}) SELECT {columns} FROM season.{table}')
+            conn.commit()
+            cursor.execute('DETACH DATABASE season')
+
+        for table in PIPELINE_ONLY_TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+        cursor.execute('''
+            DELETE FROM player_season_stats WHERE season != (
+                SELECT p2.season FROM player_season_stats p2
+                WHERE p2.team = player_season_stats.team
+                ORDER BY p2.scraped_at DESC LIMIT 1
+            )
+        ''')
+
+        cursor.execute('SELECT MAX(date), COUNT(*) FROM games')
+        max_game_date, game_count = cursor.fetchone()
+        info = {
+            'built_at': datetime.now(timezone.utc).isoformat(),
+            'schema_version': str(cursor.execute('PRAGMA user_version').fetchone()[0]),
+            'max_game_date': max_game_date or '',
+            'game_count': str(game_count),
+        }
+        cursor.execute('CREATE TABLE snapshot_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        cursor.executemany('INSERT INTO snapshot_info (key, value) VALUES (?, ?)', info.items())
+
+        conn.commit()
+        cursor.execute('ANALYZE')
+        conn.commit()
+        cursor.execute('VACUUM')
+    finally:
+        conn.close()
+
+    os.replace(tmp, dest)
+    return info
+
+
+if __name__ == '__main__':
+    database.create_database()
+
+    start = time.perf_counter()
+    info = build_snapshot()
+    elapsed = time.perf_counter() - start
+
+    size_kb = os.path.getsize(database.SERVING_DB_PATH) / 1024
+    print(f'Snapshot written to {database.SERVING_DB_PATH} ({size_kb:.0f} KB, {elapsed:.2f}s)')
+    for key, value in info.items():
+        print(f'  {key}: {value}')
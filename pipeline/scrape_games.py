@@ -1,17 +1,26 @@
 """Live scraper: fetch new games and insert them into SQLite.
 
-Idempotent -- checks database.game_exists() before fetching each game's box
-score, so it's safe to re-run (e.g. nightly via GitHub Actions cron) and
-only pulls what's new.
+Idempotent and resumable -- every scoreboard date is recorded in the
+ingest_state table once all of its games are stored, so re-runs skip
+completed dates without fetching anything, and a run that crashes halfway
+through a long backfill picks up at the first date it didn't finish. Within
+a date, games already in the DB are skipped before their box score is
+fetched, and each game is written in a single transaction.
+
+Every date is fetched, offseason included: the calendar moves (the 2020
+season finished in October), and an empty scoreboard is recorded as a
+complete 0/0 date, so it's only fetched once.
 
 Usage:
     python3 pipeline/scrape_games.py                                # yesterday only
     python3 pipeline/scrape_games.py --start 2026-01-01 --end 2026-01-15
+    python3 pipeline/scrape_games.py --catch-up                     # everything from the first unfinished date
+    python3 pipeline/scrape_games.py --start 2026-01-01 --end 2026-01-15 --force
 """
 
 import argparse
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from bs4 import BeautifulSoup
@@ -39,7 +48,8 @@ def date_range(start, end):
 def scrape_date(date):
     """Scrape one date's scoreboard and insert any games not already stored.
 
-    Returns (inserted_count, games_found_count).
+    Returns (inserted_count, games_found_count, games_stored_count), where
+    games_stored_count includes games that were already in the DB.
     """
     year, month, day = date.split('-')
     url = SCORES_BY_DATE.format(int(month), int(day), int(year))
@@ -47,12 +57,15 @@ def scrape_date(date):
     soup = BeautifulSoup(html, 'html.parser')
     games = soup.find_all('div', class_='game_summary expanded nohover')
 
-    inserted = 0
+    already_stored = database.get_stored_matchups(date)
+
+    inserted, stored = 0, 0
     for game in games:
         home_team = game.find('table', class_='teams').find_all('tr')[1].find_all('td')[0].find('a').get_text().strip()
         away_team = game.find('table', class_='teams').find_all('tr')[0].find_all('td')[0].find('a').get_text().strip()
 
-        if database.game_exists(date, home_team, away_team):
+        if (home_team, away_team) in already_stored:
+            stored += 1
             continue
 
         game_url = game.find('td', class_='right gamelink').find('a')['href'][11:]
@@ -66,48 +79,67 @@ def scrape_date(date):
         home_score, away_score, home_win = parse_final_score(box_html)
         inactives = parse_inactive_players(box_html)
 
-        game_id = database.insert_game(date, home_team, away_team, home_score, away_score, home_win)
-        database.insert_team_stats(
-            game_id, home_team, 1,
-            factors['home']['off_rtg'], factors['away']['off_rtg'],
-            factors['home']['efg_pct'], factors['away']['efg_pct'],
-            factors['home']['tov_pct'], factors['away']['tov_pct'],
-            factors['home']['orb_pct'], factors['away']['orb_pct'],
-        )
-        database.insert_team_stats(
-            game_id, away_team, 0,
-            factors['away']['off_rtg'], factors['home']['off_rtg'],
-            factors['away']['efg_pct'], factors['home']['efg_pct'],
-            factors['away']['tov_pct'], factors['home']['tov_pct'],
-            factors['away']['orb_pct'], factors['home']['orb_pct'],
+        database.store_game(
+            date, home_team, away_team, home_score, away_score, home_win,
+            factors['home'], factors['away'],
+            inactives.get(TEAM_TO_ABBR.get(home_team)),
+            inactives.get(TEAM_TO_ABBR.get(away_team)),
         )
 
-        home_abbr = TEAM_TO_ABBR.get(home_team)
-        away_abbr = TEAM_TO_ABBR.get(away_team)
-        if home_abbr in inactives:
-            database.insert_game_injuries(game_id, home_team, inactives[home_abbr])
-        if away_abbr in inactives:
-            database.insert_game_injuries(game_id, away_team, inactives[away_abbr])
-
         inserted += 1
+        stored += 1
+
+    return inserted, len(games), stored
+
 
-    return inserted, len(games)
+def dates_needing_work(start, end, force=False):
+    """Dates in [start, end] that aren't already fully ingested (all of them if force).
+
+    Dates in archived seasons are never re-scraped, even with force: their games
+    live in a frozen partition, and storing them again would duplicate them in
+    the live DB.
+    """
+    completed = set() if force else database.get_completed_ingest_dates(start, end)
+    return [date for date in date_range(start, end)
+            if date not in completed and not database.is_archived_date(date)]
+
+
+def catch_up_start(default):
+    """First date a catch-up run has to look at: the oldest incomplete or unrecorded date (`default` on a fresh DB)."""
+    return database.get_ingest_resume_date() or default
 
 
 if __name__ == '__main__':
     arg_parser = argparse.ArgumentParser()
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    arg_parser.add_argument('--start', default=yesterday)
+    today = datetime.now().strftime('%Y-%m-%d')
+    arg_parser.add_argument('--start', default=None)
     arg_parser.add_argument('--end', default=yesterday)
+    arg_parser.add_argument('--catch-up', action='store_true',
+                            help='scrape everything from the first unfinished date up to --end')
+    arg_parser.add_argument('--force', action='store_true',
+                            help='re-check dates even if they are already recorded as complete')
     args = arg_parser.parse_args()
 
     database.create_database()
 
+    if args.catch_up:
+        start = catch_up_start(default=args.start or yesterday)
+    else:
+        start = args.start or yesterday
+
+    todo = dates_needing_work(start, args.end, force=args.force)
+    print(f'{len(todo)} dates to scrape between {start} and {args.end}')
+
     total_inserted, total_found = 0, 0
-    for date in date_range(args.start, args.end):
-        inserted, found = scrape_date(date)
+    for date in todo:
+        scraped_at = datetime.now(timezone.utc).isoformat()
+        inserted, found, stored = scrape_date(date)
         total_inserted += inserted
         total_found += found
+        # Today's (or a future) scoreboard isn't final yet, so never mark it complete.
+        if date < today:
+            database.record_ingest_date(date, found, stored, scraped_at)
         print(f'{date}: {inserted} new games inserted (of {found} found)')
 
     print(f'Done. {total_inserted} new games inserted total (of {total_found} found across range).')
@@ -2,13 +2,22 @@
 ever brings that section back -- see pipeline/parsers.py:parse_team_injuries).
 
 Idempotent by design -- player_season_stats is upserted keyed on
-(team, player, season), and current_injuries is fully replaced per team each
-run, so re-running just refreshes the same rows.
+(team, player, season), and current_injuries is fully replaced per team.
+Each team page's extracted payload is hashed and compared against the hash
+stored in team_page_state, and teams whose page hasn't changed aren't written
+at all -- so scraped_at only moves for teams that actually changed, and the
+git-committed DB doesn't churn on quiet days. The run ends by listing the
+changed teams (optionally as JSON via --changed-out) so serving caches only
+need to invalidate those.
 
 Usage:
     python3 pipeline/scrape_teams.py
+    python3 pipeline/scrape_teams.py --changed-out changed_teams.json
 """
 
+import argparse
+import hashlib
+import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -36,7 +45,17 @@ def current_season_page_year(today=None):
     return today.year + 1 if today.month >= 10 else today.year
 
 
+def payload_hash(per_game, advanced, injuries):
+    """Stable hash of a team page's extracted data (independent of dict/player ordering)."""
+    payload = {'per_game': per_game, 'advanced': advanced, 'injuries': sorted(injuries)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
 def scrape_team(team, season):
+    """Fetch and parse a team page, writing it only if its payload changed.
+
+    Returns (player_count, injury_count, changed).
+    """
     abbr = TEAM_TO_ABBR[team]
     year = current_season_page_year()
     url = f'{TEAMS}{abbr}/{year}.html'
@@ -46,28 +65,44 @@ def scrape_team(team, season):
     advanced = parse_team_advanced_stats(html)
     injuries = parse_team_injuries(html)
 
-    scraped_at = datetime.now(timezone.utc).isoformat()
     all_players = set(per_game) | set(advanced)
-    for player in all_players:
+    page_hash = payload_hash(per_game, advanced, injuries)
+    if page_hash == database.get_team_page_hash(team, season):
+        return len(all_players), len(injuries), False
+
+    player_rows = []
+    for player in sorted(all_players):
         pg = per_game.get(player, {})
         adv = advanced.get(player, {})
-        database.upsert_player_season_stats(
-            team, player, season,
+        player_rows.append((
+            player,
             pg.get('ppg'), pg.get('rpg'), pg.get('apg'), pg.get('spg'), pg.get('bpg'),
             adv.get('vorp'), adv.get('ws'),
-            scraped_at,
-        )
+        ))
 
-    database.replace_current_injuries(team, injuries, scraped_at)
-    return len(all_players), len(injuries)
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    database.replace_team_page(team, season, player_rows, injuries, page_hash, scraped_at)
+    return len(all_players), len(injuries), True
 
 
 if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--changed-out', default=None,
+                            help='write the list of teams whose page changed to this JSON file')
+    args = arg_parser.parse_args()
+
     database.create_database()
     season = current_season_label()
 
+    changed_teams = []
     for team in TEAM_TO_ABBR:
-        players, injuries = scrape_team(team, season)
-        print(f'{team}: {players} players, {injuries} current injuries')
+        players, injuries, changed = scrape_team(team, season)
+        if changed:
+            changed_teams.append(team)
+        print(f'{team}: {players} players, {injuries} current injuries{"" if changed else " (unchanged)"}')
+
+    if args.changed_out:
+        with open(args.changed_out, 'w') as f:
+            json.dump({'season': season, 'changed_teams': changed_teams}, f, indent=2)
 
-    print('Done.')
+    print(f'Done. {len(changed_teams)} of {len(TEAM_TO_ABBR)} teams changed: {", ".join(changed_teams) or "none"}')
@@ -14,7 +14,6 @@ Usage:
 """
 
 import pickle
-import sqlite3
 import sys
 from pathlib import Path
 
@@ -43,7 +42,7 @@ FEATURE_COLUMNS = [
 
 
 def _games_in_range(dates):
-    conn = sqlite3.connect(database.DB_PATH)
+    conn = database.connect_read(dates=dates)
     cursor = conn.cursor()
     placeholders = ','.join('?' * len(dates))
     cursor.execute(f'''
@@ -57,7 +56,7 @@ def _games_in_range(dates):
 
 
 def _raw_four_factors(game_id, team):
-    conn = sqlite3.connect(database.DB_PATH)
+    conn = database.connect_read(game_ids=[game_id])
     cursor = conn.cursor()
     cursor.execute('''
         SELECT off_rtg, efg_pct, tov_pct, orb_pct FROM team_stats